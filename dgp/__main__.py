@@ -8,6 +8,7 @@ from PyQt5.QtGui import QPixmap
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import QApplication, QSplashScreen
 
+from dgp.core.import_cache import ImportCache, default_cache_path, set_import_cache
 from dgp.gui.main import MainWindow
 
 app = None
@@ -29,6 +30,7 @@ def main():
     _align = Qt.AlignBottom | Qt.AlignHCenter
     global app
     sys.excepthook = excepthook
+    set_import_cache(ImportCache(default_cache_path()))
     app = QApplication(sys.argv)
     splash = QSplashScreen(QPixmap(":/icons/dgp_large"))
     splash.showMessage("Loading Dynamic Gravity Processor", _align)
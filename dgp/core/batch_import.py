@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+import logging
+import queue
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from pandas import DataFrame
+
+from dgp.core import DataType
+from dgp.core.file_loader import parse_file, _DEFAULT
+from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.models.datafile import DataFile
+from dgp.lib.decimation import build_levels
+from dgp.lib.gravity_ingestor import read_at1a
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+__all__ = ['ImportJob', 'BatchImporter', 'PARSERS']
+
+_log = logging.getLogger(__name__)
+
+# Default number of files parsed concurrently
+MAX_WORKERS = 2
+# Parser used to ingest each type of raw data file
+PARSERS: Dict[DataType, Callable[..., DataFrame]] = {
+    DataType.GRAVITY: read_at1a,
+    DataType.TRAJECTORY: import_trajectory
+}
+# Parameters of the application import: the data is stored as sampled, with
+# the GapIndex describing its runs, rather than NaN-filled onto a regular grid
+# (see DataSetController.gridded). Parsers not accepting these ignore them.
+IMPORT_PARAMS = {'fill_with_nans': False, 'gaps': True}
+# Sentinel task which stops the writer thread
+_STOP = object()
+
+
+class ImportJob:
+    """A raw data file to be imported into a DataSet by a BatchImporter
+
+    Parameters
+    ----------
+    path : Path
+        Path to the raw data file
+    datatype : DataType
+        Type of the data, which determines the default parser (see
+        :data:`PARSERS`)
+    params : dict, optional
+        Keyword parameters passed to the parser (those not accepted by the
+        parser are ignored), in addition to :data:`IMPORT_PARAMS`
+    dataset : IDataSetController, optional
+        Target dataset of the imported data
+    datafile : DataFile, optional
+        DataFile describing the imported data, by default a DataFile is
+        created for path (dated today)
+    method : Callable, optional
+        Parser of the file, if not the default parser of its datatype (e.g.
+        the parser of a format inferred by
+        :func:`~dgp.core.format_sniffer.sniff_format`)
+
+    """
+    __slots__ = ('path', 'datatype', 'params', 'dataset', 'datafile', 'method')
+
+    def __init__(self, path: Path, datatype: DataType, params: dict = None,
+                 dataset=None, datafile: DataFile = None,
+                 method: Callable[..., DataFrame] = None):
+        self.path = Path(path)
+        self.datatype = datatype
+        self.params = params or {}
+        self.dataset = dataset
+        self.datafile = datafile or DataFile(datatype, datetime.today(), self.path)
+        self.method = method
+
+    def __repr__(self):
+        return f'<ImportJob {self.datatype.value} {self.path!s}>'
+
+
+class BatchImporter(QObject):
+    """Import queue which parses raw data files on a bounded worker pool
+
+    Submitted :class:`ImportJob` are parsed (via the import cache, see
+    :func:`~dgp.core.file_loader.parse_file`) by at most `max_workers`
+    threads. Parsed frames are handed to a single writer thread through a
+    bounded queue, which saves them to the project HDF5 file one at a time, so
+    that concurrent parsing never contends on the store, and the number of
+    parsed frames held in memory awaiting the writer is bounded (parsers
+    block while the queue is full). The writer also stores the decimated
+    levels of each frame, see :meth:`~dgp.core.hdf5_manager.HDF5Manager.save_levels`.
+
+    Signals are emitted from the worker threads, and are delivered (queued)
+    to slots of the thread the importer lives in, typically the GUI thread.
+
+    Parameters
+    ----------
+    hdfpath : Path
+        Path to the HDF5 file the imported data is written to
+    max_workers : int, optional
+        Maximum number of files parsed concurrently
+    max_pending : int, optional
+        Maximum number of parsed frames awaiting the writer, by default
+        max_workers
+    cache : ImportCache, optional
+        Import cache consulted by the parsers, by default the global cache
+    parent : QObject, optional
+
+    Attributes
+    ----------
+    imported : pyqtSignal(ImportJob, DataFrame)
+        Emitted once the data of a job has been written to the HDF5 file
+    failed : pyqtSignal(ImportJob, Exception)
+        Emitted if a job could not be parsed or written, or was cancelled
+    progress : pyqtSignal(int, int)
+        Emitted as each job completes with the number of jobs completed, and
+        the total number of jobs submitted since the importer was last idle
+    finished : pyqtSignal()
+        Emitted when all submitted jobs have completed
+    errors : List[Tuple[ImportJob, Exception]]
+        Jobs which have failed, and the exception raised
+
+    """
+    imported = pyqtSignal(object, DataFrame)
+    failed = pyqtSignal(object, object)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    def __init__(self, hdfpath: Path, max_workers: int = MAX_WORKERS,
+                 max_pending: int = None, cache=_DEFAULT, parent=None):
+        super().__init__(parent=parent)
+        self._hdfpath = Path(hdfpath)
+        self._cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix='BatchImporter')
+        self._queue = queue.Queue(maxsize=max_pending or max_workers)
+        self._writer: threading.Thread = None
+        self._lock = threading.Lock()
+        self._futures: Dict[Future, ImportJob] = {}
+        self._total = 0
+        self._completed = 0
+        self.errors: List[Tuple[ImportJob, Exception]] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted jobs which have not completed"""
+        with self._lock:
+            return self._total - self._completed
+
+    def submit(self, job: ImportJob) -> ImportJob:
+        """Queue job for import
+
+        Raises
+        ------
+        :exc:`KeyError`
+            If the job has no parser, and there is none for its datatype
+        """
+        method = job.method or PARSERS[job.datatype]
+        with self._lock:
+            self._total += 1
+            future = self._pool.submit(self._parse, job, method)
+            self._futures[future] = job
+        future.add_done_callback(self._discard)
+        return job
+
+    def submit_all(self, jobs: Iterable[ImportJob]) -> List[ImportJob]:
+        return [self.submit(job) for job in jobs]
+
+    def cancel(self) -> int:
+        """Cancel the jobs which have not started parsing
+
+        Cancelled jobs are reported via :attr:`failed` with a
+        :exc:`~concurrent.futures.CancelledError`.
+
+        Returns
+        -------
+        int
+            Number of jobs cancelled
+        """
+        with self._lock:
+            futures = list(self._futures.items())
+        cancelled = 0
+        for future, job in futures:
+            if future.cancel():
+                cancelled += 1
+                self._fail(job, CancelledError())
+        return cancelled
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until all submitted jobs have been parsed and written
+
+        Returns
+        -------
+        bool
+            False if jobs are still being parsed after timeout seconds
+        """
+        with self._lock:
+            futures = list(self._futures)
+        _, not_done = wait_futures(futures, timeout=timeout)
+        if not_done:
+            return False
+        if self._writer is not None:
+            self._queue.join()
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Wait for the submitted jobs, and stop the worker and writer threads
+
+        If wait is False return immediately, the jobs are completed (or
+        cancelled beforehand with :meth:`cancel`) and the threads are joined
+        in the background.
+        """
+        if not wait:
+            threading.Thread(target=self.shutdown, daemon=True,
+                             name='BatchImporterShutdown').start()
+            return
+        self._pool.shutdown(wait=True)
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(future, None)
+
+    def _complete(self) -> None:
+        with self._lock:
+            self._completed += 1
+            completed, total = self._completed, self._total
+            if completed == total:
+                self._completed = self._total = 0
+        self.progress.emit(completed, total)
+        if completed == total:
+            self.finished.emit()
+
+    def _fail(self, job: ImportJob, exception: Exception) -> None:
+        _log.error(f"Failed to import {job.path!s}: {exception!r}")
+        self.errors.append((job, exception))
+        self.failed.emit(job, exception)
+        self._complete()
+
+    # Worker threads
+    def _parse(self, job: ImportJob, method: Callable) -> None:
+        try:
+            params = {**job.params, **IMPORT_PARAMS}
+            data = parse_file(job.path, method, self._cache, **params)
+        except Exception as e:
+            self._fail(job, e)
+            return
+        gap_index = None
+        if isinstance(data, tuple):
+            data, gap_index = data
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write, daemon=True,
+                                                name='BatchImporterWriter')
+                self._writer.start()
+        # Blocks while the writer is behind
+        self._queue.put((job, data, gap_index))
+
+    def _write(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                job, data, gap_index = task
+                try:
+                    HDF5Manager.save_data(data, job.datafile, path=self._hdfpath)
+                    # Decimated levels are built here rather than by the GUI
+                    # thread when the data is first plotted
+                    HDF5Manager.save_levels(build_levels(data), job.datafile,
+                                            self._hdfpath)
+                    if gap_index is not None:
+                        HDF5Manager.save_gap_index(gap_index, job.datafile, self._hdfpath)
+                except Exception as e:
+                    self._fail(job, e)
+                else:
+                    _log.info(f"Imported {job.path!s} to {job.datafile.nodepath}")
+                    self.imported.emit(job, data)
+                    self._complete()
+            finally:
+                self._queue.task_done()
@@ -4,10 +4,10 @@ import sys
 from pathlib import Path
 from typing import Optional, Union
 
-from PyQt5.QtCore import QObject, QProcess
+from PyQt5.QtCore import Qt, QObject, QProcess
 from PyQt5.QtWidgets import QWidget, QMessageBox, QInputDialog
 
-__all__ = ['confirm_action', 'get_input', 'show_in_explorer']
+__all__ = ['confirm_action', 'get_input', 'show_error', 'show_in_explorer']
 
 
 def confirm_action(title: str, message: str,
@@ -38,6 +38,35 @@ def confirm_action(title: str, message: str,
     return dlg.result() == QMessageBox.Yes
 
 
+def show_error(title: str, message: str, detail: str = None,
+               parent: Optional[QWidget] = None) -> QMessageBox:
+    """
+    Display a (non-modal) warning message to the user, e.g. to report errors
+    which occurred in the background
+
+    Parameters
+    ----------
+    title : str
+    message : str
+    detail : str, optional
+        Detailed text, shown on request
+    parent : QWidget, optional
+
+    Returns
+    -------
+    QMessageBox
+        The displayed message box, which is deleted when closed
+
+    """
+    dlg = QMessageBox(QMessageBox.Warning, title, message, QMessageBox.Ok,
+                      parent=parent)
+    if detail:
+        dlg.setDetailedText(detail)
+    dlg.setAttribute(Qt.WA_DeleteOnClose)
+    dlg.show()
+    return dlg
+
+
 def get_input(title: str, label: str, text: str = "", parent: QWidget=None):  # pragma: no cover
     """
     Get text input from the user using a simple Qt Dialog Box
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Union, Generator, List, Tuple, Any, Set, Dict
 from weakref import WeakKeyDictionary, WeakSet, WeakMethod, ref
@@ -7,7 +8,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QStandardItem, QStandardItemModel
 from PyQt5.QtWidgets import QWidget
 
-from dgp.core.oid import OID
+from dgp.core.oid import OID, OIDRegistry
 from dgp.core.controllers.controller_mixins import AttributeProxy
 from dgp.core.types.enumerations import DataType, StateAction
 
@@ -75,8 +76,17 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
     updated (via AttributeProxy::set_attr), call the super() method to propagate
     updates to any observers automatically.
 
+    Bulk mutations of a project should be made within a :meth:`batch`
+    context, which defers UPDATE notifications and the signals of the
+    project's model until the batch ends.
+
     """
 
+    _journal = None
+    # Batch state, held by the top-level (project) controller, see batch()
+    _batch_depth = 0
+    _batch_updates = None
+
     def __init__(self, model, project, *args, parent=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._model = model
@@ -86,6 +96,11 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
         self.__cloned = False
         self._observers: Dict[StateAction, Dict] = {state: WeakKeyDictionary()
                                                     for state in StateAction}
+        # The top-level project controller holds the registry of controllers
+        self._registry = OIDRegistry() if project is self else None
+        if self.registry is not None and model is not None:
+            # Clones share the uid of their source, the source is retained
+            self.registry.register(self, replace=False)
 
         self.setEditable(False)
         self.setText(model.name if hasattr(model, "name") else str(model))
@@ -119,6 +134,78 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
         """
         return self._project() if self._project is not None else None
 
+    @property
+    def journal(self) -> Union['ProjectJournal', None]:
+        """Change journal of the project, if journaling is enabled
+
+        Returns
+        -------
+        :class:`~dgp.core.journal.ProjectJournal` or :const:`None`
+
+        """
+        project = self.project
+        return project._journal if project is not None else None
+
+    @property
+    def registry(self) -> Union[OIDRegistry, None]:
+        """Registry of the (non-clone) controllers within the project, by OID
+
+        Returns
+        -------
+        :class:`~dgp.core.oid.OIDRegistry` or :const:`None`
+
+        """
+        project = self.project
+        return project._registry if project is not None else None
+
+    @property
+    def batching(self) -> bool:
+        """True if a :meth:`batch` of mutations is in progress in the project"""
+        return self._batch_root()._batch_depth > 0
+
+    def _batch_root(self) -> 'VirtualBaseController':
+        project = self.project
+        return project if project is not None else self
+
+    @contextmanager
+    def batch(self):
+        """Context to batch mutations of the project (e.g. adding many children)
+
+        Within a batch UPDATE observer notifications (and updates of clones)
+        are deferred, each updated controller notifies its observers once when
+        the (outermost) batch ends. The projectMutated signal of the project's
+        model (e.g. a :class:`ProjectTreeModel`) is also deferred, and emitted
+        once regardless of the number of items added or removed.
+
+        DELETE notifications are not deferred.
+
+        Batches may be nested, and may be entered via any controller of the
+        project (the batch applies to the whole project).
+
+        Yields
+        ------
+        :class:`VirtualBaseController`
+            This controller
+
+        """
+        root = self._batch_root()
+        model = root.model()
+        if root._batch_depth == 0:
+            root._batch_updates = {}
+            if hasattr(model, 'begin_batch'):
+                model.begin_batch()
+        root._batch_depth += 1
+        try:
+            yield self
+        finally:
+            root._batch_depth -= 1
+            if root._batch_depth == 0:
+                updates, root._batch_updates = root._batch_updates, None
+                for controller in updates:
+                    controller._notify_update()
+                if hasattr(model, 'end_batch'):
+                    model.end_batch()
+
     @property
     def clones(self):
         """Yields any active (referenced) clones of this controller
@@ -220,6 +307,12 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
     def set_parent(self, parent: 'VirtualBaseController'):
         self._parent = parent
 
+    def set_attr(self, key: str, value: Any):
+        super().set_attr(key, value)
+        if self.journal is not None:
+            parent = getattr(self.get_parent(), 'entity', None)
+            self.journal.record_set(self.entity, key, parent=parent)
+
     def register_observer(self, observer, callback, state: StateAction) -> None:
         """Register an observer callback with this controller for the given state
 
@@ -250,13 +343,28 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
         """
         for child in self.children:
             child.delete()
+        if self.registry is not None:
+            self.registry.unregister(self.uid, obj=self)
+        if self.batching:
+            self._batch_root()._batch_updates.pop(self, None)
         for cb in self._observers[StateAction.DELETE].values():
             cb()()
         for clone in self.clones:
             clone.delete()
 
     def update(self) -> None:
-        """Notify observers and clones that the controller has updated"""
+        """Notify observers and clones that the controller has updated
+
+        Notifications are deferred to the end of the current :meth:`batch`
+        (if any).
+        """
+        root = self._batch_root()
+        if root._batch_depth > 0:
+            root._batch_updates[self] = None
+        else:
+            self._notify_update()
+
+    def _notify_update(self) -> None:
         for cb in self._observers[StateAction.UPDATE].values():
             cb()()
         for clone in self.clones:
@@ -276,6 +384,24 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
         """
         yield from ()
 
+    def can_fetch_more(self) -> bool:
+        """Return True if this controller has children which have not yet
+        been created (see :meth:`fetch_more`)
+
+        Controllers may defer the creation of their child controllers until
+        they are required, i.e. when the controller is expanded in a view, or
+        its children are iterated or looked up.
+        """
+        return False
+
+    def fetch_more(self) -> None:
+        """Create the pending children of this controller (if any)
+
+        Override this along with :meth:`can_fetch_more` to populate the
+        children of a controller lazily.
+        """
+        pass
+
     def add_child(self, child) -> 'VirtualBaseController':
         """Add a child object to the controller, and its underlying
         data object.
@@ -331,7 +457,22 @@ class VirtualBaseController(QStandardItem, AttributeProxy):
             Returns the child controller object referred to by uid if it exists
             else None
 
+        Notes
+        -----
+        Registered controllers are retrieved from the project registry in
+        constant time, children of clones (which are not registered) are
+        searched for linearly.
+        Pending children are created (see :meth:`fetch_more`) before the
+        lookup.
+
         """
+        self.fetch_more()
+        if self.registry is not None:
+            child = self.registry.get(uid)
+            if child is None:
+                return None
+            if child.get_parent() is self and uid == child.uid:
+                return child
         for child in self.children:
             if uid == child.uid:
                 return child
@@ -78,8 +78,17 @@ class DataFileController(VirtualBaseController):
         if self.entity is None:
             return
         # TODO: Launch dialog to show datafile properties (name, path, data etc)
-        data = HDF5Manager.load_data(self.entity, self.get_parent().hdfpath)
-        self.log.info(f'\n{data.describe()}')
+        try:
+            meta = HDF5Manager.get_metadata(self.entity, self.get_parent().hdfpath)
+        except KeyError:
+            # Data stored prior to metadata being recorded, fall back to load
+            data = HDF5Manager.load_data(self.entity, self.get_parent().hdfpath)
+            self.log.info(f'\n{data.describe()}')
+            return
+        self.log.info(f'{self.entity.name}: {meta["rows"]} rows '
+                      f'[{meta["start"]} - {meta["end"]}] '
+                      f'@ {meta["sample_rate"] or 0:.2f} Hz\n'
+                      f'Columns: {", ".join(meta["columns"])}')
 
     def _launch_explorer(self):  # pragma: no cover
         if self.entity is not None:
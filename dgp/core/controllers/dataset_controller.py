@@ -3,10 +3,11 @@ import logging
 import warnings
 import weakref
 from pathlib import Path
-from typing import List, Union, Set, cast
+from typing import List, Union, Set, Type, Dict, Iterable, Iterator, Tuple, cast
 
+import numpy as np
 from PyQt5.QtWidgets import QInputDialog
-from pandas import DataFrame, Timestamp, concat
+from pandas import DataFrame, DatetimeIndex, Series, Timestamp, concat
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 
@@ -15,7 +16,10 @@ from dgp.core.hdf5_manager import HDF5Manager
 from dgp.core.models.datafile import DataFile
 from dgp.core.models.dataset import DataSet, DataSegment
 from dgp.core.types.enumerations import DataType
+from dgp.lib.decimation import DecimationPyramid
 from dgp.lib.etc import align_frames
+from dgp.lib.gap_index import GapIndex
+from dgp.lib.transform.graph import TransformGraph
 from dgp.gui.plotting.helpers import LineUpdate
 
 from . import controller_helpers
@@ -27,6 +31,82 @@ from .datafile_controller import DataFileController
 _log = logging.getLogger(__name__)
 
 
+class SegmentIndex:
+    """Positional slices of a DataSet's segments over a DatetimeIndex
+
+    The start/stop times of each segment are resolved to integer positions in
+    the index once (vectorized) when the SegmentIndex is created, and are then
+    maintained incrementally as segments are added, updated or removed.
+    Retrieving the slice of a segment is O(1), allowing many channels to be
+    sliced into many segments without repeated searches of the index.
+
+    Segments are kept ordered by their start time (segments which start at
+    the same time are kept in the order they were added/updated), regardless
+    of the order in which they are added or modified.
+
+    Parameters
+    ----------
+    index : :class:`pandas.DatetimeIndex`
+        Monotonically increasing index (e.g. of a transform result)
+    segments : Iterable[:class:`DataSegment`], optional
+
+    """
+    def __init__(self, index: DatetimeIndex, segments: Iterable[DataSegment] = ()):
+        self.index = index
+        self._ns = np.asarray(index.asi8, dtype=np.int64)
+        segments = list(segments)
+        edges = np.array([(segment.start.value, segment.stop.value)
+                          for segment in segments], dtype=np.int64).reshape(-1, 2)
+        order = np.argsort(edges[:, 0], kind='mergesort')
+        segments = [segments[i] for i in order]
+        self._starts = edges[order, 0]
+        self._uids: List[OID] = [segment.uid for segment in segments]
+        self._labels: List[str] = [segment.label for segment in segments]
+        self._rows: Dict[OID, int] = {uid: i for i, uid in enumerate(self._uids)}
+        self._bounds = np.searchsorted(self._ns, edges[order])
+
+    def update(self, segment: DataSegment) -> None:
+        """Add or update the slice of a segment"""
+        start = segment.start.value
+        bounds = np.searchsorted(self._ns, [start, segment.stop.value])
+        row = self._rows.get(segment.uid, None)
+        if row is not None and self._starts[row] == start:
+            self._labels[row] = segment.label
+            self._bounds[row] = bounds
+            return
+        self.remove(segment.uid)
+        row = int(np.searchsorted(self._starts, start, side='right'))
+        self._starts = np.insert(self._starts, row, start)
+        self._bounds = np.insert(self._bounds, row, bounds, axis=0)
+        self._uids.insert(row, segment.uid)
+        self._labels.insert(row, segment.label)
+        for i, uid in enumerate(self._uids[row:], row):
+            self._rows[uid] = i
+
+    def remove(self, uid: OID) -> None:
+        row = self._rows.pop(uid, None)
+        if row is None:
+            return
+        del self._uids[row]
+        del self._labels[row]
+        self._starts = np.delete(self._starts, row)
+        self._bounds = np.delete(self._bounds, row, axis=0)
+        for uid in self._uids[row:]:
+            self._rows[uid] -= 1
+
+    def __getitem__(self, uid: OID) -> slice:
+        lo, hi = self._bounds[self._rows[uid]]
+        return slice(lo, hi)
+
+    def __iter__(self) -> Iterator[Tuple[OID, str, slice]]:
+        """Yields the (uid, label, slice) of each segment in order of start"""
+        for uid, label, (lo, hi) in zip(self._uids, self._labels, self._bounds):
+            yield uid, label, slice(lo, hi)
+
+    def __len__(self):
+        return len(self._uids)
+
+
 class DataSegmentController(VirtualBaseController):
     """Controller for :class:`DataSegment`
 
@@ -63,6 +143,8 @@ class DataSegmentController(VirtualBaseController):
         super().update()
         self.setText(str(self.entity))
         self.setToolTip(repr(self.entity))
+        if self.get_parent() is not None:
+            self.get_parent().segment_updated(self.entity)
 
     def _action_properties(self):
         warnings.warn("Properties feature not yet implemented")
@@ -71,6 +153,9 @@ class DataSegmentController(VirtualBaseController):
 class DataSetController(IDataSetController):
     def __init__(self, dataset: DataSet, project, flight: IFlightController):
         super().__init__(model=dataset, project=project, parent=flight)
+        self._segment_index: SegmentIndex = None
+        self._gap_indexes: Dict[DataType, GapIndex] = {}
+        self._data_version = 0
 
         self.setIcon(Icon.PLOT_LINE.icon())
         self._grav_file = DataFileController(self.entity.gravity, self.project, self)
@@ -78,10 +163,10 @@ class DataSetController(IDataSetController):
         self._child_map = {DataType.GRAVITY: self._grav_file,
                            DataType.TRAJECTORY: self._traj_file}
 
-        self._segments = ProjectFolder("Segments", Icon.LINE_MODE.icon())
-        for segment in dataset.segments:
-            seg_ctrl = DataSegmentController(segment, project, parent=self)
-            self._segments.appendRow(seg_ctrl)
+        # Segment controllers are created when the folder is first expanded,
+        # or the segments are first requested
+        self._segments = ProjectFolder("Segments", Icon.LINE_MODE.icon(),
+                                       fetch=self._fetch_segments)
 
         self.appendRow(self._grav_file)
         self.appendRow(self._traj_file)
@@ -119,7 +204,7 @@ class DataSetController(IDataSetController):
         self._clones: Set[DataSetController] = weakref.WeakSet()
 
     def clone(self):
-        clone = DataSetController(self.entity, self.get_parent(), self.project)
+        clone = DataSetController(self.entity, self.project, self.get_parent())
         self.register_clone(clone)
         return clone
 
@@ -145,6 +230,17 @@ class DataSetController(IDataSetController):
     def segment_model(self) -> QStandardItemModel:  # pragma: no cover
         return self._segments.internal_model
 
+    def can_fetch_more(self) -> bool:
+        return self._segments.can_fetch_more()
+
+    def fetch_more(self) -> None:
+        self._segments.fetch_more()
+
+    def _fetch_segments(self) -> None:
+        for segment in self.entity.segments:
+            self._segments.appendRow(DataSegmentController(segment, self.project,
+                                                           parent=self))
+
     @property
     def columns(self) -> List[str]:
         return [col for col in self.dataframe()]
@@ -188,6 +284,147 @@ class DataSetController(IDataSetController):
             self._dataframe: DataFrame = concat([self.gravity, self.trajectory], axis=1, sort=True)
         return self._dataframe
 
+    def decimation(self, series: Series) -> Union[DecimationPyramid, None]:
+        """Get the multi-resolution (decimated) representation of a channel
+
+        The decimated levels are loaded from (or lazily built and stored in) the
+        project HDF5 file alongside the raw data of the DataFile containing the
+        channel.
+
+        Parameters
+        ----------
+        series : :obj:`Series`
+            A channel (column) of this DataSet's gravity or trajectory data
+
+        Returns
+        -------
+        :obj:`DecimationPyramid` or None
+            None if the series is not a numeric channel of this DataSet
+
+        """
+        sources = ((self.entity.gravity, self.gravity),
+                   (self.entity.trajectory, self.trajectory))
+        for datafile, frame in sources:
+            if datafile is None or series.name not in frame:
+                continue
+            try:
+                levels = HDF5Manager.load_levels(datafile, self.hdfpath)
+            except Exception:
+                _log.exception(f'Exception loading decimated levels from HDF')
+                return None
+            if not any(f'{series.name}_min' in level for level in levels.values()):
+                return None
+            return DecimationPyramid.from_levels(frame[series.name], levels)
+        return None
+
+    def segment_index(self, index: DatetimeIndex) -> SegmentIndex:
+        """Get the positional slices of this DataSet's segments over index
+
+        The SegmentIndex is computed once for an index (e.g. a transform
+        result), and is kept up to date as segments are added, modified or
+        removed.
+        """
+        if self._segment_index is None or self._segment_index.index is not index:
+            self._segment_index = SegmentIndex(index, self.entity.segments)
+        return self._segment_index
+
+    def gap_index(self, group: DataType) -> GapIndex:
+        """Get the runs (and gaps) of the samples of the gravity or trajectory
+        data of this DataSet
+
+        The GapIndex stored with the data on import is loaded when first
+        requested, or computed from the data if there is none (rows of NaNs
+        filled by the ingestors are ignored), and is discarded when the data
+        of the group changes.
+        """
+        if group not in self._gap_indexes:
+            datafile = self.entity.gravity if group is DataType.GRAVITY else self.entity.trajectory
+            gap_index = None
+            if datafile is not None and self.project is not None:
+                gap_index = HDF5Manager.load_gap_index(datafile, self.hdfpath)
+            if gap_index is None:
+                frame = self.gravity if group is DataType.GRAVITY else self.trajectory
+                gap_index = GapIndex.from_frame(frame)
+            self._gap_indexes[group] = gap_index
+        return self._gap_indexes[group]
+
+    def gridded(self, group: DataType) -> DataFrame:
+        """Get the gravity or trajectory data on its regular (nominal
+        interval) grid, with the gaps between its runs filled with NaNs
+
+        Data is imported as sampled, this materializes the grid for consumers
+        which require regularly sampled data (e.g. transform graphs), see
+        :meth:`gap_index`.
+        """
+        frame = self.gravity if group is DataType.GRAVITY else self.trajectory
+        if frame.empty:
+            return frame
+        return self.gap_index(group).reindex(frame)
+
+    def segment_updated(self, segment: DataSegment) -> None:
+        """Update the segment index after a segment has been added/modified
+
+        Within a batch the index is discarded instead, and is rebuilt once
+        when next requested.
+        """
+        if self.batching:
+            self._segment_index = None
+        elif self._segment_index is not None:
+            self._segment_index.update(segment)
+
+    def result_key(self, graph: Type[TransformGraph], **params) -> Union[str, None]:
+        """Return the provenance key for the result of executing graph with
+        params against this DataSet's gravity and trajectory files, and the
+        current :attr:`data_version` of their data (e.g. once aligned).
+
+        Returns None if either of the gravity or trajectory files are not set.
+        """
+        if self.entity.gravity is None or self.entity.trajectory is None:
+            return None
+        return graph.fingerprint(self.entity.gravity.uid.base_uuid,
+                                 self.entity.trajectory.uid.base_uuid,
+                                 self.data_version, **params)
+
+    def load_result(self, graph: Type[TransformGraph], **params) -> Union[DataFrame, None]:
+        """Load a stored transform result from the project HDF5 file
+
+        Returns
+        -------
+        DataFrame or None
+            The stored result if one exists for the current inputs, graph and
+            params, else None
+
+        """
+        key = self.result_key(graph, **params)
+        if key is None:
+            return None
+        result = HDF5Manager.load_result(key, self.hdfpath)
+        if result is not None:
+            _log.info(f'Loaded stored {graph.__name__} result for {self.entity.name}')
+        return result
+
+    def save_result(self, result: DataFrame, graph: Type[TransformGraph],
+                    **params) -> bool:
+        """Store a transform result in the project HDF5 file
+
+        Results previously stored for this DataSet and graph (i.e. computed from
+        different inputs or params) are invalidated and removed. The input
+        DataFiles are recorded, so the result is also removed if rows are
+        appended to either of them.
+        """
+        key = self.result_key(graph, **params)
+        if key is None:
+            return False
+        try:
+            return HDF5Manager.save_result(result, key, self.hdfpath,
+                                           dataset=self.uid.base_uuid,
+                                           graph=graph.__name__,
+                                           gravity=self.entity.gravity.uid.base_uuid,
+                                           trajectory=self.entity.trajectory.uid.base_uuid)
+        except Exception:
+            _log.exception(f'Exception saving {graph.__name__} result to HDF')
+            return False
+
     def align(self):  # pragma: no cover
         """
         TODO: Utility of this is questionable, is it built into transform graphs?
@@ -203,6 +440,8 @@ class DataSetController(IDataSetController):
                                       interp_only=fields)
         self._gravity = n_grav
         self._trajectory = n_traj
+        self._gap_indexes.clear()
+        self._data_version += 1
         _log.info(f'DataFrame aligned.')
 
     def add_datafile(self, datafile: DataFile) -> None:
@@ -216,26 +455,72 @@ class DataSetController(IDataSetController):
             self._trajectory = DataFrame()
         else:
             raise TypeError("Invalid DataFile group provided.")
+        self._gap_indexes.pop(datafile.group, None)
+        self._data_version += 1
+        if self.project is not None:
+            # Results computed from the replaced DataFile can not be reused
+            HDF5Manager.invalidate_results(self.hdfpath, dataset=self.uid.base_uuid)
+        if self.journal is not None:
+            # Recorded before registration, such that the (new) datafile is
+            # recorded by value
+            self.journal.record_set(self.entity, datafile.group.value)
+        if self.project is not None:
+            self.project.entity.register(datafile)
 
         self._dataframe = DataFrame()
         self._update_channel_model()
 
+    @property
+    def data_version(self) -> int:
+        """Counter incremented whenever the data of this DataSet changes (a
+        DataFile is added, appended to, or the data is aligned), e.g. for
+        views to re-load data they have derived from it"""
+        return self._data_version
+
+    def data_appended(self, datafile: DataFile) -> None:
+        """Discard the loaded data of datafile after rows have been appended
+        to it (e.g. by a :class:`~dgp.core.file_follower.FileFollower`), it
+        is re-loaded when next requested
+
+        Clones discard their loaded data too, and UPDATE observers are
+        notified of the new :attr:`data_version`.
+        """
+        if not self._discard_data(datafile):
+            return
+        for clone in self.clones:
+            clone._discard_data(datafile)
+        self.update()
+
+    def _discard_data(self, datafile: DataFile) -> bool:
+        if datafile is self.entity.gravity:
+            self._gravity = DataFrame()
+        elif datafile is self.entity.trajectory:
+            self._trajectory = DataFrame()
+        else:
+            return False
+        self._gap_indexes.pop(datafile.group, None)
+        self._dataframe = DataFrame()
+        self._segment_index = None
+        self._data_version += 1
+        return True
+
     def get_datafile(self, group) -> DataFileController:
         return self._child_map[group]
 
     @property
     def children(self):
-        for i in range(self._segments.rowCount()):
-            yield self._segments.child(i)
+        return self._segments.items()
 
     def add_child(self, child: LineUpdate) -> DataSegmentController:
         """Add a DataSegment as a child to this DataSet"""
-
+        self.fetch_more()
         segment = DataSegment(child.uid, child.start, child.stop,
-                              self._segments.rowCount(), label=child.label)
+                              len(self.entity.segments), label=child.label)
         self.entity.segments.append(segment)
         segment_c = DataSegmentController(segment, self.project, parent=self)
         self._segments.appendRow(segment_c)
+        if self.journal is not None:
+            self.journal.record_add(self.entity, segment)
         return segment_c
 
     def remove_child(self, uid: OID, confirm: bool = True):
@@ -249,6 +534,17 @@ class DataSetController(IDataSetController):
         seg_c.delete()
         self._segments.removeRow(seg_c.row())
         self.entity.segments.remove(seg_c.entity)
+        if self.batching:
+            self._segment_index = None
+        elif self._segment_index is not None:
+            self._segment_index.remove(uid)
+        if self.journal is not None:
+            self.journal.record_remove(self.entity, uid)
+
+    def delete(self):
+        # Segments which were never fetched have no controllers to clean up
+        self._segments.set_fetch(None)
+        super().delete()
 
     def update(self):
         self.setText(self.entity.name)
@@ -33,6 +33,11 @@ class FlightController(IFlightController):
     which allows access to the underlying :class:`Flight` attributes via the
     get_attr and set_attr methods.
 
+    The DataSetControllers of the flight are created lazily, when the flight
+    is first expanded in a view, or its datasets are first requested (see
+    :meth:`fetch_more`), such that opening a project with many flights does
+    not require the construction of every DataSet and DataSegment controller.
+
     Parameters
     ----------
     flight : :class:`Flight`
@@ -49,11 +54,7 @@ class FlightController(IFlightController):
         self.setIcon(Icon.AIRBORNE.icon())
 
         self._dataset_model = QStandardItemModel()
-
-        for dataset in self.entity.datasets:
-            control = DataSetController(dataset, project, self)
-            self.appendRow(control)
-            self._dataset_model.appendRow(control.clone())
+        self._fetched = False
 
         # Add a default DataSet if none defined
         if not len(self.entity.datasets):
@@ -80,6 +81,7 @@ class FlightController(IFlightController):
 
     @property
     def children(self) -> Generator[DataSetController, None, None]:
+        self.fetch_more()
         for i in range(self.rowCount()):
             yield self.child(i, 0)
 
@@ -89,8 +91,27 @@ class FlightController(IFlightController):
 
     @property
     def datasets(self) -> QStandardItemModel:
+        self.fetch_more()
         return self._dataset_model
 
+    def can_fetch_more(self) -> bool:
+        return not self._fetched
+
+    def fetch_more(self) -> None:
+        """Create the DataSetControllers of this flight (once)"""
+        if self._fetched:
+            return
+        self._fetched = True
+        for dataset in self.entity.datasets:
+            control = DataSetController(dataset, self.project, self)
+            self.appendRow(control)
+            self._dataset_model.appendRow(control.clone())
+
+    def delete(self):
+        # DataSets which were never fetched have no controllers to clean up
+        self._fetched = True
+        super().delete()
+
     def update(self):
         self.setText(self.entity.name)
         self.setToolTip(str(self.entity.uid))
@@ -125,7 +146,12 @@ class FlightController(IFlightController):
             raise TypeError(f'Invalid child of type {type(child)} supplied to'
                             f'FlightController, must be {type(DataSet)}')
 
+        self.fetch_more()
         self.entity.datasets.append(child)
+        if self.project is not None:
+            self.project.entity.register(child)
+        if self.journal is not None:
+            self.journal.record_add(self.entity, child)
         control = DataSetController(child, self.project, self)
         self.appendRow(control)
         self._dataset_model.appendRow(control.clone())
@@ -168,6 +194,10 @@ class FlightController(IFlightController):
 
         child.delete()
         self.entity.datasets.remove(child.entity)
+        if self.project is not None:
+            self.project.entity.unregister(child.entity)
+        if self.journal is not None:
+            self.journal.record_remove(self.entity, child.uid)
         self._dataset_model.removeRow(child.row())
         self.removeRow(child.row())
         self.update()
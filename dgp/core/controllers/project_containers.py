@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import Generator
+from typing import Generator, Callable, Union
 
 from PyQt5.QtGui import QStandardItem, QStandardItemModel, QIcon
 
@@ -15,13 +15,20 @@ class ProjectFolder(QStandardItem):
     for display in a view, a clone of the item is created and also added to
     an internal QStandardItemModel for
 
+    The items of a folder may be populated lazily by supplying a `fetch`
+    callable, which is called (once) to append the items when the folder is
+    first expanded in a view, or its items are first requested.
+    See :meth:`can_fetch_more` and :meth:`fetch_more`
+
     Notes
     -----
     Overriding object methods like __getitem__ __iter__ etc seems to break
     """
 
-    def __init__(self, label: str, icon: QIcon = None, **kwargs):
+    def __init__(self, label: str, icon: QIcon = None,
+                 fetch: Callable[[], None] = None, **kwargs):
         super().__init__(label)
+        self._fetch = fetch
         if icon is None:
             icon = Icon.OPEN_FOLDER.icon()
         self.setIcon(icon)
@@ -31,8 +38,23 @@ class ProjectFolder(QStandardItem):
 
     @property
     def internal_model(self) -> QStandardItemModel:
+        self.fetch_more()
         return self._model
 
+    def can_fetch_more(self) -> bool:
+        """Return True if the items of this folder have not yet been fetched"""
+        return self._fetch is not None
+
+    def fetch_more(self) -> None:
+        """Populate the items of this folder (if not yet populated)"""
+        fetch, self._fetch = self._fetch, None
+        if fetch is not None:
+            fetch()
+
+    def set_fetch(self, fetch: Union[Callable[[], None], None]) -> None:
+        """Set (or with None, discard) the pending fetch of this folder"""
+        self._fetch = fetch
+
     def appendRow(self, item: QStandardItem):
         """
         Notes
@@ -48,4 +70,5 @@ class ProjectFolder(QStandardItem):
         self._model.removeRow(row)
 
     def items(self) -> Generator[QStandardItem, None, None]:
+        self.fetch_more()
         return (self.child(i, 0) for i in range(self.rowCount()))
@@ -2,8 +2,9 @@
 import functools
 import itertools
 import logging
+from concurrent.futures import CancelledError
 from pathlib import Path
-from typing import Union, List, Generator, cast
+from typing import Union, List, Generator, Iterable, cast
 
 from PyQt5.QtCore import Qt, QRegExp
 from PyQt5.QtGui import QColor, QStandardItemModel, QRegExpValidator
@@ -13,11 +14,13 @@ from .project_treemodel import ProjectTreeModel
 from .flight_controller import FlightController
 from .gravimeter_controller import GravimeterController
 from .project_containers import ProjectFolder
-from .controller_helpers import confirm_action, get_input, show_in_explorer
+from .controller_helpers import confirm_action, get_input, show_error, show_in_explorer
 from .controller_interfaces import (IAirborneController, IFlightController,
                                     IDataSetController)
 from dgp.core.oid import OID
-from dgp.core.file_loader import FileLoader
+from dgp.core.batch_import import BatchImporter, ImportJob, PARSERS
+from dgp.core.file_follower import FileFollower
+from dgp.core.journal import ProjectJournal
 from dgp.core.hdf5_manager import HDF5Manager
 from dgp.core.models.datafile import DataFile
 from dgp.core.models.flight import Flight
@@ -29,8 +32,6 @@ from dgp.gui.dialogs.add_flight_dialog import AddFlightDialog
 from dgp.gui.dialogs.add_gravimeter_dialog import AddGravimeterDialog
 from dgp.gui.dialogs.data_import_dialog import DataImportDialog
 from dgp.gui.dialogs.project_properties_dialog import ProjectPropertiesDialog
-from dgp.lib.gravity_ingestor import read_at1a
-from dgp.lib.trajectory_ingestor import import_trajectory
 
 
 class AirborneProjectController(IAirborneController):
@@ -42,15 +43,26 @@ class AirborneProjectController(IAirborneController):
     path : :class:`pathlib.Path`, Optional
         Optionally supply the directory path where the project was loaded from
         in order to update the stored state.
+    journal : :class:`~dgp.core.journal.ProjectJournal`, Optional
+        Optionally supply a journal to record changes to the project in,
+        changes are then saved incrementally rather than by re-writing the
+        project file.
 
     """
-    def __init__(self, project: AirborneProject, path: Path = None):
+    def __init__(self, project: AirborneProject, path: Path = None,
+                 journal: ProjectJournal = None):
         super().__init__(project, self)
         self.log = logging.getLogger(__name__)
+        self._journal = journal
         if path:
             self.entity.path = path
 
         self._active = None
+        self._importer: BatchImporter = None
+        self._import_event: ProgressEvent = None
+        self._import_failures: List[str] = []
+        self._imported_jobs: List[ImportJob] = []
+        self._followers: List[FileFollower] = []
 
         self.setIcon(Icon.DGP_NOTEXT.icon())
         self.setToolTip(str(self.entity.path.resolve()))
@@ -150,6 +162,8 @@ class AirborneProjectController(IAirborneController):
         else:
             raise ValueError("{0!r} is not a valid child type for {1.__name__}".format(child, self.__class__))
         self.entity.add_child(child)
+        if self.journal is not None:
+            self.journal.record_add(self.entity, child)
         self.update()
         return controller
 
@@ -168,6 +182,8 @@ class AirborneProjectController(IAirborneController):
 
         child.delete()
         self.entity.remove_child(child.uid)
+        if self.journal is not None:
+            self.journal.record_remove(self.entity, child.uid)
         self._child_map[child.entity.__class__].removeRow(child.row())
         self.update()
 
@@ -189,7 +205,30 @@ class AirborneProjectController(IAirborneController):
     def is_active(self):
         return self._active
 
-    def save(self, to_file=True):
+    def delete(self):
+        super().delete()
+        for follower in self._followers:
+            follower.stop()
+        self._followers = []
+        if self._importer is not None:
+            for signal in (self._importer.imported, self._importer.failed,
+                           self._importer.progress, self._importer.finished):
+                signal.disconnect()
+            # Jobs being parsed are completed in the background
+            self._importer.cancel()
+            self._importer.shutdown(wait=False)
+            self._importer = None
+        if self._journal is not None:
+            self._journal.close()
+
+    def save(self, to_file=True, compact=False):
+        """Save the project
+
+        If journaling is enabled changes have already been recorded, and the
+        journal is only compacted (to the project file) if compact is True.
+        """
+        if to_file and self.journal is not None:
+            return self.journal.save(compact=compact)
         return self.entity.to_json(indent=2, to_file=to_file)
 
     def set_name(self):  # pragma: no cover
@@ -217,23 +256,129 @@ class AirborneProjectController(IAirborneController):
             self.log.warning(f"project {self.get_attr('name')} has no parent")
         super().update()
 
-    def _post_load(self, datafile: DataFile, dataset: IDataSetController,
-                   data: DataFrame) -> None:  # pragma: no cover
-        """
-        This is a slot called upon successful loading of a DataFile by a
-        FileLoader Thread.
+    @property
+    def importer(self) -> BatchImporter:
+        """The :class:`~dgp.core.batch_import.BatchImporter` which imports
+        raw data files into the project's HDF5 file, created on first use"""
+        if self._importer is None:
+            self._importer = BatchImporter(self.hdfpath)
+            self._importer.imported.connect(self._post_import)
+            self._importer.failed.connect(self._import_failed)
+            self._importer.progress.connect(self._import_progress)
+            self._importer.finished.connect(self._import_finished)
+        return self._importer
+
+    def import_files(self, jobs: Iterable[ImportJob]) -> List[ImportJob]:
+        """Queue raw data files for import into the project
+
+        Files are parsed in the background on a bounded pool of worker
+        threads, and written to the project's HDF5 file by a single writer.
+        As each file is imported its DataFile is added to the job's target
+        dataset (if any). Failed jobs are recorded in the importer's errors
+        list, and are reported to the user once all jobs have completed.
 
         Parameters
         ----------
-        datafile : :obj:`dgp.core.models.data.DataFile`
-            The DataFile reference object to be processed
-        data : DataFrame
-            The ingested pandas DataFrame to be dumped to the HDF5 store
+        jobs : Iterable[:class:`~dgp.core.batch_import.ImportJob`]
+
+        Returns
+        -------
+        List[ImportJob]
+            The submitted jobs
+        """
+        return self.importer.submit_all(jobs)
+
+    def _post_import(self, job: ImportJob, data: DataFrame) -> None:
+        """Slot called (in the GUI thread) once the data of an ImportJob has
+        been written to the project's HDF5 file
 
+        The DataFiles of the imported jobs are added to their datasets once
+        all submitted jobs have completed, see :meth:`_import_finished`.
         """
-        if HDF5Manager.save_data(data, datafile, path=self.hdfpath):
-            self.log.info("Data imported and saved to HDF5 Store")
-        dataset.add_datafile(datafile)
+        if job.dataset is not None:
+            self._imported_jobs.append(job)
+
+    def _import_failed(self, job: ImportJob, exception: Exception) -> None:
+        if not isinstance(exception, CancelledError):
+            self._import_failures.append(f"{job.path!s}: {exception!s}")
+
+    def _import_finished(self) -> None:
+        jobs, self._imported_jobs = self._imported_jobs, []
+        if jobs:
+            # Add the DataFiles of the whole import in a single batch, such
+            # that the datasets (and the project model) are updated once
+            with self.batch():
+                for job in jobs:
+                    job.dataset.add_datafile(job.datafile)
+                try:
+                    self.get_parent().project_mutated(self)
+                except AttributeError:
+                    self.log.warning(f"project {self.get_attr('name')} has no parent")
+
+        if not self._import_failures:
+            return
+        failures, self._import_failures = self._import_failures, []
+        show_error("Import Failed", f"{len(failures)} file(s) could not be imported.",
+                   detail='\n'.join(failures), parent=self.parent_widget)
+
+    def _import_progress(self, completed: int, total: int) -> None:
+        if self._import_event is None:
+            self._import_event = ProgressEvent(self.uid, modal=False,
+                                               receiver=self._importer.cancel)
+        event = self._import_event
+        event.label = f"Importing data files ({completed}/{total})"
+        event.stop = total
+        event.value = completed
+        if event.completed:
+            self._import_event = None
+        try:
+            self.get_parent().progressNotificationRequested.emit(event)
+        except AttributeError:
+            pass
+
+    def follow_file(self, job: ImportJob, interval: int = None) -> FileFollower:
+        """Follow a raw data file which is being written (e.g. in-flight)
+
+        Lines appended to the file are ingested as they are written (see
+        :class:`~dgp.core.file_follower.FileFollower`), and appended to the
+        job's DataFile in the project's HDF5 file. The DataFile is added to
+        the job's target dataset once data has first been ingested.
+
+        Parameters
+        ----------
+        job : :class:`~dgp.core.batch_import.ImportJob`
+        interval : int, optional
+            Polling interval in milliseconds
+
+        Returns
+        -------
+        FileFollower
+            The started follower, whose appended signal is emitted with each
+            chunk of new data
+        """
+        kwargs = dict(job.params)
+        if interval is not None:
+            kwargs['interval'] = interval
+        follower = FileFollower(job.path, job.method or PARSERS[job.datatype],
+                                datafile=job.datafile, hdfpath=self.hdfpath,
+                                **kwargs)
+        follower.appended.connect(functools.partial(self._post_follow, job))
+        self._followers.append(follower)
+        follower.start()
+        return follower
+
+    def unfollow_file(self, follower: FileFollower) -> None:
+        follower.stop()
+        if follower in self._followers:
+            self._followers.remove(follower)
+
+    def _post_follow(self, job: ImportJob, data: DataFrame) -> None:
+        if job.dataset is None:
+            return
+        if job.datafile in (job.dataset.entity.gravity, job.dataset.entity.trajectory):
+            job.dataset.data_appended(job.datafile)
+            return
+        job.dataset.add_datafile(job.datafile)
         try:
             self.get_parent().project_mutated(self)
         except AttributeError:
@@ -245,10 +390,9 @@ class AirborneProjectController(IAirborneController):
         """
         Project level dialog for importing/loading Gravity or Trajectory data
         files. The Dialog generates a DataFile and a parameter map (dict) which
-        is passed along to a FileLoader thread to ingest the raw data-file.
-        On completion of the FileLoader, AirborneProjectController._post_load is
-        called, which saves the ingested data to the project's HDF5 file, and
-        adds the DataFile object to the relevant parent.
+        is queued for import (see :meth:`import_files`) into the selected
+        dataset, or followed as it is written (see :meth:`follow_file`) if
+        the dialog's follow option is checked.
 
         Parameters
         ----------
@@ -261,23 +405,12 @@ class AirborneProjectController(IAirborneController):
 
         """
         def _on_load(datafile: DataFile, params: dict, parent: IDataSetController):
-            if datafile.group is DataType.GRAVITY:
-                method = read_at1a
-            elif datafile.group is DataType.TRAJECTORY:
-                method = import_trajectory
+            job = ImportJob(datafile.source_path, datafile.group, params,
+                            parent, datafile, dlg.method)
+            if dlg.follow:
+                self.follow_file(job)
             else:
-                self.log.error("Unrecognized data group: " + datafile.group)
-                return
-            progress_event = ProgressEvent(self.uid, f"Loading "
-                                                     f"{datafile.group.value}",
-                                           stop=0)
-            self.get_parent().progressNotificationRequested.emit(progress_event)
-            loader = FileLoader(datafile.source_path, method,
-                                parent=self.parent_widget, **params)
-            loader.loaded.connect(functools.partial(self._post_load, datafile,
-                                                    parent))
-            loader.finished.connect(lambda: self.get_parent().progressNotificationRequested.emit(progress_event))
-            loader.start()
+                self.import_files([job])
 
         dlg = DataImportDialog(self, datatype, parent=self.parent_widget)
         if flight is not None:
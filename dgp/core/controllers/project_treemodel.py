@@ -29,6 +29,12 @@ class ProjectTreeModel(QStandardItemModel):
 
     All signals/events should be connected via the model vs the View itself.
 
+    The children of project items may be populated lazily, items implementing
+    `can_fetch_more` and `fetch_more` (e.g. a FlightController, or the
+    Segments folder of a DataSet) are reported to have children by
+    :meth:`hasChildren`, and are populated by the view via :meth:`fetchMore`
+    when they are first expanded.
+
     Parameters
     ----------
     project : IAirborneController
@@ -47,11 +53,18 @@ class ProjectTreeModel(QStandardItemModel):
         Signal emitted to request a QProgressDialog from the main window.
         ProgressEvent is passed defining the parameters for the progress bar
 
+    Notes
+    -----
+    projectMutated is deferred between calls to :meth:`begin_batch` and
+    :meth:`end_batch` (see :meth:`VirtualBaseController.batch`)
+
     """
     def __init__(self, project: IAirborneController = None,
                  parent: Optional[QObject] = None):
         super().__init__(parent)
         self.log = logging.getLogger(__name__)
+        self._batch_depth = 0
+        self._batch_mutated = False
         if project is not None:
             self.appendRow(project)
             project.set_active(True)
@@ -99,6 +112,18 @@ class ProjectTreeModel(QStandardItemModel):
         self.removeRow(child.row())
         self.projectClosed.emit(child.uid)
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return self.canFetchMore(parent) or super().hasChildren(parent)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        item = self.itemFromIndex(parent)
+        return hasattr(item, 'can_fetch_more') and item.can_fetch_more()
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        item = self.itemFromIndex(parent)
+        if hasattr(item, 'fetch_more'):
+            item.fetch_more()
+
     def item_selected(self, index: QModelIndex):
         """Single-click handler for View events"""
         pass
@@ -121,12 +146,36 @@ class ProjectTreeModel(QStandardItemModel):
         self.tabOpenRequested.emit(item.uid, item)
 
     def project_mutated(self, project: IAirborneController):
-        self.projectMutated.emit()
+        if self._batch_depth:
+            self._batch_mutated = True
+        else:
+            self.projectMutated.emit()
+
+    def begin_batch(self) -> None:
+        """Begin a batch of changes, deferring projectMutated
+
+        Rows added/removed within a batch are signalled as usual (so that
+        views and proxies track them, and keep their state, e.g. expanded
+        items), but projectMutated is emitted once at the end of the
+        (outermost) batch if any project was mutated.
+        """
+        if self._batch_depth == 0:
+            self._batch_mutated = False
+        self._batch_depth += 1
+
+    def end_batch(self) -> None:
+        """End a batch of changes started by :meth:`begin_batch`"""
+        if self._batch_depth == 0:
+            return
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._batch_mutated:
+            self._batch_mutated = False
+            self.projectMutated.emit()
 
-    def save_projects(self):
+    def save_projects(self, compact=False):
         for i in range(self.rowCount()):
             prj: IAirborneController = self.item(i, 0)
-            prj.save()
+            prj.save(compact=compact)
 
     def import_gps(self):  # pragma: no cover
         if self.active_project is None:
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+import inspect
+import io
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from pandas import DataFrame, Index
+from pandas.api.types import CategoricalDtype
+
+from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.models.datafile import DataFile
+
+__all__ = ['FileFollower', 'RingBuffer']
+
+_log = logging.getLogger(__name__)
+
+# Default number of (most recent) rows retained in memory by a FileFollower
+RING_CAPACITY = 36000
+# Default interval (milliseconds) at which a followed file is polled
+POLL_INTERVAL = 1000
+
+
+class RingBuffer:
+    """Fixed capacity buffer of the most recent rows of a DataFrame
+
+    Column arrays (and the index) are allocated once, on the first append, and
+    appended rows overwrite the oldest rows once the buffer is full, such that
+    appending is independent of the amount of data retained.
+
+    Parameters
+    ----------
+    capacity : int
+        Maximum number of rows retained
+
+    """
+    def __init__(self, capacity: int = RING_CAPACITY):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be positive")
+        self._capacity = capacity
+        self._columns: Index = None
+        self._index: np.ndarray = None
+        self._index_dtype = None
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._head = 0  # Position of the next row to be written
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self):
+        return self._size
+
+    def clear(self) -> None:
+        self._columns = None
+        self._arrays = {}
+        self._head = self._size = 0
+
+    def append(self, data: DataFrame) -> None:
+        """Append the rows of data, discarding the oldest rows if required
+
+        Raises
+        ------
+        :exc:`ValueError`
+            If the columns of data differ from those previously appended
+        """
+        if self._columns is None:
+            self._columns = data.columns
+            self._index_dtype = data.index.dtype
+            self._index = np.empty(self._capacity, dtype=data.index.values.dtype)
+            self._arrays = {col: np.empty(self._capacity, dtype=data[col].values.dtype)
+                            for col in data.columns}
+        elif not self._columns.equals(data.columns):
+            raise ValueError("Appended columns do not match the buffer columns")
+
+        n = len(data)
+        start = max(0, n - self._capacity)
+        positions = (self._head + np.arange(n - start)) % self._capacity
+        self._index[positions] = data.index.values[start:]
+        for col, array in self._arrays.items():
+            array[positions] = data[col].values[start:]
+        self._head = (self._head + n - start) % self._capacity
+        self._size = min(self._capacity, self._size + n)
+
+    def frame(self) -> DataFrame:
+        """Return the retained rows (oldest first) as a DataFrame"""
+        if self._columns is None:
+            return DataFrame()
+        if self._size < self._capacity:
+            order = slice(0, self._size)
+        else:
+            order = np.roll(np.arange(self._capacity), -self._head)
+        return DataFrame({col: array[order] for col, array in self._arrays.items()},
+                         index=Index(self._index[order], dtype=self._index_dtype),
+                         columns=self._columns)
+
+
+class FileFollower(QObject):
+    """Follow a growing (e.g. in-flight) raw data file, ingesting the lines
+    appended to it
+
+    The file is polled (every `interval` ms once started, or by calling
+    :meth:`poll`), and only the complete lines appended since the previous
+    poll are read (from the byte offset reached by the previous poll) and
+    parsed with method(buffer, **kwargs). A partially written final line is
+    left for the next poll. Parsed rows are appended to an in-memory
+    :class:`RingBuffer` of the most recent `capacity` rows, and (if a
+    datafile and hdfpath are given) to the DataFile's data in the HDF5 file,
+    see :meth:`~dgp.core.hdf5_manager.HDF5Manager.append_data`.
+
+    Once started, the file is polled by a background thread, such that
+    reading, parsing and writing (which may wait for the HDF5 lock held by
+    a :class:`~dgp.core.batch_import.BatchImporter`) do not block the GUI.
+    As with the BatchImporter, signals are emitted from the polling thread
+    and are delivered (queued) to slots of the thread the follower lives in.
+
+    Gaps in the data are not filled within appended chunks (the parser's
+    fill_with_nans parameter is disabled by default), and chunks are cast to
+    the dtypes of the first chunk, such that the column dtypes are consistent
+    between chunks.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the followed file, which need not exist yet
+    method : Callable
+        Parser accepting a file-like object, e.g.
+        :func:`~dgp.lib.gravity_ingestor.read_at1a`
+    parent : QObject, optional
+    datafile : DataFile, optional
+    hdfpath : Path, optional
+        HDF5 file which the data of datafile is appended to
+    capacity : int, optional
+        Number of rows retained in the ring buffer
+    interval : int, optional
+        Polling interval in milliseconds
+    kwargs
+        Parameters of method, an integer skiprows is applied to the start of
+        the file only
+
+    Attributes
+    ----------
+    appended : pyqtSignal(DataFrame)
+        Emitted with the rows parsed by each poll which finds new lines
+    reset : pyqtSignal()
+        Emitted if the file is truncated (or replaced by a smaller file), in
+        which case the buffer is cleared and the file is read from the start
+    error : pyqtSignal(object)
+        Emitted with the exception raised if appended lines cannot be parsed
+        (the lines are skipped)
+
+    """
+    appended = pyqtSignal(DataFrame)
+    reset = pyqtSignal()
+    error = pyqtSignal(object)
+
+    def __init__(self, path: Path, method: Callable, parent=None,
+                 datafile: DataFile = None, hdfpath: Path = None,
+                 capacity: int = RING_CAPACITY, interval: int = POLL_INTERVAL,
+                 **kwargs):
+        super().__init__(parent=parent)
+        self._path = Path(path)
+        self._method = method
+        self._datafile = datafile
+        self._hdfpath = hdfpath
+        self._buffer = RingBuffer(capacity)
+
+        kwargs.setdefault('fill_with_nans', False)
+        skiprows = kwargs.pop('skiprows', None)
+        self._skiprows = skiprows if isinstance(skiprows, int) else 0
+        sig = inspect.signature(method)
+        self._kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters}
+        self._skip = self._skiprows
+        self._offset = 0
+        # dtypes of the first chunk, to which subsequent chunks are cast
+        self._dtypes: Dict[str, np.dtype] = None
+
+        self._interval = interval
+        self._thread: threading.Thread = None
+        self._stopped = threading.Event()
+        # Serializes polls, and guards the buffer (read by the GUI thread)
+        self._poll_lock = threading.Lock()
+        self._buffer_lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def offset(self) -> int:
+        """Byte offset in the file up to which lines have been read"""
+        return self._offset
+
+    @property
+    def buffer(self) -> RingBuffer:
+        return self._buffer
+
+    @property
+    def datafile(self) -> Optional[DataFile]:
+        return self._datafile
+
+    @property
+    def following(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Poll the file now, and every interval thereafter, in a background
+        thread"""
+        if self.following:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f'FileFollower-{self._path.name}')
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling, waiting for a poll in progress to complete"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def frame(self) -> DataFrame:
+        """Return the most recent rows retained in the ring buffer"""
+        with self._buffer_lock:
+            return self._buffer.frame()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.poll()
+            self._stopped.wait(self._interval / 1000)
+
+    def _read(self) -> bytes:
+        try:
+            size = self._path.stat().st_size
+        except FileNotFoundError:
+            return b''
+        if size < self._offset:
+            _log.warning(f"Followed file {self._path!s} was truncated, reading "
+                         f"from the start")
+            self._offset = 0
+            self._skip = self._skiprows
+            with self._buffer_lock:
+                self._buffer.clear()
+            self.reset.emit()
+        if size == self._offset:
+            return b''
+
+        with self._path.open('rb') as fd:
+            fd.seek(self._offset)
+            chunk = fd.read(size - self._offset)
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            return b''
+        chunk = chunk[:end + 1]
+        self._offset += len(chunk)
+
+        if self._skip:
+            parts = chunk.split(b'\n', self._skip)
+            if len(parts) <= self._skip:
+                self._skip -= chunk.count(b'\n')
+                return b''
+            chunk = parts[-1]
+            self._skip = 0
+        return chunk
+
+    def poll(self) -> int:
+        """Ingest the complete lines appended to the file since the last poll
+
+        Returns
+        -------
+        int
+            Number of rows ingested
+        """
+        with self._poll_lock:
+            return self._poll()
+
+    def _poll(self) -> int:
+        chunk = self._read()
+        if not chunk.strip():
+            return 0
+        try:
+            data = self._method(io.BytesIO(chunk), **self._kwargs)
+            if self._dtypes is None:
+                self._dtypes = {col: dtype for col, dtype in data.dtypes.items()
+                                if not isinstance(dtype, CategoricalDtype)}
+            else:
+                # e.g. compact dtypes may differ with the values in a chunk
+                data = data.astype(self._dtypes)
+            with self._buffer_lock:
+                self._buffer.append(data)
+            if self._datafile is not None and self._hdfpath is not None:
+                HDF5Manager.append_data(data, self._datafile, self._hdfpath)
+        except Exception as e:
+            _log.exception(f"Error ingesting data appended to {self._path!s}")
+            self.error.emit(e)
+            return 0
+        self.appended.emit(data)
+        return len(data)
@@ -2,29 +2,57 @@
 import inspect
 import logging
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
 
 from PyQt5.QtCore import QThread
 from PyQt5.QtCore import pyqtSignal
 from pandas import DataFrame
 
+from dgp.core.import_cache import ImportCache, import_cache
+
+_DEFAULT = object()
+
+
+def parse_file(path: Path, method: Callable, cache: Optional[ImportCache] = _DEFAULT,
+               **kwargs) -> DataFrame:
+    """Parse the file at path with method(path, **kwargs), via the import cache
+
+    Only the kwargs accepted by method are passed to it. The global
+    :func:`~dgp.core.import_cache.import_cache` is used unless a cache is
+    specified, pass cache=None to always parse the file.
+    """
+    if cache is _DEFAULT:
+        cache = import_cache()
+    sig = inspect.signature(method)
+    kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters}
+    if cache is None:
+        return method(str(path), **kwargs)
+    return cache.load_or_parse(path, method, **kwargs)
 
 class FileLoader(QThread):
+    """Thread which parses a data file with method(path, **kwargs)
+
+    Only the kwargs accepted by method are passed to it. The parsed frame is
+    looked up in (and on a miss stored to) an
+    :class:`~dgp.core.import_cache.ImportCache`, by default the global cache,
+    such that a file which has previously been parsed with the same
+    parameters is not parsed again. Pass cache=None to always parse the file.
+    """
     loaded = pyqtSignal(DataFrame, Path)
     error = pyqtSignal(object)
 
-    def __init__(self, path: Path, method: Callable, parent, **kwargs):
+    def __init__(self, path: Path, method: Callable, parent,
+                 cache: Optional[ImportCache] = _DEFAULT, **kwargs):
         super().__init__(parent=parent)
         self.log = logging.getLogger(__name__)
         self._path = Path(path)
         self._method = method
+        self._cache = cache
         self._kwargs = kwargs
 
     def run(self):
         try:
-            sig = inspect.signature(self._method)
-            kwargs = {k: v for k, v in self._kwargs.items() if k in sig.parameters}
-            result = self._method(str(self._path), **kwargs)
+            result = parse_file(self._path, self._method, self._cache, **self._kwargs)
         except Exception as e:
             self.log.exception("Error loading datafile: %s" % str(self._path))
             self.error.emit(e)
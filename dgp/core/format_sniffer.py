@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+import io
+import logging
+import re
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from dgp.core.types.enumerations import DataType, GPSFields, GravityTypes, MeterTypes
+from dgp.lib.gravity_ingestor import ZLS_COLUMN_WIDTHS, read_at1a, read_zls_file
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+__all__ = ['FileFormat', 'sniff_format', 'SNIFF_BYTES']
+
+_log = logging.getLogger(__name__)
+
+# Number of bytes read from the head of a file to infer its format
+SNIFF_BYTES = 4096
+# Candidate delimiters in order of preference, None is any whitespace
+_DELIMITERS = (',', None)
+SECONDS_PER_WEEK = 604800
+# Plausible GPS weeks (1980 - 2075), and MATLAB serial dates (1980 - 2100)
+_GPS_WEEKS = (0, 5000)
+_DATENUMS = (723181.0, 767011.0)
+_YEARS = (1980, 2100)
+
+_FIELD_PATTERNS = (
+    ('int', re.compile(r'[+-]?\d+$')),
+    ('float', re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')),
+    ('mdy', re.compile(r'\d{1,2}/\d{1,2}/\d{4}$')),
+    ('hms', re.compile(r'\d{1,2}:\d{2}:\d{2}(\.\d*)?$')),
+)
+# Trajectory column names, and the (lower case) fragments of header names
+# which identify them, in order of precedence
+_HEADER_ALIASES = (
+    ('num_sats', ('sat',)),
+    ('pdop', ('pdop',)),
+    ('ortho_ht', ('ortho',)),
+    ('lat', ('lat',)),
+    ('long', ('lon',)),
+    ('ell_ht', ('ell', 'elip')),
+)
+_TRAJECTORY_FIELDS = ['lat', 'long', 'ell_ht']
+
+
+class FileFormat:
+    """Parser configuration of a raw data file inferred by :func:`sniff_format`
+
+    Attributes
+    ----------
+    path : Path
+    datatype : DataType
+        Type of the data, None if the format was not recognized
+    meter : MeterTypes
+        Likely gravity meter type of gravity data
+    delimiter : str
+        Field delimiter, None for whitespace (or fixed width) delimited fields
+    ncolumns : int
+        Number of fields of each line
+    skiprows : int
+        Number of header lines
+    timeformat : str
+        'sow', 'hms' or 'serial' for trajectory data
+    columns : List[str]
+        Names of the columns passed to the parser (None to use its default)
+    line_count : int
+        Number of lines of the file, estimated from the sampled lines unless
+        the whole file was sampled (see exact_count)
+    exact_count : bool
+    preview : pd.DataFrame
+        Sampled lines parsed with the inferred configuration
+    errors : List[str]
+        Reasons candidate layouts were rejected
+
+    """
+    __slots__ = ('path', 'datatype', 'meter', 'delimiter', 'ncolumns', 'skiprows',
+                 'timeformat', 'columns', 'line_count', 'exact_count', 'preview',
+                 'errors')
+
+    def __init__(self, path: Path, line_count: int = 0, exact_count: bool = True):
+        self.path = path
+        self.datatype: DataType = None
+        self.meter: MeterTypes = None
+        self.delimiter: Optional[str] = ','
+        self.ncolumns = 0
+        self.skiprows = 0
+        self.timeformat: str = None
+        self.columns: List[str] = None
+        self.line_count = line_count
+        self.exact_count = exact_count
+        self.preview: pd.DataFrame = None
+        self.errors: List[str] = []
+
+    @property
+    def valid(self) -> bool:
+        return self.datatype is not None
+
+    @property
+    def has_header(self) -> bool:
+        return self.skiprows > 0
+
+    @property
+    def method(self) -> Optional[Callable[..., pd.DataFrame]]:
+        """Parser of the file, called as method(path, **params)"""
+        if self.meter is MeterTypes.ZLS:
+            return read_zls_file
+        return {DataType.GRAVITY: read_at1a,
+                DataType.TRAJECTORY: import_trajectory}.get(self.datatype)
+
+    @property
+    def params(self) -> dict:
+        """Keyword parameters of :attr:`method` to parse the file"""
+        if not self.valid or self.meter is MeterTypes.ZLS:
+            return {}
+        params = {'columns': self.columns, 'skiprows': self.skiprows}
+        if self.datatype is DataType.TRAJECTORY:
+            params['timeformat'] = self.timeformat
+            params['delim_whitespace'] = self.delimiter is None
+        return params
+
+    def __repr__(self):
+        if not self.valid:
+            return f'<FileFormat {self.path!s} not recognized>'
+        kind = self.meter.value if self.meter else self.timeformat
+        return (f'<FileFormat {self.path!s} {self.datatype.value} ({kind}) '
+                f'{self.ncolumns} columns>')
+
+
+def _sample(path: Path, nbytes: int) -> Tuple[FileFormat, List[str]]:
+    with path.open('rb') as fd:
+        head = fd.read(nbytes)
+        size = fd.seek(0, io.SEEK_END)
+    if len(head) < size:
+        # Discard the partial last line
+        head = head[:head.rfind(b'\n') + 1]
+    lines = [line for line in head.decode('latin-1').splitlines() if line.strip()]
+    fmt = FileFormat(path, len(lines), exact_count=len(head) >= size)
+    if not fmt.exact_count and head:
+        fmt.line_count = int(round(size * len(lines) / len(head)))
+    return fmt, lines
+
+
+def _split(line: str, delimiter: Optional[str]) -> List[str]:
+    return [field.strip() for field in line.split(delimiter)]
+
+
+def _kind(field: str) -> str:
+    for kind, pattern in _FIELD_PATTERNS:
+        if pattern.match(field):
+            return kind
+    return 'text'
+
+
+def _column_kind(kinds: set) -> str:
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    if kinds == {'int', 'float'}:
+        return 'float'
+    return 'text'
+
+
+def _is_data(fields: List[str]) -> bool:
+    return sum(_kind(field) != 'text' for field in fields) * 2 >= len(fields)
+
+
+def _header_columns(header: List[str], start: int) -> List[Optional[str]]:
+    columns = []
+    for name in header[start:]:
+        name = name.lower()
+        match = next((column for column, fragments in _HEADER_ALIASES
+                      if any(fragment in name for fragment in fragments)), None)
+        columns.append(match if match not in columns else None)
+    return columns
+
+
+def _sniff_zls(fmt: FileFormat, lines: List[str]) -> bool:
+    if any(',' in line for line in lines):
+        return False
+    try:
+        df = pd.read_fwf(io.StringIO('\n'.join(lines)), widths=ZLS_COLUMN_WIDTHS,
+                         names=list(GravityTypes.ZLS.value))
+        times = df[['year', 'day', 'hour', 'minute', 'second']].astype(np.int64)
+    except (ValueError, TypeError) as e:
+        fmt.errors.append(f'ZLS: {e!s}')
+        return False
+    bounds = ((_YEARS[0], _YEARS[1]), (1, 366), (0, 23), (0, 59), (0, 59))
+    for col, (lower, upper) in zip(times.columns, bounds):
+        if not times[col].between(lower, upper).all():
+            fmt.errors.append(f'ZLS: {col} out of range')
+            return False
+    fmt.datatype = DataType.GRAVITY
+    fmt.meter = MeterTypes.ZLS
+    fmt.delimiter = None
+    fmt.ncolumns = len(ZLS_COLUMN_WIDTHS)
+    try:
+        fmt.preview = fmt.method(io.StringIO('\n'.join(lines)), **fmt.params)
+    except Exception as e:
+        fmt.errors.append(f'ZLS: {e!s}')
+        fmt.datatype = fmt.meter = None
+        return False
+    return True
+
+
+def _candidates(kinds: List[str], values: dict, header: Optional[List[str]]):
+    """Generate the candidate layouts (datatype, meter, timeformat, columns)
+    of fields of kinds, most specific first"""
+    ncolumns = len(kinds)
+
+    def within(col, bounds):
+        return col in values and bounds[0] <= values[col].min() and \
+               values[col].max() < bounds[1]
+
+    if (ncolumns == len(GravityTypes.AT1A.value) and kinds[5] == 'int'
+            and kinds[8] == 'int' and within(8, _GPS_WEEKS)
+            and within(9, (0, SECONDS_PER_WEEK))
+            and all(kind in ('int', 'float') for kind in kinds)):
+        yield DataType.GRAVITY, MeterTypes.AT1A, None, None
+
+    for timeformat in GPSFields:
+        fields = timeformat.value[:-len(_TRAJECTORY_FIELDS)]
+        # The time fields are followed by (at least) latitude and longitude
+        for i in range(ncolumns - len(fields) - 1):
+            if timeformat is GPSFields.sow:
+                found = (kinds[i] == 'int' and within(i, (1, _GPS_WEEKS[1]))
+                         and within(i + 1, (0, SECONDS_PER_WEEK)))
+            elif timeformat is GPSFields.hms:
+                found = kinds[i] == 'mdy' and kinds[i + 1] == 'hms'
+            else:
+                found = kinds[i] == 'float' and within(i, _DATENUMS)
+            if not found:
+                continue
+            start = i + len(fields)
+            columns = None
+            if header is not None:
+                columns = _header_columns(header, start)
+                if 'lat' not in columns or 'long' not in columns:
+                    columns = None
+            if columns is None:
+                columns = _TRAJECTORY_FIELDS[:ncolumns - start]
+                columns += [None] * (ncolumns - start - len(columns))
+            yield (DataType.TRAJECTORY, None, timeformat.name,
+                   [None] * i + list(fields) + columns)
+            break
+
+
+def sniff_format(path: Union[str, Path], nbytes: int = SNIFF_BYTES,
+                 datatype: DataType = None) -> FileFormat:
+    """Infer the parser configuration of a raw gravity or trajectory file from
+    its first nbytes
+
+    The delimiter, number of columns and number of header lines are inferred
+    from the sampled lines, and the kind of each field (integer, float, date,
+    time or text). Candidate layouts are matched against the fields: a DGS
+    AT1A/AT1M gravity file (GPS week and seconds of week in the last two of ten
+    numeric columns), a ZLS gravity file (fixed width), and trajectory files
+    with 'sow' (GPS week, seconds of week), 'hms' (date, time) or 'serial'
+    (MATLAB datenum) timestamps; trajectory column names are taken from the
+    header if there is one. Each candidate is validated by parsing the sampled
+    lines with its parser, and the first which yields plausible timestamps is
+    returned, with the parsed lines as a preview.
+
+    Parameters
+    ----------
+    path : str or Path
+    nbytes : int, optional
+        Number of bytes sampled from the head of the file
+    datatype : DataType, optional
+        Consider only layouts of datatype
+
+    Returns
+    -------
+    FileFormat
+        The inferred format, invalid (see :attr:`FileFormat.errors`) if no
+        candidate layout matched
+
+    Raises
+    ------
+    :exc:`OSError`
+        If path cannot be read
+
+    """
+    fmt, lines = _sample(Path(path), nbytes)
+    if len(lines) < 2:
+        fmt.errors.append('Too few lines sampled')
+        return fmt
+    if datatype in (None, DataType.GRAVITY) and _sniff_zls(fmt, lines):
+        return fmt
+
+    for delimiter in _DELIMITERS:
+        rows = [_split(line, delimiter) for line in lines]
+        skiprows = next((i for i, fields in enumerate(rows) if _is_data(fields)), len(rows))
+        data = rows[skiprows:]
+        ncolumns = len(data[0]) if data else 0
+        if ncolumns < 2 or any(len(fields) != ncolumns for fields in data):
+            continue
+
+        kinds = [_column_kind({_kind(field) for field in column}) for column in zip(*data)]
+        values = {i: np.array([float(fields[i]) for fields in data])
+                  for i, kind in enumerate(kinds) if kind in ('int', 'float')}
+        header = rows[skiprows - 1] if skiprows else None
+        if header is not None and len(header) != ncolumns:
+            header = None
+        sample = io.StringIO('\n'.join(lines))
+
+        for group, meter, timeformat, columns in _candidates(kinds, values, header):
+            if datatype is not None and group is not datatype:
+                continue
+            fmt.datatype, fmt.meter, fmt.timeformat = group, meter, timeformat
+            fmt.delimiter, fmt.ncolumns = delimiter, ncolumns
+            fmt.skiprows, fmt.columns = skiprows, columns
+            name = meter.value if meter else timeformat
+            try:
+                sample.seek(0)
+                preview = fmt.method(sample, fill_with_nans=False, **fmt.params)
+            except Exception as e:
+                fmt.errors.append(f'{name}: {e!s}')
+                continue
+            years = preview.index.year
+            if len(preview) and _YEARS[0] <= years.min() and years.max() <= _YEARS[1]:
+                fmt.preview = preview
+                return fmt
+            fmt.errors.append(f'{name}: timestamps out of range')
+
+    fmt.datatype = fmt.meter = fmt.timeformat = fmt.columns = None
+    fmt.delimiter, fmt.ncolumns, fmt.skiprows = ',', 0, 0
+    _log.debug(f"Unable to infer the format of {path!s}: {fmt.errors}")
+    return fmt
@@ -1,22 +1,51 @@
 # -*- coding: utf-8 -*-
+import functools
 import logging
+import threading
 import warnings
 from pathlib import Path
-from typing import Any
+from typing import Any, Union, Dict, Iterable
 
+import numpy as np
 import tables
+import pandas as pd
 import pandas.io.pytables
-from pandas import HDFStore, DataFrame
+from pandas import HDFStore, DataFrame, DatetimeIndex, Timestamp
+from pandas.api.types import CategoricalDtype
 
 from dgp.core.models.datafile import DataFile
+from dgp.core import DataType
+from dgp.lib.decimation import build_levels, PYRAMID_FACTORS
+from dgp.lib.gap_index import GapIndex
 
-__all__ = ['HDF5Manager']
+__all__ = ['HDF5Manager', 'HDF5_LOCK']
 # Suppress PyTables warnings due to mixed data-types (typically NaN's in cols)
 warnings.filterwarnings('ignore',
                         category=pandas.io.pytables.PerformanceWarning)
 
 # Define Data Types/Extensions
 HDF5_NAME = 'dgpdata.hdf5'
+# HDF5 group under which computed (transform) results are stored
+RESULT_GROUP = 'transform'
+# HDF5 group under which decimated (min/max) data levels are stored
+PYRAMID_GROUP = 'pyramid'
+# HDF5 group under which the runs (GapIndex) of imported data are stored
+GAPS_GROUP = 'gaps'
+# Lock serializing all access to HDF5 files in the process (the project store
+# and the import cache), as HDF5 (and PyTables) may not be built thread-safe
+HDF5_LOCK = threading.RLock()
+# Summary metadata attributes recorded on each DataFile node by save_data
+METADATA_ATTRS = ('start', 'end', 'sample_rate', 'rows', 'columns', 'dtypes',
+                  'nbytes', 'minimum', 'maximum')
+
+
+def _synchronized(method):
+    """Serialize calls of an HDF5Manager classmethod on the HDF5 lock"""
+    @functools.wraps(method)
+    def wrapper(cls, *args, **kwargs):
+        with cls._lock:
+            return method(cls, *args, **kwargs)
+    return wrapper
 
 
 class HDF5Manager:
@@ -36,11 +65,21 @@ class HDF5Manager:
     HDF5Manager also provides utility methods to allow read/write of metadata attributes
     on a particular node within the HDF5 file.
 
+    Data may be saved from worker threads (e.g. by a
+    :class:`~dgp.core.batch_import.BatchImporter`) while the GUI thread loads
+    data. An HDF5 file cannot be opened while it is open for writing, and the
+    HDF5 library may not be thread-safe, so all access to the store (and to
+    the caches) is serialized on the re-entrant :data:`HDF5_LOCK`, which is
+    shared with the :class:`~dgp.core.import_cache.ImportCache`.
+
     """
     log = logging.getLogger(__name__)
+    _lock = HDF5_LOCK
     _cache = {}
+    _levels_cache = {}
 
     @classmethod
+    @_synchronized
     def save_data(cls, data: DataFrame, datafile: DataFile, path: Path) -> bool:
         """
         Save a Pandas Series or DataFrame to the HDF5 Store
@@ -73,16 +112,216 @@ class HDF5Manager:
 
         with HDFStore(str(path)) as hdf:
             try:
-                hdf.put(datafile.nodepath, data, format='fixed', data_columns=True)
+                hdf.put(datafile.nodepath, data, format=cls.storage_format(data),
+                        data_columns=True)
             except (IOError, PermissionError):  # pragma: no cover
                 cls.log.exception("Exception writing file to HDF5 _store.")
                 raise
             else:
                 cls.log.info(f"Wrote file to HDF5 _store at node: {datafile.nodepath}")
+            # The levels and runs of previously saved data do not describe data
+            levels_group = cls.levels_group(datafile)
+            if levels_group in hdf:
+                hdf.remove(levels_group)
+            gaps_nodepath = cls.gaps_nodepath(datafile)
+            if gaps_nodepath in hdf:
+                hdf.remove(gaps_nodepath)
 
+        cls._levels_cache.pop(datafile, None)
+        cls._set_node_attrs(datafile.nodepath, cls.summarize(data), path)
         return True
 
+    @staticmethod
+    def storage_format(data: DataFrame) -> str:
+        """Return the HDFStore format used to store data
+
+        The fixed format is used unless data has categorical columns, which
+        can only be stored in the table format.
+        """
+        if any(isinstance(dtype, CategoricalDtype) for dtype in data.dtypes):
+            return 'table'
+        return 'fixed'
+
+    @classmethod
+    @_synchronized
+    def append_data(cls, data: DataFrame, datafile: DataFile, path: Path) -> bool:
+        """
+        Append rows to the data of a DataFile in the HDF5 Store
+
+        The data is stored in the (appendable) table format, data previously
+        stored by :meth:`save_data` is converted on the first append. The
+        cached data, decimated levels and summary metadata of the DataFile
+        are updated accordingly. Stored results computed from the DataFile
+        (i.e. those recording its UID under its group, see :meth:`save_result`)
+        are removed.
+
+        Parameters
+        ----------
+        data : DataFrame
+            Rows to append, with the same columns (and dtypes) as the stored data
+        datafile : DataFile
+        path : Path
+            Path to the HDF5 file
+
+        Returns
+        -------
+        bool:
+            True on successful append
+
+        """
+        nodepath = datafile.nodepath
+        summary = cls.summarize(data)
+        with HDFStore(str(path)) as hdf:
+            if nodepath in hdf:
+                storer = hdf.get_storer(nodepath)
+                previous = {name: getattr(storer.attrs, name, None)
+                            for name in METADATA_ATTRS}
+                if not storer.is_table:
+                    existing = hdf.get(nodepath)
+                    hdf.remove(nodepath)
+                    hdf.append(nodepath, existing, format='table')
+                summary = cls._merge_summaries(previous, summary)
+            hdf.append(nodepath, data, format='table')
+            levels_group = cls.levels_group(datafile)
+            if levels_group in hdf:
+                hdf.remove(levels_group)
+            # The stored runs no longer describe the data, they are computed
+            # from the data when next required
+            gaps_nodepath = cls.gaps_nodepath(datafile)
+            if gaps_nodepath in hdf:
+                hdf.remove(gaps_nodepath)
+            source = {datafile.group.value: datafile.uid.base_uuid}
+            for stale in list(cls._find_results(hdf, **source)):
+                cls.log.debug(f"Removing result node {stale} of appended data")
+                hdf.remove(stale)
+
+        if datafile in cls._cache:
+            cls._cache[datafile] = pd.concat([cls._cache[datafile], data])
+        cls._levels_cache.pop(datafile, None)
+        cls._set_node_attrs(nodepath, summary, path)
+        cls.log.debug(f"Appended {len(data)} rows to node {nodepath}")
+        return True
+
+    @staticmethod
+    def _merge_summaries(previous: Dict[str, Any], summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the summary metadata of stored data with that of appended rows"""
+        if previous.get('rows') is None:
+            return summary
+        merged = dict(summary)
+        for key, func in (('start', min), ('end', max)):
+            values = [v for v in (previous[key], summary[key]) if v is not None]
+            merged[key] = func(values) if values else None
+        merged['sample_rate'] = previous['sample_rate'] or summary['sample_rate']
+        merged['rows'] = previous['rows'] + summary['rows']
+        merged['nbytes'] = (previous['nbytes'] or 0) + summary['nbytes']
+        for key, func in (('minimum', min), ('maximum', max)):
+            values = dict(previous[key] or {})
+            for col, value in summary[key].items():
+                values[col] = func(values[col], value) if col in values else value
+            merged[key] = values
+        return merged
+
+    @staticmethod
+    def summarize(data: DataFrame) -> Dict[str, Any]:
+        """Generate the summary metadata recorded for a DataFrame by save_data
+
+        Time-span (start/end) values are stored as integer nanoseconds since
+        the epoch, and sample_rate in Hz; these are None if the frame is not
+        indexed by time. Minimum/maximum values are computed only for numeric
+        columns.
+
+        Parameters
+        ----------
+        data : DataFrame
+
+        Returns
+        -------
+        dict
+            Dictionary keyed by the names declared in :data:`METADATA_ATTRS`
+
+        """
+        start = end = rate = None
+        if isinstance(data.index, DatetimeIndex) and len(data.index):
+            ticks = data.index.asi8
+            start, end = int(ticks[0]), int(ticks[-1])
+            if len(ticks) > 1:
+                period = np.median(np.diff(ticks))
+                rate = float(1e9 / period) if period > 0 else None
+
+        numeric = data.select_dtypes(include=[np.number])
+        return {
+            'start': start,
+            'end': end,
+            'sample_rate': rate,
+            'rows': len(data),
+            'columns': [str(col) for col in data.columns],
+            'dtypes': {str(col): str(dtype) for col, dtype in data.dtypes.items()},
+            'nbytes': int(data.memory_usage(index=True).sum()),
+            'minimum': {str(k): float(v) for k, v in numeric.min().items()},
+            'maximum': {str(k): float(v) for k, v in numeric.max().items()}
+        }
+
+    @classmethod
+    def get_metadata(cls, datafile: DataFile, path: Path) -> Dict[str, Any]:
+        """Get the summary metadata for a single DataFile without loading
+        its data
+
+        Raises
+        ------
+        KeyError
+            If the DataFile node does not exist (or has no recorded metadata)
+
+        """
+        try:
+            return cls.read_metadata(path)[datafile.nodepath]
+        except (FileNotFoundError, KeyError):
+            raise KeyError(f"No metadata for node {datafile.nodepath}")
+
     @classmethod
+    @_synchronized
+    def read_metadata(cls, path: Path) -> Dict[str, Dict[str, Any]]:
+        """Read the summary metadata of all DataFile nodes in the HDF5 file
+
+        This reads only the node attributes recorded by :meth:`save_data`, in a
+        single pass (one file open), it does not touch the bulk data. This is
+        intended to provide a fast overview (time coverage, channels, sizes) of
+        the data in a project.
+
+        Returns
+        -------
+        Dict[str, Dict]
+            Mapping of node path to its metadata dictionary, start and end are
+            converted to :class:`pandas.Timestamp`
+
+        Raises
+        ------
+        :exc:`FileNotFoundError`
+            If the HDF5 file does not exist
+
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"HDF5 file {path!s} does not exist")
+        metadata = {}
+        with tables.open_file(str(path), mode='r') as hdf:
+            for group in DataType:
+                try:
+                    parent = hdf.get_node(f'/{group.value}')
+                except tables.exceptions.NoSuchNodeError:
+                    continue
+                for node in parent._v_children.values():
+                    attrs = node._v_attrs
+                    if 'rows' not in attrs._v_attrnames:
+                        continue  # Stored before metadata was recorded
+                    meta = {name: getattr(attrs, name, None)
+                            for name in METADATA_ATTRS}
+                    for key in ('start', 'end'):
+                        if meta[key] is not None:
+                            meta[key] = Timestamp(meta[key])
+                    metadata[node._v_pathname] = meta
+        return metadata
+
+    @classmethod
+    @_synchronized
     def load_data(cls, datafile: DataFile, path: Path) -> DataFrame:
         """
         Load data from a managed repository by UID
@@ -127,16 +366,252 @@ class HDF5Manager:
             cls._cache[datafile] = data
             return data
 
+    @staticmethod
+    def levels_group(datafile: DataFile) -> str:
+        """Return the HDF5 group path of the decimated levels of a DataFile"""
+        return f'/{PYRAMID_GROUP}/_{datafile.uid.base_uuid}'
+
+    @classmethod
+    def levels_nodepath(cls, datafile: DataFile, factor: int) -> str:
+        """Return the HDF5 node path of a decimated level of a DataFile"""
+        return f'{cls.levels_group(datafile)}/x{factor:d}'
+
+    @classmethod
+    @_synchronized
+    def save_levels(cls, levels: Dict[int, DataFrame], datafile: DataFile,
+                    path: Path) -> bool:
+        """Save the decimated levels (see :func:`dgp.lib.decimation.build_levels`)
+        of a DataFile's data to the HDF5 Store alongside the raw data.
+
+        The levels are removed when the data is re-saved or appended to.
+        """
+        with HDFStore(str(path)) as hdf:
+            for factor, level in levels.items():
+                hdf.put(cls.levels_nodepath(datafile, factor), level,
+                        format='fixed')
+        cls._levels_cache[datafile] = levels
+        cls.log.info(f"Wrote {len(levels)} decimated levels for node "
+                     f"{datafile.nodepath}")
+        return True
+
+    @classmethod
+    @_synchronized
+    def load_levels(cls, datafile: DataFile, path: Path,
+                    factors: Iterable[int] = PYRAMID_FACTORS) -> Dict[int, DataFrame]:
+        """Load the decimated levels of a DataFile's data
+
+        Levels are built when data is imported (see
+        :class:`~dgp.core.batch_import.BatchImporter`), otherwise (e.g. after
+        rows have been appended) they are built lazily: if they do not yet
+        exist in the HDF5 file the raw data is loaded, decimated, and the
+        levels are stored for subsequent use.
+
+        Returns
+        -------
+        Dict[int, DataFrame]
+            Mapping of decimation factor to the decimated (min/max) frame
+
+        Raises
+        ------
+        KeyError
+            If the DataFile has no data in the store
+        """
+        factors = tuple(factors)
+        levels = cls._levels_cache.get(datafile, {})
+        if all(factor in levels for factor in factors):
+            return {factor: levels[factor] for factor in factors}
+
+        levels = {}
+        try:
+            with HDFStore(str(path), mode='r') as hdf:
+                for factor in factors:
+                    nodepath = cls.levels_nodepath(datafile, factor)
+                    if nodepath in hdf:
+                        levels[factor] = hdf.get(nodepath)
+        except OSError as e:
+            cls.log.exception(e)
+            raise FileNotFoundError from e
+
+        missing = [factor for factor in factors if factor not in levels]
+        if missing:
+            cls.log.debug(f"Building decimated levels {missing} for node "
+                          f"{datafile.nodepath}")
+            built = build_levels(cls.load_data(datafile, path), missing)
+            cls.save_levels(built, datafile, path)
+            levels.update(built)
+
+        cls._levels_cache[datafile] = levels
+        return levels
+
+    @staticmethod
+    def gaps_nodepath(datafile: DataFile) -> str:
+        """Return the HDF5 node path of the runs (GapIndex) of a DataFile"""
+        return f'/{GAPS_GROUP}/_{datafile.uid.base_uuid}'
+
+    @classmethod
+    @_synchronized
+    def save_gap_index(cls, gap_index: GapIndex, datafile: DataFile, path: Path) -> bool:
+        """Save the runs of a DataFile's data (as returned by the ingestors
+        with gaps=True) to the HDF5 Store alongside the raw data
+
+        The runs are removed when the data is re-saved or appended to.
+        """
+        with HDFStore(str(path)) as hdf:
+            hdf.put(cls.gaps_nodepath(datafile), gap_index.runs(), format='fixed')
+        cls.log.debug(f"Wrote {len(gap_index)} runs for node {datafile.nodepath}")
+        return True
+
+    @classmethod
+    @_synchronized
+    def load_gap_index(cls, datafile: DataFile, path: Path) -> Union[GapIndex, None]:
+        """Load the stored runs of a DataFile's data
+
+        Returns
+        -------
+        GapIndex or None
+            None if no runs are stored for the DataFile (or the HDF5 file
+            does not exist)
+        """
+        if not Path(path).exists():
+            return None
+        nodepath = cls.gaps_nodepath(datafile)
+        try:
+            with HDFStore(str(path), mode='r') as hdf:
+                if nodepath not in hdf:
+                    return None
+                return GapIndex.from_runs(hdf.get(nodepath))
+        except OSError:
+            cls.log.exception(f"Unable to read runs node {nodepath}")
+            return None
+
     @classmethod
     def delete_data(cls, file: DataFile, path: Path) -> bool:
         raise NotImplementedError
 
+    @staticmethod
+    def result_nodepath(key: str) -> str:
+        """Return the HDF5 node path where a result identified by key is stored
+
+        An underscore (_) is prepended to the key for the same reason as
+        :attr:`DataFile.nodepath`, keys may begin with a number.
+        """
+        return f'/{RESULT_GROUP}/_{key}'
+
+    @classmethod
+    @_synchronized
+    def save_result(cls, data: DataFrame, key: str, path: Path,
+                    **provenance) -> bool:
+        """Save a computed result (e.g. the output of a transform graph) to
+        the HDF5 Store under a node derived from its provenance key.
+
+        Any previously stored results whose provenance attributes match those
+        supplied (e.g. the same dataset and graph) but whose key differs are
+        stale, and are removed from the store.
+
+        Parameters
+        ----------
+        data : DataFrame
+            The computed result to store
+        key : str
+            Provenance key (hash) uniquely identifying the inputs, graph and
+            parameters which produced data
+        path : Path
+            Path to the HDF5 file
+        **provenance
+            Key/value pairs to record as attributes on the result node, these
+            are used to identify stale results produced by the same source.
+            The UIDs of the input DataFiles should be recorded under their
+            group (e.g. gravity=<uid>), so that appending to an input
+            invalidates the result.
+
+        Returns
+        -------
+        bool:
+            True on successful save
+
+        """
+        nodepath = cls.result_nodepath(key)
+        with HDFStore(str(path)) as hdf:
+            for stale in list(cls._find_results(hdf, **provenance)):
+                if stale != nodepath:
+                    cls.log.debug(f"Removing stale result node {stale}")
+                    hdf.remove(stale)
+            try:
+                hdf.put(nodepath, data, format='fixed')
+            except (IOError, PermissionError):  # pragma: no cover
+                cls.log.exception("Exception writing result to HDF5 _store.")
+                raise
+            attrs = hdf.get_storer(nodepath).attrs
+            attrs.provenance_key = key
+            for name, value in provenance.items():
+                setattr(attrs, name, value)
+        cls.log.info(f"Wrote result to HDF5 _store at node: {nodepath}")
+        return True
+
+    @classmethod
+    @_synchronized
+    def load_result(cls, key: str, path: Path) -> Union[DataFrame, None]:
+        """Load a previously computed result by its provenance key
+
+        Returns
+        -------
+        DataFrame or None
+            The stored result, or None if no result exists for the key (or the
+            HDF5 file does not exist)
+
+        """
+        if not Path(path).exists():
+            return None
+        nodepath = cls.result_nodepath(key)
+        try:
+            with HDFStore(str(path), mode='r') as hdf:
+                if nodepath not in hdf:
+                    return None
+                cls.log.debug(f"Loading result node {nodepath} from hdf5store.")
+                return hdf.get(nodepath)
+        except OSError:
+            cls.log.exception(f"Unable to read result node {nodepath}")
+            return None
+
+    @classmethod
+    @_synchronized
+    def invalidate_results(cls, path: Path, **provenance) -> int:
+        """Remove all stored results whose provenance attributes match the
+        supplied key/value pairs.
+
+        Returns
+        -------
+        int
+            Count of result nodes removed
+
+        """
+        if not Path(path).exists():
+            return 0
+        with HDFStore(str(path)) as hdf:
+            stale = list(cls._find_results(hdf, **provenance))
+            for nodepath in stale:
+                hdf.remove(nodepath)
+        return len(stale)
+
+    @classmethod
+    def _find_results(cls, hdf: HDFStore, **provenance):
+        """Yield node paths of results in an open store matching provenance"""
+        if f'/{RESULT_GROUP}' not in hdf:
+            return
+        group = hdf.get_node(f'/{RESULT_GROUP}')
+        for name in list(group._v_children):
+            nodepath = f'/{RESULT_GROUP}/{name}'
+            attrs = hdf.get_storer(nodepath).attrs
+            if all(getattr(attrs, k, None) == v for k, v in provenance.items()):
+                yield nodepath
+
     # See https://www.pytables.org/usersguide/libref/file_class.html#tables.File.set_node_attr
     # For more details on setting/retrieving metadata from hdf5 file using pytables
     # Note that the _v_ and _f_ prefixes are meant for instance variables and public methods
     # within pytables - so the inspection warning can be safely ignored
 
     @classmethod
+    @_synchronized
     def list_node_attrs(cls, nodepath: str, path: Path) -> list:
         with tables.open_file(str(path), mode='r') as hdf:
             try:
@@ -145,6 +620,7 @@ class HDF5Manager:
                 raise KeyError(f"Specified node {nodepath} does not exist.")
 
     @classmethod
+    @_synchronized
     def _get_node_attr(cls, nodepath, attrname, path: Path):
         with tables.open_file(str(path), mode='r') as hdf:
             try:
@@ -154,15 +630,23 @@ class HDF5Manager:
 
     @classmethod
     def _set_node_attr(cls, nodepath: str, attrname: str, value: Any, path: Path):
+        return cls._set_node_attrs(nodepath, {attrname: value}, path)
+
+    @classmethod
+    @_synchronized
+    def _set_node_attrs(cls, nodepath: str, attrs: Dict[str, Any], path: Path):
         with tables.open_file(str(path), 'a') as hdf:
             try:
-                hdf.set_node_attr(nodepath, attrname, value)
+                for attrname, value in attrs.items():
+                    hdf.set_node_attr(nodepath, attrname, value)
             except tables.exceptions.NoSuchNodeError:
                 raise KeyError(f"Specified node {nodepath} does not exist")
             else:
                 return True
 
     @classmethod
+    @_synchronized
     def clear_cache(cls):
         del cls._cache
         cls._cache = {}
+        cls._levels_cache = {}
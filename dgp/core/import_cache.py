@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import os
+import threading
+import warnings
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+from pandas import DataFrame, HDFStore
+from pandas.errors import PerformanceWarning
+
+from dgp.core.hdf5_manager import HDF5Manager, HDF5_LOCK
+from dgp.lib.gap_index import GapIndex
+
+__all__ = ['ImportCache', 'import_cache', 'set_import_cache', 'default_cache_path']
+
+_log = logging.getLogger(__name__)
+
+# Incremented when the ingestors change such that previously cached frames
+# are no longer valid
+CACHE_VERSION = 4
+# Number of bytes read from each of the head and tail of a source file
+FINGERPRINT_BYTES = 65536
+# Default upper bound of the total size of the cache directory
+MAX_CACHE_BYTES = 2 * 1024 ** 3
+CACHE_SUFFIX = '.h5'
+_NODE = 'data'
+# Node of the runs of the data, if the parser also returned its GapIndex
+_GAPS_NODE = 'gaps'
+
+
+def _qualified_name(method: Callable) -> str:
+    module = getattr(method, '__module__', None) or ''
+    name = getattr(method, '__qualname__', None) or repr(method)
+    return f'{module}.{name}'
+
+
+class ImportCache:
+    """Cache of the DataFrames produced by parsing raw data files
+
+    Parsing a raw ASCII gravity or trajectory file is expensive, and the same
+    source file is often imported into several projects or datasets. The
+    parsed frame is stored (in a compressed HDF5 file per entry) keyed by a
+    fingerprint of the source file and of the parser, such that a subsequent
+    import of the same file with the same parameters is a binary load.
+
+    The fingerprint is computed from the size and modification time of the
+    source file, a hash of its first and last :data:`FINGERPRINT_BYTES`, the
+    qualified name of the parsing method, and its (keyword) parameters.
+    Changing any of these results in a cache miss.
+
+    The cache is bounded by `max_bytes`; the least recently used entries are
+    evicted when an entry is stored which exceeds the bound.
+
+    Parameters
+    ----------
+    path : Path
+        Directory in which cache entries are stored, created if required
+    max_bytes : int, optional
+        Upper bound of the total size of the cache entries
+
+    """
+    # Entries are read/written by parser worker threads while the project
+    # store is written, all HDF5 access is serialized on a single lock
+    _lock = HDF5_LOCK
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = MAX_CACHE_BYTES):
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def fingerprint(source: Union[str, Path], method: Callable, **params) -> str:
+        """Compute the cache key of parsing source with method(**params)
+
+        Raises
+        ------
+        :exc:`OSError`
+            If source cannot be read
+
+        """
+        source = Path(source)
+        stat = source.stat()
+        digest = hashlib.sha1()
+        header = (CACHE_VERSION, stat.st_size, stat.st_mtime_ns,
+                  _qualified_name(method), sorted(params.items()))
+        digest.update(repr(header).encode('utf-8'))
+        with source.open('rb') as fd:
+            digest.update(fd.read(FINGERPRINT_BYTES))
+            if stat.st_size > FINGERPRINT_BYTES:
+                fd.seek(max(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES))
+                digest.update(fd.read(FINGERPRINT_BYTES))
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self._path.joinpath(key + CACHE_SUFFIX)
+
+    def load(self, key: str) -> Union[DataFrame, Tuple[DataFrame, GapIndex], None]:
+        """Return the frame cached under key (and its GapIndex, if one was
+        stored with it), or None if there is none"""
+        entry = self._entry(key)
+        if not entry.exists():
+            self.misses += 1
+            return None
+        try:
+            with self._lock, HDFStore(str(entry), mode='r') as hdf:
+                data = hdf.get(_NODE)
+                if _GAPS_NODE in hdf:
+                    data = data, GapIndex.from_runs(hdf.get(_GAPS_NODE))
+        except (OSError, KeyError):
+            _log.exception(f"Unable to read import cache entry {entry!s}")
+            self.misses += 1
+            return None
+        # Record the use of the entry for LRU eviction
+        os.utime(str(entry))
+        self.hits += 1
+        return data
+
+    def store(self, key: str, data: DataFrame, gap_index: GapIndex = None) -> bool:
+        """Store data (and optionally its GapIndex) under key, evicting old
+        entries if required
+
+        Returns
+        -------
+        bool
+            False if the entry could not be written
+        """
+        entry = self._entry(key)
+        tmp_path = entry.with_name(f'{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            with self._lock, warnings.catch_warnings(), \
+                    HDFStore(str(tmp_path), mode='w', complevel=1,
+                             complib='blosc:lz4') as hdf:
+                # Columns of mixed types (e.g. bools with NaNs) are pickled
+                warnings.simplefilter('ignore', PerformanceWarning)
+                hdf.put(_NODE, data, format=HDF5Manager.storage_format(data))
+                if gap_index is not None:
+                    hdf.put(_GAPS_NODE, gap_index.runs(), format='fixed')
+            os.replace(str(tmp_path), str(entry))
+        except (OSError, ValueError, TypeError):
+            _log.exception(f"Unable to write import cache entry {entry!s}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+        self.evict()
+        return True
+
+    def load_or_parse(self, source: Union[str, Path], method: Callable,
+                      **params) -> Union[DataFrame, Tuple[DataFrame, GapIndex]]:
+        """Return the cached result of method(source, **params), parsing (and
+        caching) the source file on a miss
+
+        The result of a parser returning the GapIndex of the data along with
+        the frame (e.g. the ingestors with gaps=True) is cached as a whole.
+        """
+        try:
+            key = self.fingerprint(source, method, **params)
+        except OSError:
+            # Let the parser report the error
+            return method(str(source), **params)
+        data = self.load(key)
+        if data is None:
+            data = method(str(source), **params)
+            if isinstance(data, DataFrame):
+                self.store(key, data)
+            elif isinstance(data, tuple) and len(data) == 2 and \
+                    isinstance(data[0], DataFrame) and isinstance(data[1], GapIndex):
+                self.store(key, *data)
+        else:
+            _log.info(f"Loaded {source!s} from the import cache")
+        return data
+
+    def evict(self, max_bytes: int = None) -> int:
+        """Remove least recently used entries until the cache is within
+        max_bytes (by default the bound of the cache)
+
+        Returns
+        -------
+        int
+            Number of entries removed
+        """
+        max_bytes = self._max_bytes if max_bytes is None else max_bytes
+        if not self._path.exists():
+            return 0
+        entries = [(entry.stat(), entry) for entry in self._path.glob('*' + CACHE_SUFFIX)]
+        total = sum(stat.st_size for stat, _ in entries)
+        removed = 0
+        for stat, entry in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total <= max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:  # pragma: no cover
+                continue
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Remove all entries from the cache"""
+        return self.evict(max_bytes=0)
+
+
+# The global cache is disabled unless configured by the application, see
+# set_import_cache
+_import_cache: Optional[ImportCache] = None
+
+
+def default_cache_path() -> Path:
+    """Directory of the user's import cache
+
+    The DGP_IMPORT_CACHE environment variable overrides the default
+    (~/.dgp/import_cache)
+    """
+    return Path(os.environ.get('DGP_IMPORT_CACHE',
+                               Path.home().joinpath('.dgp', 'import_cache')))
+
+
+def set_import_cache(cache: Optional[ImportCache]):
+    """Set the global ImportCache used by FileLoader (None to disable it)
+
+    The global cache is disabled by default, the GUI application enables it
+    in :func:`default_cache_path` on startup.
+    """
+    global _import_cache
+    _import_cache = cache
+
+
+def import_cache() -> Optional[ImportCache]:
+    """Expose the global ImportCache object"""
+    return _import_cache
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from dgp.core.oid import OID
+from dgp.core.models.dataset import DataSet
+from dgp.core.models.flight import Flight
+from dgp.core.models.project import (GravityProject, ProjectEncoder,
+                                     ProjectDecoder, project_entities,
+                                     write_atomic)
+
+__all__ = ['ProjectJournal', 'JOURNAL_FILE_NAME']
+
+_log = logging.getLogger(__name__)
+
+JOURNAL_FILE_NAME = 'dgp.journal'
+# Number of journal records after which the journal is compacted
+COMPACT_AFTER = 500
+# Sentinel task which stops the writer thread
+_STOP = object()
+
+
+class ProjectJournal:
+    """Append-only journal of the changes made to a project
+
+    Rather than re-writing the entire project file on every save, mutations
+    of the project (addition/removal of children, and attribute updates) are
+    recorded as JSON lines appended to a journal file beside the project
+    file. Periodically (after `compact_after` records, or on request) the
+    journal is compacted: a snapshot of the project is written to the project
+    file, and the journal is truncated.
+
+    Records are encoded on the calling thread (so they capture the state at
+    the time of the change), and written by a background writer thread,
+    which syncs each batch of records to disk. Snapshots replace the project
+    file atomically, see :func:`~dgp.core.models.project.write_atomic`.
+    Automatic compactions are made entirely by the writer thread, which
+    replays the journal onto a copy of the project decoded from the last
+    snapshot, such that the (GUI) thread recording changes never encodes the
+    whole project.
+
+    The journal is replayed on top of the project file when a project is
+    loaded (see :meth:`replay`), and then compacted. Records are idempotent (children are only
+    added if absent, and only removed if present), such that replaying a
+    journal over a snapshot which already contains some of its changes (e.g.
+    after a crash between writing a snapshot and truncating the journal)
+    produces the same project. A partially written (truncated) final record
+    is ignored.
+
+    Parameters
+    ----------
+    project : :class:`~dgp.core.models.project.GravityProject`
+    compact_after : int, optional
+        Number of records after which the journal is compacted automatically
+
+    """
+    def __init__(self, project: GravityProject, compact_after: int = COMPACT_AFTER):
+        self._project = project
+        self._compact_after = compact_after
+        self._queue = queue.Queue()
+        self._thread: threading.Thread = None
+        self._pending = 0
+        if self.path.exists():
+            with self.path.open('r') as fd:
+                self._pending = sum(1 for _ in fd)
+
+    @property
+    def path(self) -> Path:
+        return self._project.path.joinpath(JOURNAL_FILE_NAME)
+
+    @property
+    def pending(self) -> int:
+        """Number of records in the journal since the last compaction"""
+        return self._pending
+
+    def record_add(self, parent, child) -> None:
+        """Record the addition of child (a project entity) to parent"""
+        self._record(op='add', parent=parent.uid, entity=child)
+
+    def record_remove(self, parent, uid: OID) -> None:
+        """Record the removal of the child identified by uid from parent"""
+        self._record(op='remove', parent=parent.uid, uid=uid)
+
+    def record_set(self, entity, attr: str, parent=None) -> None:
+        """Record the current value of an attribute of entity
+
+        Values which are entities of the project (e.g. a DataSet sensor) are
+        recorded by reference.
+
+        Parameters
+        ----------
+        entity
+            Project entity which has been updated
+        attr : str
+            Name of the updated attribute
+        parent : optional
+            Parent of entity, required for entities which are not registered
+            with the project (i.e. DataSegments)
+
+        """
+        value = getattr(entity, attr)
+        record = dict(op='set', uid=entity.uid, attr=attr)
+        if parent is not None:
+            record['parent'] = parent.uid
+        uid = getattr(value, 'uid', None)
+        if uid is not None and self._project.find(uid) is value:
+            record['ref'] = uid
+        else:
+            record['value'] = value
+        self._record(**record)
+
+    def _record(self, **record) -> None:
+        line = json.dumps(record, cls=ProjectEncoder)
+        self._submit(self._append, self.path, line)
+        self._pending += 1
+        if self._pending >= self._compact_after:
+            self._submit(self._merge, self._project.__class__, self._project.path,
+                         self._project.projectfile, self.path)
+            self._pending = 0
+
+    def compact(self) -> bool:
+        """Write a snapshot of the project (and truncate the journal)
+
+        The project is encoded on the calling thread, and written by the
+        writer thread. This captures any state of the project which is not
+        journaled, see :meth:`_merge` for the automatic compaction.
+
+        Returns
+        -------
+        bool
+            False if the project could not be encoded
+        """
+        json_s = self._project.to_json()
+        if json_s is False:
+            return False
+        self._submit(self._snapshot, self._project.projectfile, self.path, json_s)
+        self._pending = 0
+        return True
+
+    def save(self, compact: bool = False) -> bool:
+        """Save changes to disk
+
+        Recorded changes are written in the background as they occur, so a
+        save only needs to compact the journal if requested (in which case
+        this blocks until the snapshot has been written).
+        """
+        if compact:
+            if not self.compact():
+                return False
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Block until all submitted records/snapshots have been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Compact the journal and stop the writer thread"""
+        self.compact()
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def replay(self) -> int:
+        """Apply the journal records to the project, and compact the journal
+
+        The journal is replayed on the project model before its controllers
+        are created (see :func:`~dgp.gui.utils.load_project_from_path`), so
+        there are no controller notifications (or model signals) to batch.
+        The replayed project is then written (synchronously) to the project
+        file, and the journal truncated, such that it is not replayed again
+        on the next load.
+
+        Returns
+        -------
+        int
+            Number of records applied
+        """
+        if not self.path.exists():
+            return 0
+        text = self.path.read_text()
+        if not text:
+            return 0
+        count, offset = self._replay(self._project, text)
+        if offset < len(text):
+            _log.warning(f'Ignoring incomplete journal record in {self.path!s}')
+
+        json_s = self._project.to_json()
+        if json_s is not False:
+            self._snapshot(self._project.projectfile, self.path, json_s)
+            self._pending = 0
+        elif offset < len(text):
+            # Drop the incomplete record, so that new records are not
+            # appended to it
+            write_atomic(self.path, (text[:offset],))
+            self._pending = text.count('\n', 0, offset)
+        return count
+
+    @classmethod
+    def _replay(cls, project: GravityProject, text: str) -> Tuple[int, int]:
+        """Apply the records of a journal (text) to project
+
+        Returns the number of records applied, and the length of the text
+        which was read, i.e. the offset of an incomplete final record.
+        """
+        count, offset = 0, 0
+        for line in text.splitlines(keepends=True):
+            try:
+                record = json.loads(line, cls=ProjectDecoder,
+                                    klass=project.__class__, project=project)
+            except json.JSONDecodeError:
+                break
+            offset += len(line)
+            if cls._apply(project, record):
+                count += 1
+        return count, offset
+
+    @staticmethod
+    def _find(project: GravityProject, uid: OID, parent_uid: Optional[OID] = None) -> Any:
+        entity = project.find(uid)
+        if entity is None and parent_uid is not None:
+            parent = project.find(parent_uid)
+            if isinstance(parent, DataSet):
+                entity = parent.segments.get(uid)
+        return entity
+
+    @classmethod
+    def _apply(cls, project: GravityProject, record: dict) -> bool:
+        op = record['op']
+        if op == 'set':
+            entity = cls._find(project, record['uid'], record.get('parent', None))
+            if entity is None:
+                _log.debug(f'Journal entity {record["uid"]!s} does not exist')
+                return False
+            if 'ref' in record:
+                value = project.find(record['ref'])
+            else:
+                value = record['value']
+            setattr(entity, record['attr'], value)
+            if isinstance(value, tuple(project_entities.values())):
+                project.register(value)
+            return True
+
+        parent = project.find(record['parent'])
+        if parent is None:
+            _log.debug(f'Journal parent {record["parent"]!s} does not exist')
+            return False
+        if op == 'add':
+            child = record['entity']
+            if parent is project:
+                if project.find(child.uid) is None:
+                    project.add_child(child)
+            elif isinstance(parent, Flight):
+                if project.find(child.uid) is None:
+                    parent.datasets.append(child)
+                    project.register(child)
+            elif isinstance(parent, DataSet):
+                if child not in parent.segments:
+                    parent.segments.append(child)
+        elif op == 'remove':
+            uid = record['uid']
+            if parent is project:
+                project.remove_child(uid)
+            elif isinstance(parent, Flight):
+                child = project.find(uid)
+                if child in parent.datasets:
+                    parent.datasets.remove(child)
+                    project.unregister(child)
+            elif isinstance(parent, DataSet):
+                child = parent.segments.get(uid)
+                if child is not None:
+                    parent.segments.remove(child)
+        else:
+            _log.warning(f'Unknown journal operation {op}')
+            return False
+        return True
+
+    # Writer thread
+    def _submit(self, func, *args) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ProjectJournal',
+                                            daemon=True)
+            self._thread.start()
+        self._queue.put((func, args))
+
+    def _run(self) -> None:
+        held = None
+        while True:
+            task = held if held is not None else self._queue.get()
+            held = None
+            if task is _STOP:
+                self._queue.task_done()
+                return
+            func, args = task
+            count = 1
+            if func is self._append:
+                # Batch consecutive appends, such that they are synced once
+                path, lines = args[0], [args[1]]
+                while True:
+                    try:
+                        task = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if task is not _STOP and task[0] is self._append:
+                        lines.append(task[1][1])
+                        count += 1
+                    else:
+                        held = task
+                        break
+                args = (path, *lines)
+            try:
+                func(*args)
+            except Exception:
+                _log.exception("Error writing project journal")
+            finally:
+                for _ in range(count):
+                    self._queue.task_done()
+
+    @staticmethod
+    def _append(path: Path, *lines: str) -> None:
+        with path.open('a') as fd:
+            fd.write(''.join(f'{line}\n' for line in lines))
+            fd.flush()
+            os.fsync(fd.fileno())
+
+    @classmethod
+    def _merge(cls, klass, root: Path, projectfile: Path, path: Path) -> None:
+        """Compact the journal onto the last snapshot of the project
+
+        The last snapshot is decoded, the journal replayed onto it, and the
+        result written as the new snapshot. Records submitted after this
+        task are appended to the truncated journal.
+        """
+        if not projectfile.exists():
+            _log.warning(f'Project file {projectfile!s} does not exist, '
+                         f'journal not compacted')
+            return
+        snapshot = klass.from_json(projectfile.read_text())
+        snapshot.path = root
+        if path.exists():
+            cls._replay(snapshot, path.read_text())
+        json_s = snapshot.to_json()
+        if json_s is not False:
+            cls._snapshot(projectfile, path, json_s)
+
+    @staticmethod
+    def _snapshot(projectfile: Path, path: Path, json_s: str) -> None:
+        write_atomic(projectfile, (json_s,))
+        # Records are idempotent, so a crash before the journal is truncated
+        # is harmless
+        write_atomic(path, ())
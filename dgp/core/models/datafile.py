@@ -25,7 +25,7 @@ class DataFile:
 
     """
     __slots__ = ('uid', 'date', 'name', 'group', 'source_path',
-                 'column_format')
+                 'column_format', '__weakref__')
 
     def __init__(self, group: DataType, date: datetime, source_path: Path,
                  name: Optional[str] = None, column_format=None,
@@ -1,32 +1,284 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Iterable, Iterator, Optional, Union
 from datetime import datetime
 
-from pandas import Timestamp
+import numpy as np
+from pandas import DatetimeIndex, Timestamp
 
 from dgp.core.types.reference import Reference
 from dgp.core.models.datafile import DataFile
 from dgp.core.oid import OID
 
-__all__ = ['DataSegment', 'DataSet']
+__all__ = ['DataSegment', 'DataSet', 'SegmentTable']
+
+# Minimum number of segments for which a SegmentTable allocates storage
+_MIN_CAPACITY = 16
+
+
+class SegmentTable:
+    """Columnar table of the DataSegments of a DataSet
+
+    Segment bounds and sequence numbers are stored in int64 arrays (with
+    start/stop in nanoseconds since epoch), alongside lists of the segment
+    uids and labels. :class:`DataSegment` objects are light-weight views of a
+    row of the table, created on demand and cached by uid.
+
+    The table provides the list-like API used by the rest of the application
+    (iteration, len, append, remove), as well as vectorized interval queries.
+
+    Parameters
+    ----------
+    segments : Iterable[:class:`DataSegment`], optional
+        Segments to populate the table with
+
+    Notes
+    -----
+    The interval queries assume segments do not overlap, if they do a time
+    is attributed to the containing segment with the latest start.
+
+    """
+    def __init__(self, segments: Iterable['DataSegment'] = ()):
+        self._uids: List[OID] = []
+        self._labels: List[Optional[str]] = []
+        self._rows: Dict[OID, int] = {}
+        self._views: Dict[OID, 'DataSegment'] = {}
+        self._size = 0
+        self._data = np.empty((3, _MIN_CAPACITY), dtype=np.int64)  # start, stop, sequence
+        self._order = None
+        for segment in segments:
+            self.append(segment)
+
+    @classmethod
+    def from_arrays(cls, uid: Iterable[Union[OID, str]], start, stop,
+                    sequence=None, label: Iterable[Optional[str]] = None) -> 'SegmentTable':
+        """Create a table from columns, uid may be OID's or base uuid strings
+
+        This is also the de-serialization method of the table, see
+        :meth:`serialize`
+        """
+        table = cls()
+        table._uids = [oid if isinstance(oid, OID) else OID(base_uuid=oid)
+                       for oid in uid]
+        table._size = len(table._uids)
+        table._rows = {oid: i for i, oid in enumerate(table._uids)}
+        table._labels = list(label) if label is not None else [None] * table._size
+        if sequence is None:
+            sequence = np.arange(table._size)
+        columns = np.array([start, stop, sequence], dtype=np.int64).reshape(3, -1)
+        # Allocate spare capacity, such that a table decoded with few (or no)
+        # segments can be appended to
+        table._data = np.empty((3, max(table._size, _MIN_CAPACITY)), dtype=np.int64)
+        table._data[:, :table._size] = columns
+        return table
+
+    def serialize(self) -> dict:
+        """Columnar (JSON compatible) representation of the table"""
+        return {'_type': self.__class__.__name__,
+                '_module': self.__class__.__module__,
+                'uid': [oid.base_uuid for oid in self._uids],
+                'start': self.start.tolist(),
+                'stop': self.stop.tolist(),
+                'sequence': self.sequence.tolist(),
+                'label': list(self._labels)}
+
+    @property
+    def start(self) -> np.ndarray:
+        """Segment start times (int64 nanoseconds since epoch)"""
+        return self._data[0, :self._size]
+
+    @property
+    def stop(self) -> np.ndarray:
+        """Segment stop times (int64 nanoseconds since epoch)"""
+        return self._data[1, :self._size]
+
+    @property
+    def sequence(self) -> np.ndarray:
+        return self._data[2, :self._size]
+
+    @property
+    def labels(self) -> List[Optional[str]]:
+        return list(self._labels)
+
+    @property
+    def uids(self) -> List[OID]:
+        return list(self._uids)
+
+    def append(self, segment: 'DataSegment') -> None:
+        """Append a segment, the segment becomes a view of the table"""
+        if segment.uid in self._rows:
+            raise ValueError(f'Segment {segment.uid} already exists in table')
+        if self._size == self._data.shape[1]:
+            self._data = np.concatenate((self._data, np.empty_like(self._data)), axis=1)
+        self._data[:, self._size] = segment._start, segment._stop, segment.sequence
+        self._uids.append(segment.uid)
+        self._labels.append(segment.label)
+        self._rows[segment.uid] = self._size
+        self._size += 1
+        self._order = None
+        segment._attach(self)
+        self._views[segment.uid] = segment
+
+    def remove(self, segment: 'DataSegment') -> None:
+        """Remove a segment, the segment retains its values (detached)"""
+        row = self._rows[segment.uid]
+        segment = self[row]
+        segment._detach()
+        # Shift the following rows in place, retaining the capacity
+        self._data[:, row:self._size - 1] = self._data[:, row + 1:self._size]
+        del self._uids[row]
+        del self._labels[row]
+        del self._rows[segment.uid]
+        del self._views[segment.uid]
+        for uid in self._uids[row:]:
+            self._rows[uid] -= 1
+        self._size -= 1
+        self._order = None
+
+    def get(self, uid: OID) -> Optional['DataSegment']:
+        """Get the segment with the given uid, or None"""
+        row = self._rows.get(uid, None)
+        return self[row] if row is not None else None
+
+    def row(self, uid: OID) -> int:
+        return self._rows[uid]
+
+    def _get(self, uid: OID, column: int):
+        return self._data[column, self._rows[uid]]
+
+    def _set(self, uid: OID, column: int, value: int) -> None:
+        self._data[column, self._rows[uid]] = value
+        self._order = None
+
+    def _sorted(self):
+        """Rows and start times ordered by start time"""
+        if self._order is None:
+            self._order = np.argsort(self.start, kind='stable')
+        return self._order, self.start[self._order]
+
+    def locate(self, times) -> np.ndarray:
+        """Locate the rows of the segments containing each of times
+
+        Parameters
+        ----------
+        times : array_like
+            int64 nanosecond times, or a DatetimeIndex
+
+        Returns
+        -------
+        :obj:`numpy.ndarray`
+            Row of the containing segment for each time, -1 where no segment
+            contains the time
+
+        """
+        if isinstance(times, DatetimeIndex):
+            times = times.asi8
+        times = np.asarray(times, dtype=np.int64)
+        if not self._size:
+            return np.full(times.shape, -1, dtype=np.int64)
+        order, starts = self._sorted()
+        i = np.searchsorted(starts, times, side='right') - 1
+        rows = order[np.maximum(i, 0)]
+        found = (i >= 0) & (times <= self.stop[rows])
+        return np.where(found, rows, -1)
+
+    def containing(self, time: Union[Timestamp, int]) -> Optional['DataSegment']:
+        """Get the segment containing time, or None"""
+        time = time.value if isinstance(time, Timestamp) else time
+        row = self.locate([time])[0]
+        return self[row] if row >= 0 else None
+
+    def overlapping(self, start: Union[Timestamp, int],
+                    stop: Union[Timestamp, int]) -> List['DataSegment']:
+        """Get the segments overlapping the range start -> stop (inclusive),
+        ordered by start time"""
+        start = start.value if isinstance(start, Timestamp) else start
+        stop = stop.value if isinstance(stop, Timestamp) else stop
+        order, starts = self._sorted()
+        mask = (starts <= stop) & (self.stop[order] >= start)
+        return [self[row] for row in order[mask]]
+
+    def mask(self, index: DatetimeIndex, segment: 'DataSegment' = None) -> np.ndarray:
+        """Boolean mask of the samples of index within segment (or within any
+        segment if segment is None)"""
+        rows = self.locate(index)
+        if segment is None:
+            return rows >= 0
+        return rows == self._rows[segment.uid]
+
+    def __getitem__(self, row: int) -> 'DataSegment':
+        uid = self._uids[row]
+        view = self._views.get(uid, None)
+        if view is None:
+            view = DataSegment._view(self, uid)
+            self._views[uid] = view
+        return view
+
+    def __iter__(self) -> Iterator['DataSegment']:
+        for row in range(self._size):
+            yield self[row]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, segment: 'DataSegment'):
+        return getattr(segment, 'uid', None) in self._rows
+
+    def __repr__(self):
+        return f'<SegmentTable [{self._size} segments]>'
 
 
 class DataSegment:
+    """A segment (e.g. flight line) of a DataSet, defined by start/stop times
+
+    DataSegments belonging to a DataSet are views of a row of the DataSet's
+    :class:`SegmentTable`. A segment created on its own (or removed from a
+    DataSet) is backed by its own single row table.
+    """
+    __slots__ = ('uid', '_table', '__weakref__')
+
     def __init__(self, uid: OID, start: int, stop: int, sequence: int,
                  label: str = None):
-        self.uid = uid
-        self.uid.set_pointer(self)
         if isinstance(start, Timestamp):
-            self._start = start.value
-        else:
-            self._start = start
+            start = start.value
         if isinstance(stop, Timestamp):
-            self._stop = stop.value
-        else:
-            self._stop = stop
-        self.sequence = sequence
-        self.label = label
+            stop = stop.value
+        self.uid = uid
+        self.uid.set_pointer(self)
+        self._table = SegmentTable.from_arrays([uid], [start], [stop],
+                                               [sequence], [label])
+
+    def serialize(self) -> dict:
+        return {'_type': self.__class__.__name__,
+                '_module': self.__class__.__module__,
+                'uid': self.uid,
+                'start': self._start,
+                'stop': self._stop,
+                'sequence': self.sequence,
+                'label': self.label}
+
+    @classmethod
+    def _view(cls, table: SegmentTable, uid: OID) -> 'DataSegment':
+        segment = cls.__new__(cls)
+        segment.uid = uid
+        segment.uid.set_pointer(segment)
+        segment._table = table
+        return segment
+
+    def _attach(self, table: SegmentTable) -> None:
+        self._table = table
+
+    def _detach(self) -> None:
+        self._table = SegmentTable.from_arrays([self.uid], [self._start], [self._stop],
+                                               [self.sequence], [self.label])
+
+    @property
+    def _start(self) -> int:
+        return int(self._table._get(self.uid, 0))
+
+    @property
+    def _stop(self) -> int:
+        return int(self._table._get(self.uid, 1))
 
     @property
     def start(self) -> Timestamp:
@@ -37,7 +289,7 @@ class DataSegment:
 
     @start.setter
     def start(self, value: Timestamp) -> None:
-        self._start = value.value
+        self._table._set(self.uid, 0, value.value)
 
     @property
     def stop(self) -> Timestamp:
@@ -48,7 +300,23 @@ class DataSegment:
 
     @stop.setter
     def stop(self, value: Timestamp) -> None:
-        self._stop = value.value
+        self._table._set(self.uid, 1, value.value)
+
+    @property
+    def sequence(self) -> int:
+        return int(self._table._get(self.uid, 2))
+
+    @sequence.setter
+    def sequence(self, value: int) -> None:
+        self._table._set(self.uid, 2, value)
+
+    @property
+    def label(self) -> Optional[str]:
+        return self._table._labels[self._table.row(self.uid)]
+
+    @label.setter
+    def label(self, value: Optional[str]) -> None:
+        self._table._labels[self._table.row(self.uid)] = value
 
     def __str__(self):
         return f'<{self.start.to_pydatetime(warn=False):%H:%M} -' \
@@ -74,8 +342,9 @@ class DataSet:
         Optional Gravity DataFile to initialize this DataSet with
     trajectory : :obj:`DataFile`, optional
         Optional Trajectory DataFile to initialize this DataSet with
-    segments : List[:obj:`DataSegment`], optional
-        Optional list of DataSegment's to initialize this DataSet with
+    segments : List[:obj:`DataSegment`] or :obj:`SegmentTable`, optional
+        Optional list of DataSegment's to initialize this DataSet with, the
+        segments are stored in a :class:`SegmentTable`
     uid
 
     Notes
@@ -84,13 +353,19 @@ class DataSet:
     a DataSet, they will not be permitted as direct children of Flights
 
     """
+    __slots__ = ('uid', 'name', 'segments', '_sensor', 'gravity', 'trajectory',
+                 '__weakref__')
+
     def __init__(self, gravity: DataFile = None, trajectory: DataFile = None,
-                 segments: List[DataSegment]=None, sensor=None,
+                 segments: Union[List[DataSegment], SegmentTable] = None, sensor=None,
                  name: str = None, uid: OID = None):
         self.uid = uid or OID(self)
         self.uid.set_pointer(self)
         self.name = name or "Data Set"
-        self.segments = segments or []
+        if isinstance(segments, SegmentTable):
+            self.segments = segments
+        else:
+            self.segments = SegmentTable(segments or ())
         self._sensor = Reference(self, 'sensor', sensor)
 
         self.gravity: DataFile = gravity
@@ -41,7 +41,7 @@ class Flight:
 
     """
     __slots__ = ('uid', 'name', 'datasets', 'date', 'notes', 'sequence',
-                 'duration', '_parent')
+                 'duration', '_parent', '__weakref__')
 
     def __init__(self, name: str, date: Optional[datetime] = None, notes: Optional[str] = None,
                  sequence: int = 0, duration: int = 0,
@@ -26,6 +26,9 @@ valid_fields = set().union(sensor_fields, cc_fields, platform_fields)
 
 
 class Gravimeter:
+    __slots__ = ('_parent', 'uid', 'type', 'name', 'column_format', 'config',
+                 'attributes', '__weakref__')
+
     def __init__(self, name: str, config: dict = None, uid: Optional[OID] = None, **kwargs):
         self._parent = Reference(self, 'parent')
         self.uid = uid or OID(self)
@@ -2,16 +2,20 @@
 import json
 import json.decoder
 import datetime
+import os
+import re
 import warnings
 from pathlib import Path
-from typing import Optional, List, Any, Dict, Union, Tuple, Callable
+from typing import Optional, List, Any, Dict, Union, Tuple, Callable, Generator, Iterable
+
+from pandas import Timestamp
 
 from dgp.core import DataType
 from dgp.core.types.reference import Reference
-from dgp.core.oid import OID
+from dgp.core.oid import OID, OIDRegistry
 from .flight import Flight
 from .meter import Gravimeter
-from .dataset import DataSet, DataSegment
+from .dataset import DataSet, DataSegment, SegmentTable
 from .datafile import DataFile
 
 PROJECT_FILE_NAME = 'dgp.json'
@@ -29,7 +33,8 @@ object_value_map: Dict[object, ObjectTransform] = {
     datetime.datetime: ('timestamp', lambda o: o.timestamp()),
     datetime.date: ('ordinal', lambda o: o.toordinal()),
     Path: ('path', lambda o: f'{o.resolve()!s}'),
-    DataType: ('value', lambda o: o.value)
+    DataType: ('value', lambda o: o.value),
+    Timestamp: ('value', lambda o: o.value)
 }
 
 # Declare serialized value -> object transforms
@@ -38,7 +43,9 @@ value_object_map: Dict[str, Callable[[Dict], str]] = {
     datetime.datetime.__name__: lambda x: datetime.datetime.fromtimestamp(*x.values()),
     datetime.date.__name__: lambda x: datetime.date.fromordinal(*x.values()),
     Path.__name__: lambda x: Path(*x.values()),
-    DataType.__name__: lambda x: DataType(**x)
+    DataType.__name__: lambda x: DataType(**x),
+    Timestamp.__name__: lambda x: Timestamp(x['value']),
+    SegmentTable.__name__: lambda x: SegmentTable.from_arrays(**x)
 }
 
 
@@ -64,37 +71,80 @@ class ProjectEncoder(json.JSONEncoder):
     (de-serialization) declaration should also be added to the value_object_map
     when adding any new type.
 
+    DataSegments are stored in a columnar :class:`SegmentTable` which is
+    serialized as a single object of arrays (rather than an object per
+    segment).
+
     The :class:`Reference` object is a special case; project model objects may
     utilize the Reference class to maintain links to a parent or other related
     model object. The Project Encoder/Decoders identify Reference objects and
     serialize the metadata of the Reference in order to facilitate re-linking
     during de-serialization.
 
+    The _type and _module keys are written first in each object, such that the
+    type of a project file can be determined from its first bytes, see
+    :func:`sniff_project_type`.
+
     """
 
+    # Compiled encoder functions by class, see _compile
+    _encoders: Dict[type, Optional[Callable[[Any], Any]]] = {}
+
     def default(self, o: Any):
-        if isinstance(o, (AirborneProject, *project_entities.values())):
-            keys = o.__slots__ if hasattr(o, '__slots__') else o.__dict__.keys()
-            attrs = {key.lstrip('_'): getattr(o, key) for key in keys}
-            attrs['_type'] = o.__class__.__name__
-            attrs['_module'] = o.__class__.__module__
-            return attrs
-        json_str = {'_type': o.__class__.__name__,
-                    '_module': o.__class__.__module__}
-        if o.__class__ in object_value_map:
-            attr, serializer = object_value_map[o.__class__]
-            json_str[attr] = serializer(o)
-            return json_str
-        elif isinstance(o, Path):
+        try:
+            encode = self._encoders[o.__class__]
+        except KeyError:
+            encode = self._encoders[o.__class__] = self._compile(o.__class__)
+        if encode is None:
+            return super().default(o)
+        return encode(o)
+
+    @staticmethod
+    def _compile(klass: type) -> Optional[Callable[[Any], Any]]:
+        """Create the encoder function for instances of klass
+
+        The type dispatch (and for slotted project entities, the field list)
+        is resolved once per class, rather than on every encoded object.
+
+        Returns
+        -------
+        Callable or None
+            None if the class cannot be encoded by the ProjectEncoder
+        """
+        header = {'_type': klass.__name__, '_module': klass.__module__}
+        if issubclass(klass, (DataSegment, SegmentTable, Reference)):
+            # Segments define their own (columnar) representation, and
+            # References may serialize to None
+            return klass.serialize
+        if issubclass(klass, (AirborneProject, *project_entities.values())):
+            transient = set(getattr(klass, '_transient', ())) | {'__weakref__'}
+            if '__slots__' not in klass.__dict__:
+                def encode_entity(o):
+                    attrs = dict(header)
+                    attrs.update((key.lstrip('_'), value) for key, value
+                                 in o.__dict__.items() if key not in transient)
+                    return attrs
+                return encode_entity
+
+            fields = tuple((key.lstrip('_'), key) for key in klass.__slots__
+                           if key not in transient)
+
+            def encode_slots(o):
+                attrs = dict(header)
+                attrs.update((name, getattr(o, key)) for name, key in fields)
+                return attrs
+            return encode_slots
+        if klass in object_value_map:
+            attr, serializer = object_value_map[klass]
+
+            def encode_value(o):
+                return {**header, attr: serializer(o)}
+            return encode_value
+        if issubclass(klass, Path):
             # Path requires special handling due to OS dependant class names
-            json_str['_type'] = 'Path'
-            json_str['path'] = str(o.resolve())
-            return json_str
-        elif isinstance(o, Reference):
-            # Reference is a special case, as it can return None
-            return o.serialize()
-
-        return super().default(o)
+            return lambda o: {'_type': 'Path', '_module': klass.__module__,
+                              'path': str(o.resolve())}
+        return None
 
 
 JsonRef = Tuple[str, str, str]
@@ -118,24 +168,47 @@ class ProjectDecoder(json.JSONDecoder):
     the parent objects in the hierarchy, and then assemble the references after
     the fact.
 
+    Parameters
+    ----------
+    klass : type
+        The project class to decode the top-level project object as
+    project : :class:`GravityProject`, optional
+        Existing project to resolve references against, for references to
+        entities which are not part of the decoded JSON (e.g. when decoding
+        entities recorded in a project journal)
+
     """
 
-    def __init__(self, klass):
+    def __init__(self, klass, project: 'GravityProject' = None):
         super().__init__(object_hook=self.object_hook)
+        self._project = project
         self._registry = {}
         self._references: List[JsonRef] = []
         self._klass = klass
+        # Inject the project (sub-)class into the entity class map
+        self._classes = {**project_entities}
+        if klass is not None:
+            self._classes[klass.__name__] = klass
 
     def decode(self, s, _w=json.decoder.WHITESPACE.match):
         decoded = super().decode(s)
         # Re-link References
         for parent_uid, attr, child_uid in self._references:
-            parent = self._registry[parent_uid]
-            child = self._registry[child_uid]
+            parent = self._lookup(parent_uid)
+            child = self._lookup(child_uid)
             setattr(parent, attr, child)
 
         return decoded
 
+    def _lookup(self, uid: OID):
+        try:
+            return self._registry[uid]
+        except KeyError:
+            entity = self._project.find(uid) if self._project is not None else None
+            if entity is None:
+                raise
+            return entity
+
     def object_hook(self, json_o: dict):
         """Object Hook in json.load will iterate upwards from the deepest
         nested JSON object (dictionary), calling this hook on each, then passing
@@ -165,22 +238,19 @@ class ProjectDecoder(json.JSONDecoder):
             # JSON objects without _type are interpreted as Python dictionaries
             return json_o
         _type = json_o.pop('_type')
-        try:
-            _module = json_o.pop('_module')
-        except KeyError:
-            _module = None
+        json_o.pop('_module', None)
 
         params = {key.lstrip('_'): value for key, value in json_o.items()}
-        if _type in value_object_map:
-            factory = value_object_map[_type]
+        factory = value_object_map.get(_type, None)
+        if factory is not None:
             return factory(params)
         elif _type == Reference.__name__:
             # References are a special case, None is returned as an interim val
             self._references.append((json_o['parent'], json_o['attr'], json_o['ref']))
             return None
         else:
-            # Handle project entity types (also inject the Project sub-class)
-            klass = {self._klass.__name__: self._klass, **project_entities}.get(_type, None)
+            # Handle project entity types (and the Project sub-class)
+            klass = self._classes.get(_type, None)
         if klass is None:  # pragma: no cover
             raise AttributeError(f"Unhandled class {_type} in JSON data. Class is not defined"
                                  f" in entity map.")
@@ -195,6 +265,69 @@ class ProjectDecoder(json.JSONDecoder):
                 raise
 
 
+def write_atomic(path: Path, chunks: Iterable[str]) -> None:
+    """Write chunks of text to path, replacing the file only once all chunks
+    have been written (and synced to disk)
+
+    The chunks are written to a temporary file alongside path, which is
+    removed if an exception is raised while writing.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with tmp_path.open('w') as fp:
+            for chunk in chunks:
+                fp.write(chunk)
+            fp.flush()
+            os.fsync(fp.fileno())
+    except BaseException:
+        tmp_path.unlink()
+        raise
+    os.replace(str(tmp_path), str(path))
+
+
+_TYPE_HEAD = re.compile(r'\s*{\s*"_type"\s*:\s*"(\w+)"')
+_TYPE_TAIL = re.compile(r'"_type"\s*:\s*"(\w+)"\s*,\s*"_module"\s*:\s*"[\w.]*"\s*}\s*$')
+
+
+def sniff_project_type(json_str: str) -> Optional[str]:
+    """Determine the _type of the top-level object of an encoded project
+
+    The type is read from the leading (or for files written before _type was
+    emitted first, trailing) characters of the string, without decoding it.
+
+    Returns
+    -------
+    str or None
+        The _type name (e.g. 'AirborneProject'), or None if it could not be
+        determined
+    """
+    match = (_TYPE_HEAD.match(json_str, 0, 1024) or
+             _TYPE_TAIL.search(json_str, max(len(json_str) - 1024, 0)))
+    return match.group(1) if match else None
+
+
+def entity_tree(entity) -> Generator[Any, None, None]:
+    """Yields entity, and its descendant project entities (depth first)
+
+    DataSegments are not yielded, as they are indexed by their
+    DataSet's :class:`~dgp.core.models.dataset.SegmentTable`
+    """
+    yield entity
+    if isinstance(entity, GravityProject):
+        for meter in entity.gravimeters:
+            yield meter
+    if isinstance(entity, AirborneProject):
+        for flight in entity.flights:
+            yield from entity_tree(flight)
+    elif isinstance(entity, Flight):
+        for dataset in entity.datasets:
+            yield from entity_tree(dataset)
+    elif isinstance(entity, DataSet):
+        for datafile in (entity.gravity, entity.trajectory):
+            if datafile is not None:
+                yield datafile
+
+
 class GravityProject:
     """GravityProject base class.
 
@@ -228,6 +361,14 @@ class GravityProject:
         otherwise the modification date is automatically handled by the class
         properties.
 
+    Notes
+    -----
+    The project maintains a (weak-reference) registry of all entities within
+    the project by OID, allowing any entity to be retrieved in constant time
+    via :meth:`find`. Entities added to the project tree by means other than
+    :meth:`add_child` (e.g. a DataSet appended to a Flight) should be
+    registered via :meth:`register`.
+
     See Also
     --------
     :class:`AirborneProject`
@@ -248,6 +389,10 @@ class GravityProject:
         self.modify_date = modify_date or datetime.datetime.utcnow()
 
         self._gravimeters = kwargs.get('gravimeters', [])  # type: List[Gravimeter]
+        self._registry = OIDRegistry()
+        self._registry.register(self)
+        for meter in self._gravimeters:
+            self._registry.register(meter)
 
     @property
     def name(self) -> str:
@@ -280,20 +425,48 @@ class GravityProject:
     def gravimeters(self) -> List[Gravimeter]:
         return self._gravimeters
 
+    @property
+    def projectfile(self) -> Path:
+        """Path of the project (JSON) file"""
+        return self.path.joinpath(self._projectfile)
+
+    @property
+    def registry(self) -> OIDRegistry:
+        return self._registry
+
+    def register(self, entity) -> None:
+        """Register entity and its descendants in the project registry"""
+        for item in entity_tree(entity):
+            self._registry.register(item)
+
+    def unregister(self, entity) -> None:
+        """Remove entity and its descendants from the project registry"""
+        for item in entity_tree(entity):
+            self._registry.unregister(item.uid, obj=item)
+
+    def find(self, uid: Union[OID, str]) -> Optional[Any]:
+        """Find any registered entity within the project by its uid"""
+        return self._registry.get(uid)
+
     def get_child(self, child_id: OID):
-        return [meter for meter in self._gravimeters if meter.uid == child_id][0]
+        child = self._registry.get(child_id)
+        if isinstance(child, Gravimeter):
+            return child
+        raise IndexError(f'No child with uid {child_id!s} in {self!r}')
 
     def add_child(self, child) -> None:
         if isinstance(child, Gravimeter):
             self._gravimeters.append(child)
+            self.register(child)
             self._modify()
         else:
             raise TypeError("Invalid child type: {!r}".format(child))
 
     def remove_child(self, child_id: OID) -> bool:
-        child = child_id.reference  # type: Gravimeter
-        if child in self._gravimeters:
+        child = self._registry.get(child_id)
+        if isinstance(child, Gravimeter):
             self._gravimeters.remove(child)
+            self.unregister(child)
             return True
         return False
 
@@ -301,6 +474,8 @@ class GravityProject:
         return f'<{self.__class__.__name__}: {self.name}/{self.path!s}>'
 
     # Protected utility methods
+    _transient = ('_registry',)
+
     def _modify(self):
         """Set the modify_date to now"""
         self._modify_date = datetime.datetime.utcnow()
@@ -313,11 +488,11 @@ class GravityProject:
     def to_json(self, to_file=False, indent=None) -> Union[str, bool]:
         """Encode the Project to a JSON string, optionally writing to disk
 
-        This function will perform the json encoding operation and store the
-        result in memory before writing the result to the project file
-        (if to_file is True), this should prevent corruption of the project file
-        in cases where the JSON encoder fails partway through the serialization,
-        leaving the output file in an inconsistent state.
+        When writing to disk (to_file is True) the encoded output is streamed
+        to a temporary file alongside the project file, which then replaces the
+        project file. The full JSON string is never held in memory, and the
+        project file is not corrupted if the encoder fails partway through the
+        serialization.
 
         Parameters
         ----------
@@ -327,19 +502,21 @@ class GravityProject:
         indent : None, int, optional
             Optionally provide an indent value to nicely format the JSON output
         """
+        if to_file:
+            try:
+                write_atomic(self.projectfile,
+                             ProjectEncoder(indent=indent).iterencode(self))
+            except TypeError as e:
+                warnings.warn(f"Unable to encode project: {e!s}")
+                return False
+            return True
+
         try:
-            json_s = json.dumps(self, cls=ProjectEncoder, indent=indent)
+            return json.dumps(self, cls=ProjectEncoder, indent=indent)
         except TypeError as e:
             warnings.warn(f"Unable to encode project: {e!s}")
             return False
 
-        if to_file:
-            with self.path.joinpath(self._projectfile).open('w') as fp:
-                fp.write(json_s)
-            return True
-        else:
-            return json_s
-
 
 class AirborneProject(GravityProject):
     """AirborneProject class
@@ -360,6 +537,7 @@ class AirborneProject(GravityProject):
         self._flights = kwargs.get('flights', [])
         for flight in self._flights:
             flight.parent = self
+            self.register(flight)
 
     @property
     def flights(self) -> List[Flight]:
@@ -368,20 +546,23 @@ class AirborneProject(GravityProject):
     def add_child(self, child):
         if isinstance(child, Flight):
             self._flights.append(child)
+            self.register(child)
             self._modify()
         else:
             super().add_child(child)
         child.parent = self
 
     def get_child(self, child_id: OID) -> Union[Flight, Gravimeter]:
-        try:
-            return [flt for flt in self._flights if flt.uid == child_id][0]
-        except IndexError:
-            return super().get_child(child_id)
+        child = self._registry.get(child_id)
+        if isinstance(child, Flight):
+            return child
+        return super().get_child(child_id)
 
     def remove_child(self, child_id: OID) -> bool:
-        if child_id.reference in self._flights:
-            self._flights.remove(child_id.reference)
+        child = self._registry.get(child_id)
+        if isinstance(child, Flight):
+            self._flights.remove(child)
+            self.unregister(child)
             return True
         else:
             return super().remove_child(child_id)
@@ -2,6 +2,7 @@
 
 from typing import Optional, Union, Any
 from uuid import uuid4
+from weakref import WeakValueDictionary
 
 
 class OID:
@@ -13,15 +14,20 @@ class OID:
     references.
     """
 
+    __slots__ = ('_base_uuid', '_tag', '_pointer', '_group', '_uuid')
+
     def __init__(self, obj: Optional[Any] = None, tag: Optional[str] = None, base_uuid: str = None):
         if base_uuid is not None and isinstance(base_uuid, str):
             assert len(base_uuid) == 32
         self._base_uuid = base_uuid or uuid4().hex
         self._tag = tag
-        self._pointer = obj
+        self.set_pointer(obj)
 
     def set_pointer(self, obj):
         self._pointer = obj
+        # Derived strings are cached, and computed on first access
+        self._group = None
+        self._uuid = None
 
     @property
     def base_uuid(self):
@@ -29,7 +35,9 @@ class OID:
 
     @property
     def uuid(self):
-        return f'{self.group}_{self._base_uuid}'
+        if self._uuid is None:
+            self._uuid = f'{self.group}_{self._base_uuid}'
+        return self._uuid
 
     @property
     def reference(self) -> object:
@@ -37,9 +45,12 @@ class OID:
 
     @property
     def group(self) -> str:
-        if self._pointer is not None:
-            return self._pointer.__class__.__name__.lower()
-        return "oid"
+        if self._group is None:
+            if self._pointer is not None:
+                self._group = self._pointer.__class__.__name__.lower()
+            else:
+                self._group = "oid"
+        return self._group
 
     @property
     def tag(self):
@@ -60,4 +71,55 @@ class OID:
             return False
 
     def __hash__(self):
-        return hash(self.base_uuid)
+        return hash(self._base_uuid)
+
+
+class OIDRegistry:
+    """Index of objects by OID, allowing constant time lookups
+
+    The registry holds only weak references to the objects, entries are
+    dropped automatically when an object is garbage collected, or explicitly
+    via :meth:`unregister` (e.g. when an object is removed from a project).
+
+    Objects may be looked up by :class:`OID`, or by the base uuid or uuid
+    string of the OID.
+    """
+    def __init__(self):
+        self._refs = WeakValueDictionary()
+
+    @staticmethod
+    def _key(uid: Union[OID, str]) -> str:
+        if isinstance(uid, OID):
+            return uid.base_uuid
+        return str(uid).rsplit('_', 1)[-1]
+
+    def register(self, obj: Any, replace: bool = True) -> None:
+        """Register obj by its uid attribute
+
+        Parameters
+        ----------
+        obj
+            Weak-referenceable object with a uid (:class:`OID`) attribute
+        replace : bool, optional
+            If False an existing (live) registration for the uid is retained
+
+        """
+        key = self._key(obj.uid)
+        if replace or self._refs.get(key, None) is None:
+            self._refs[key] = obj
+
+    def unregister(self, uid: Union[OID, str], obj: Any = None) -> None:
+        """Remove the entry for uid, if obj is specified the entry is only
+        removed if it refers to obj"""
+        key = self._key(uid)
+        if obj is None or self._refs.get(key, None) is obj:
+            self._refs.pop(key, None)
+
+    def get(self, uid: Union[OID, str], default: Any = None) -> Any:
+        return self._refs.get(self._key(uid), default)
+
+    def __contains__(self, uid: Union[OID, str]):
+        return self._key(uid) in self._refs
+
+    def __len__(self):
+        return len(self._refs)
@@ -1,19 +1,21 @@
 # -*- coding: utf-8 -*-
-import csv
 import logging
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Union, Optional, List
+from typing import Callable, Union, Optional, List
 
 from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal, QDate, QRegExp
 from PyQt5.QtGui import QStandardItemModel, QStandardItem, QIcon, QRegExpValidator
-from PyQt5.QtWidgets import QDialog, QFileDialog, QListWidgetItem, QCalendarWidget, QWidget, QFormLayout
+from PyQt5.QtWidgets import (QDialog, QFileDialog, QListWidgetItem, QCalendarWidget, QWidget, QFormLayout,
+                             QTableView)
+from pandas import DataFrame
 
 from dgp.core import Icon, DataType
 from dgp.core.controllers.gravimeter_controller import GravimeterController
 from dgp.core.controllers.dataset_controller import DataSetController
 from dgp.core.controllers.controller_interfaces import IAirborneController, IFlightController, IDataSetController
+from dgp.core.format_sniffer import FileFormat, sniff_format
 from dgp.core.models.datafile import DataFile
 from dgp.gui.ui.data_import_dialog import Ui_DataImportDialog
 from .dialog_mixins import FormValidator
@@ -21,6 +23,9 @@ from .custom_validators import FileExistsValidator
 
 __all__ = ['DataImportDialog']
 
+# Number of sniffed rows displayed in the preview table
+PREVIEW_ROWS = 10
+
 
 class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
 
@@ -36,6 +41,7 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
         self._project = project
         self._datatype = datatype
         self._base_path = base_path or str(Path().home().resolve())
+        self._format: FileFormat = None
         self._type_map = {DataType.GRAVITY: 0, DataType.TRAJECTORY: 1}
         self._type_filters = {DataType.GRAVITY: "Gravity (*.dat *.csv);;Any (*.*)",
                               DataType.TRAJECTORY: "Trajectory (*.dat *.csv *.txt);;Any (*.*)"}
@@ -46,13 +52,17 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
             DataType.GRAVITY: {
                 'columns': lambda: None,  # TODO: Change in future based on Sensor Type
                 'interp': lambda: self.qchb_grav_interp.isChecked(),
-                'skiprows': lambda: 1 if self.qchb_grav_hasheader.isChecked() else 0
+                'skiprows': lambda: self._skiprows(DataType.GRAVITY,
+                                                   self.qchb_grav_hasheader.isChecked()),
+                'compact': lambda: self.qchb_grav_compact.isChecked()
             },
             DataType.TRAJECTORY: {
                 'timeformat': lambda: self.qcb_traj_timeformat.currentText().lower(),
-                'columns': lambda: self.qcb_traj_timeformat.currentData(Qt.UserRole),
-                'skiprows': lambda: 1 if self.qchb_traj_hasheader.isChecked() else 0,
-                'is_utc': lambda: self.qchb_traj_isutc.isChecked()
+                'columns': lambda: self._traj_columns,
+                'skiprows': lambda: self._skiprows(DataType.TRAJECTORY,
+                                                   self.qchb_traj_hasheader.isChecked()),
+                'is_utc': lambda: self.qchb_traj_isutc.isChecked(),
+                'delim_whitespace': lambda: getattr(self._traj_format, 'delimiter', ',') is None
             }
         }
 
@@ -105,6 +115,12 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
 
         self.qsw_advanced_properties.setCurrentIndex(self._type_map[datatype])
 
+        # Preview of the sniffed file format
+        self._preview_model = QStandardItemModel()
+        self.qtv_preview = QTableView(self)
+        self.qtv_preview.setModel(self._preview_model)
+        self.qvl_fileinfo.addWidget(self.qtv_preview)
+
         # Configure Validators
         self.qle_filepath.setValidator(FileExistsValidator())
         self.qcb_dataset.setValidator(QRegExpValidator(QRegExp("[A-Za-z]\+")))
@@ -149,6 +165,53 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
     def datatype(self) -> DataType:
         return self.qlw_datatype.currentItem().data(Qt.UserRole)
 
+    @property
+    def follow(self) -> bool:
+        """Whether the selected file is to be followed as it is written,
+        see :meth:`~dgp.core.controllers.project_controllers.AirborneProjectController.follow_file`"""
+        return self.qchb_follow_file.isChecked()
+
+    @property
+    def file_format(self) -> Optional[FileFormat]:
+        """Format of the selected file inferred by
+        :func:`~dgp.core.format_sniffer.sniff_format`"""
+        return self._format
+
+    @property
+    def method(self) -> Optional[Callable[..., DataFrame]]:
+        """Parser of the sniffed format of the selected file (e.g. ZLS data),
+        if it is of the selected datatype, else None for the default parser
+        of the datatype"""
+        fmt = self._format
+        if fmt is not None and fmt.valid and fmt.datatype is self.datatype:
+            return fmt.method
+        return None
+
+    def _skiprows(self, datatype: DataType, has_header: bool) -> int:
+        """Number of header lines to skip: those of the sniffed format (which
+        may be more than one line) if it is of datatype, unless the header
+        checkbox has been changed from the sniffed state"""
+        fmt = self._format
+        if (fmt is not None and fmt.valid and fmt.datatype is datatype and
+                fmt.has_header == has_header):
+            return fmt.skiprows
+        return 1 if has_header else 0
+
+    @property
+    def _traj_format(self) -> Optional[FileFormat]:
+        # The sniffed format, if it matches the selected trajectory time format
+        fmt = self._format
+        if (fmt is not None and fmt.datatype is DataType.TRAJECTORY and
+                fmt.timeformat == self.qcb_traj_timeformat.currentText().lower()):
+            return fmt
+        return None
+
+    @property
+    def _traj_columns(self) -> List[str]:
+        if self._traj_format is not None:
+            return self._traj_format.columns
+        return self.qcb_traj_timeformat.currentData(Qt.UserRole)
+
     @property
     def _browse_path(self):
         return self.file_path or self._base_path
@@ -169,7 +232,8 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
         params = {key: value() for key, value in param_map.items()}
         self.load.emit(file, params, self.dataset)
 
-        if self.qchb_copy_file.isChecked():
+        # A followed file is still being written, so is not copied
+        if self.qchb_copy_file.isChecked() and not self.follow:
             self._copy_file()
         return super().accept()
 
@@ -212,20 +276,39 @@ class DataImportDialog(QDialog, Ui_DataImportDialog, FormValidator):
         self.qle_filename.setText(path.name)
         st_size_mib = path.stat().st_size / 1048576  # 1024 ** 2
         self.qle_filesize.setText("{:.3f} MiB".format(st_size_mib))
-        with path.open(mode='r', newline='') as fd:
-            try:
-                has_header = csv.Sniffer().has_header(fd.read(8192))
-            except csv.Error:
-                has_header = False
-            print("File has header row: " + str(has_header))
-            fd.seek(0)
-
-            # Detect line count
-            lines = fd.readlines()
-            line_count = len(lines)
-            col_count = len(lines[0].split(','))
-        self.qle_linecount.setText(str(line_count))
-        self.qle_colcount.setText(str(col_count))
+        try:
+            fmt = sniff_format(path)
+        except OSError:
+            self.log.exception(f"Unable to read {path!s}")
+            return
+        self.set_file_format(fmt)
+
+    def set_file_format(self, fmt: FileFormat) -> None:
+        """Configure the dialog for the (sniffed) format of the selected file,
+        and preview its first rows"""
+        self._format = fmt
+        count = str(fmt.line_count) if fmt.exact_count else f"~{fmt.line_count}"
+        self.qle_linecount.setText(count)
+        self.qle_colcount.setText(str(fmt.ncolumns))
+        self._preview_model.clear()
+        if not fmt.valid:
+            self.log.info(f"Unable to detect the format of {fmt.path!s}")
+            return
+
+        self.qlw_datatype.setCurrentRow(self._type_map[fmt.datatype])
+        if fmt.datatype is DataType.GRAVITY:
+            self.qchb_grav_hasheader.setChecked(fmt.has_header)
+        else:
+            self.qchb_traj_hasheader.setChecked(fmt.has_header)
+            self.qcb_traj_timeformat.setCurrentIndex(
+                self.qcb_traj_timeformat.findText(fmt.timeformat, Qt.MatchFixedString))
+            self.qle_traj_format.setText(', '.join(col for col in fmt.columns if col))
+
+        preview = fmt.preview.head(PREVIEW_ROWS)
+        self._preview_model.setHorizontalHeaderLabels([str(col) for col in preview.columns])
+        for row in preview.itertuples(index=False):
+            self._preview_model.appendRow([QStandardItem(str(value)) for value in row])
+        self._preview_model.setVerticalHeaderLabels([str(idx) for idx in preview.index])
 
     @pyqtSlot(int, name='_gravimeter_changed')
     def _gravimeter_changed(self, index: int):  # pragma: no cover
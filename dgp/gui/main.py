@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import QProgressDialog, QFileDialog, QMessageBox, QMenu, QA
 
 from dgp import __about__
 from dgp.core.oid import OID
+from dgp.core.journal import ProjectJournal
 from dgp.core.controllers.controller_interfaces import VirtualBaseController
 from dgp.core.types.enumerations import Links, Icon
 from dgp.core.controllers.project_controllers import AirborneProjectController
@@ -164,7 +165,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
         """
         if isinstance(project, AirborneProject):
-            control = AirborneProjectController(project)
+            control = AirborneProjectController(project, journal=ProjectJournal(project))
         else:
             raise TypeError(f'Unsupported project type: {type(project)}')
 
@@ -209,7 +210,8 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
     def closeEvent(self, event: QCloseEvent):
         self.log.info("Saving project and closing.")
-        self.save_projects()
+        # Compact project journals, writing a complete snapshot of each project
+        self.model.save_projects(compact=True)
         settings().setValue(SettingsKey.WindowState(), self.saveState())
         settings().setValue(SettingsKey.WindowGeom(), self.saveGeometry())
 
@@ -311,12 +313,18 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             flags = (Qt.WindowSystemMenuHint |
                      Qt.WindowTitleHint |
                      Qt.WindowMinimizeButtonHint)
-            dlg = QProgressDialog(event.label, "", event.start, event.stop, self, flags)
+            # Events with a receiver (connected to canceled) may be cancelled
+            cancel_text = "Cancel" if event.receiver else ""
+            dlg = QProgressDialog(event.label, cancel_text, event.start,
+                                  event.stop, self, flags)
             dlg.setMinimumDuration(0)
             dlg.setModal(event.modal)
             dlg.setValue(event.value)
-            if event.receiver:
+            if event.receiver and event.modal:
                 dlg.open(event.receiver)
+            elif event.receiver:
+                dlg.canceled.connect(event.receiver)
+                dlg.show()
             else:
                 dlg.setValue(1)
                 dlg.show()
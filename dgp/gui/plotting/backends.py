@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from enum import Enum, auto
+from functools import partial
 from itertools import cycle
-from typing import List, Union, Tuple, Generator, Dict
-from weakref import WeakValueDictionary
+from typing import List, Union, Tuple, Generator, Dict, Callable, Optional
+from weakref import WeakValueDictionary, WeakKeyDictionary, ref
 
+import numpy as np
 import pandas as pd
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QMenu, QWidgetAction, QWidget, QAction, QToolBar, QMessageBox
@@ -14,6 +16,7 @@ from pyqtgraph import SignalProxy, PlotDataItem
 
 from dgp.core import Icon
 from dgp.gui.ui.plot_options_widget import Ui_PlotOptions
+from dgp.lib.decimation import DecimationPyramid
 from .helpers import PolyAxis
 
 __all__ = ['GridPlotWidget', 'Axis', 'AxisFormatter']
@@ -38,6 +41,92 @@ LINE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
 MaybePlot = Union['DgpPlotItem', None]
 MaybeSeries = Union[pd.Series, None]
 SeriesIndex = Tuple[str, int, int, Axis]
+DecimationSource = Callable[[pd.Series], Optional[DecimationPyramid]]
+
+# Fallback point budget for decimated curves if the view has no size yet
+DEFAULT_MAX_POINTS = 4000
+
+
+class SeriesArrayCache:
+    """Cache of the numeric x/y arrays of plotted Series
+
+    Plotting a Series requires its index and values as numeric (float64)
+    arrays. Converting the index in particular (e.g. a DatetimeIndex) is
+    expensive for long records, and is otherwise repeated every time a channel
+    is toggled or re-plotted.
+
+    Entries are keyed by the identity of the Series, and are dropped when the
+    Series is garbage collected. The data of a cached Series is assumed not to
+    change: the owner of the cache must :meth:`invalidate` the entry of a
+    Series modified in place (e.g. re-indexed, or appended to), new Series
+    (e.g. those of re-loaded data) are converted on first use.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups served from the cache
+    misses : int
+        Number of lookups which required a conversion
+
+    """
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def as_float64(values) -> np.ndarray:
+        """Convert values to a contiguous float64 array, without copying if
+        values is already a contiguous float64 array"""
+        values = pd.to_numeric(values, errors='coerce')
+        return np.ascontiguousarray(values, dtype=np.float64)
+
+    def _entry(self, series: pd.Series) -> dict:
+        key = id(series)
+        entry = self._entries.get(key, None)
+        if entry is not None and entry['ref']() is series:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = {'ref': ref(series, lambda _, k=key: self._entries.pop(k, None)),
+                 'x': self.as_float64(series.index),
+                 'y': self.as_float64(series.values)}
+        self._entries[key] = entry
+        return entry
+
+    def arrays(self, series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the numeric (x, y) arrays of a Series"""
+        entry = self._entry(series)
+        return entry['x'], entry['y']
+
+    def pyramid(self, series: pd.Series) -> DecimationPyramid:
+        """Get an in-memory :class:`DecimationPyramid` of a Series, built from
+        (and cached with) its numeric arrays"""
+        entry = self._entry(series)
+        if 'pyramid' not in entry:
+            entry['pyramid'] = DecimationPyramid.from_arrays(entry['x'], entry['y'])
+        return entry['pyramid']
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def invalidate(self, series: pd.Series = None) -> None:
+        """Drop the cached arrays of series (e.g. after it was modified in
+        place), or of all Series if series is None"""
+        if series is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(id(series), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
 
 
 class _CustomPlotControl(QWidget, Ui_PlotOptions):
@@ -333,6 +422,10 @@ class GridPlotWidget(GraphicsView):
         If True all plots will have a sister plot with its own y-axis and scale
         enabling the plotting of 2 (or more) Series with differing scales on a
         single plot surface.
+    auto_decimate : bool, optional
+        If True (default) series longer than the point budget of the plot are
+        drawn as a min/max envelope of the visible x-range (~2 points per
+        pixel), which is recomputed when the view is zoomed or panned.
     parent : QWidget, optional
         Optional QWidget parent for the underlying QGraphicsView object
 
@@ -351,7 +444,7 @@ class GridPlotWidget(GraphicsView):
     sigPlotCleared = pyqtSignal()
 
     def __init__(self, rows=1, cols=1, background='w', grid=True, sharex=False,
-                 multiy=False, timeaxis=False, parent=None):
+                 multiy=False, timeaxis=False, auto_decimate=True, parent=None):
         super().__init__(background=background, parent=parent)
         self.gl = GraphicsLayout(parent=parent)
         self.setCentralItem(self.gl)
@@ -369,6 +462,15 @@ class GridPlotWidget(GraphicsView):
         self._series: Dict[SeriesIndex: pd.Series] = WeakValueDictionary()
         self._items: Dict[SeriesIndex: PlotDataItem] = WeakValueDictionary()
 
+        # Numeric arrays of the Series plotted by this widget
+        self.array_cache = SeriesArrayCache()
+
+        # Multi-resolution data for decimated curves, see set_decimation_source
+        self._pyramids: Dict[PlotDataItem, DecimationPyramid] = WeakKeyDictionary()
+        self._decimation_source: DecimationSource = None
+        self._range_proxies = {}
+        self.auto_decimate = auto_decimate
+
         for row in range(self.rows):
             for col in range(self.cols):
                 axis_items = {'bottom': PolyAxis(orientation='bottom',
@@ -435,9 +537,28 @@ class GridPlotWidget(GraphicsView):
         else:
             return plot
 
+    def set_decimation_source(self, source: DecimationSource) -> None:
+        """Set a callable used to look up a :class:`DecimationPyramid` for
+        series added to the plot via :meth:`add_series`.
+
+        Series for which the source returns a pyramid are drawn at the level of
+        detail appropriate to the visible x-range, which is re-evaluated
+        when the view is zoomed or panned.
+
+        Parameters
+        ----------
+        source : Callable[[pd.Series], Optional[DecimationPyramid]]
+            Callable accepting a Series and returning its DecimationPyramid, or
+            None if the Series should be plotted at full resolution. Set to
+            None to disable lookups.
+
+        """
+        self._decimation_source = source
+
     def add_series(self, series: pd.Series, row: int, col: int = 0,
                    axis: Axis = Axis.LEFT, pen=None,
-                   autorange: bool = True) -> PlotDataItem:
+                   autorange: bool = True,
+                   pyramid: DecimationPyramid = None) -> PlotDataItem:
         """Add a pandas :class:`pandas.Series` to the plot at the specified
         row/column
 
@@ -452,6 +573,12 @@ class GridPlotWidget(GraphicsView):
             'left' or 'right' - specifies which y-scale the series should be
             plotted on. Only has effect if self.multiy is True.
         autorange : bool, optional
+        pyramid : :class:`~dgp.lib.decimation.DecimationPyramid`, optional
+            Multi-resolution representation of the series, if supplied (or
+            provided by the decimation source) the curve is drawn from the
+            level appropriate for the visible x-range.
+            If neither is available and auto_decimate is enabled, a pyramid is
+            built in memory for series exceeding the plot's point budget.
 
         Returns
         -------
@@ -471,14 +598,48 @@ class GridPlotWidget(GraphicsView):
 
         self._series[index] = series
         plot = self.get_plot(row, col, axis)
-        xvals = pd.to_numeric(series.index, errors='coerce')
-        yvals = pd.to_numeric(series.values, errors='coerce')
+        if pyramid is None and self._decimation_source is not None:
+            pyramid = self._decimation_source(series)
+        if pyramid is None and self.auto_decimate and len(series) > self._max_points(plot):
+            pyramid = self.array_cache.pyramid(series)
+
+        if pyramid is not None and len(pyramid):
+            xvals, yvals = pyramid.view(pyramid.x[0], pyramid.x[-1],
+                                        self._max_points(plot))
+        else:
+            pyramid = None
+            xvals, yvals = self.array_cache.arrays(series)
         item = plot.plot(x=xvals, y=yvals, name=series.name, pen=pen or self.pen)
         self._items[index] = item
+        if pyramid is not None:
+            self._pyramids[item] = pyramid
+            self._watch_range(plot)
         if autorange:
             plot.autoRange()
         return item
 
+    @staticmethod
+    def _max_points(plot: PlotItem) -> int:
+        """Point budget for a decimated curve, ~2x the view's pixel width"""
+        width = int(plot.vb.width()) if plot.vb is not None else 0
+        return 2 * width if width > 100 else DEFAULT_MAX_POINTS
+
+    def _watch_range(self, plot: PlotItem) -> None:
+        """Re-slice decimated curves of plot when its x-range changes"""
+        if plot in self._range_proxies:
+            return
+        self._range_proxies[plot] = SignalProxy(
+            plot.vb.sigXRangeChanged, delay=0.05, rateLimit=30,
+            slot=partial(self._range_changed, plot))
+
+    def _range_changed(self, plot: PlotItem, *args) -> None:
+        x0, x1 = plot.vb.viewRange()[0]
+        max_points = self._max_points(plot)
+        for curve in plot.curves:
+            pyramid = self._pyramids.get(curve, None)
+            if pyramid is not None:
+                curve.setData(*pyramid.view(x0, x1, max_points))
+
     def get_series(self, name: str, row: int, col: int = 0,
                    axis: Axis = Axis.LEFT) -> MaybeSeries:
         """Get the pandas.Series data for a plotted series
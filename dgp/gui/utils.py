@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
 
 from PyQt5.QtCore import QThread, pyqtSignal, pyqtBoundSignal
 
-from dgp.core.models.project import GravityProject, AirborneProject
+from dgp.core.models.project import GravityProject, AirborneProject, sniff_project_type
+from dgp.core.journal import ProjectJournal
 from dgp.core.oid import OID
+from dgp.lib.transform.graph import TransformGraph, GraphCancelled
 
 __all__ = ['LOG_FORMAT', 'LOG_COLOR_MAP', 'LOG_LEVEL_MAP', 'ConsoleHandler',
-           'ProgressEvent', 'ThreadedFunction', 'clear_signal',
+           'ProgressEvent', 'ThreadedFunction', 'TransformExecutor',
+           'clear_signal',
            'load_project_from_path']
 
 LOG_FORMAT = logging.Formatter(fmt="%(asctime)s:%(levelname)s - %(module)s:"
@@ -103,13 +105,91 @@ class ThreadedFunction(QThread):
             _log.exception(f"Exception executing {self._functor!r}")
 
 
+class TransformExecutor(QThread):
+    """Execute a :class:`~dgp.lib.transform.graph.TransformGraph` in a worker
+    thread, keeping the UI responsive for the duration of the run.
+
+    Parameters
+    ----------
+    factory : Callable[[], TransformGraph]
+        Callable returning the graph to execute, called in the worker thread
+    collect : Callable[[TransformGraph], object], optional
+        Called (in the worker thread) with the executed graph to produce the
+        value emitted by :attr:`result`, e.g. AirbornePost.result_df.
+        By default the graph results dict is emitted.
+    parent : QObject, optional
+
+    Attributes
+    ----------
+    progress : pyqtSignal(int, int, str)
+        Emitted before each node is executed with the number of nodes
+        completed, the total number of nodes, and the name of the node
+    result : pyqtSignal(object)
+        Emitted with the collected result of a successful execution
+    cancelled : pyqtSignal()
+        Emitted if execution was cancelled via :meth:`cancel`
+    failed : pyqtSignal(object)
+        Emitted with the exception raised if the graph could not be created,
+        executed or its result collected
+
+    """
+    progress = pyqtSignal(int, int, str)
+    result = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(object)
+
+    def __init__(self, factory: Callable[[], TransformGraph],
+                 collect: Callable[[TransformGraph], object] = None,
+                 parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self._collect = collect
+        self._graph: Optional[TransformGraph] = None
+        self._cancel_requested = False
+
+    def cancel(self) -> None:
+        """Request cancellation of the execution
+
+        The graph is cancelled cooperatively between nodes, the node currently
+        executing (if any) is allowed to complete.
+        """
+        if not self.isRunning():
+            return
+        self._cancel_requested = True
+        if self._graph is not None:
+            self._graph.cancel()
+
+    def _progress(self, completed: int, total: int, node: str) -> None:
+        # Also checked here (before each node), as a request made before the
+        # graph started executing is discarded by TransformGraph.execute
+        if self._cancel_requested:
+            raise GraphCancelled(self._graph, 'Graph execution cancelled')
+        self.progress.emit(completed, total, node)
+
+    def run(self):
+        try:
+            self._graph = self._factory()
+            self._graph.execute(progress=self._progress)
+            if self._collect is not None:
+                self.result.emit(self._collect(self._graph))
+            else:
+                self.result.emit(self._graph.results)
+        except GraphCancelled:
+            _log.info("Transform execution cancelled")
+            self.cancelled.emit()
+        except Exception as e:
+            _log.exception("Exception executing transform graph")
+            self.failed.emit(e)
+
+
 def load_project_from_path(path: Path) -> GravityProject:
     """Search a directory path for a valid DGP json file, then load the project
     using the appropriate class loader.
 
-    Any discovered .json files are loaded and parsed using a naive JSON loader,
-    the top level object is then inspected for an `_type` attribute, which
-    determines the project loader to use.
+    Any discovered .json files are read, and the `_type` attribute of the top
+    level object is sniffed from the raw text (see
+    :func:`~dgp.core.models.project.sniff_project_type`), which determines the
+    project loader to use. Only the matching file is decoded, in a single pass.
 
     The project's path attribute is updated to the path where it was loaded from
     upon successful decoding. This is to ensure any relative paths encoded in
@@ -140,12 +220,13 @@ def load_project_from_path(path: Path) -> GravityProject:
     for child in path.glob('*.json'):
         with child.open('r') as fd:
             raw_str = fd.read()
-            raw_json: dict = json.loads(raw_str)
 
-        loader = _loaders.get(raw_json.get('_type', None), None)
+        loader = _loaders.get(sniff_project_type(raw_str), None)
         if loader is not None:
             project = loader.from_json(raw_str)
             project.path = path
+            # Apply changes recorded since the project file was last written
+            ProjectJournal(project).replay()
             return project
     raise FileNotFoundError(f'No valid DGP JSON file could be loaded from {path!s}')
 
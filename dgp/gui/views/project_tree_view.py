@@ -118,7 +118,7 @@ class ProjectTreeView(QTreeView):
         if isinstance(item, IAirborneController):
             bindings.append(('addAction', ("Expand All", self.expandAll)))
 
-        if item.rowCount():
+        if self.model().hasChildren(index):
             bindings.append(('addAction', ("Expand" if not expanded else "Collapse",
                                            lambda: self.setExpanded(index, not expanded))))
         # bindings.append(('addAction', ("Properties", self._get_item_attr(item, 'properties'))))
@@ -2,6 +2,7 @@
 import inspect
 import logging
 from enum import Enum, auto
+from functools import partial
 from typing import List
 
 import pandas as pd
@@ -9,9 +10,12 @@ from PyQt5.QtCore import pyqtSignal, Qt, pyqtSlot
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 from PyQt5.QtWidgets import QWidget, QTextEdit
 
-from dgp.core.controllers.dataset_controller import DataSetController, DataSegmentController
+from dgp.core import DataType
+from dgp.core.controllers.controller_helpers import show_error
+from dgp.core.controllers.dataset_controller import DataSetController
 from dgp.gui.plotting.backends import AxisFormatter
 from dgp.gui.plotting.plotters import TransformPlot
+from dgp.gui.utils import ProgressEvent, TransformExecutor
 from dgp.gui.ui.transform_tab_widget import Ui_TransformInterface
 from dgp.lib.transform.graph import TransformGraph
 from dgp.lib.transform.transform_graphs import AirbornePost
@@ -50,6 +54,14 @@ class TransformWidget(QWidget, Ui_TransformInterface):
         self._result: pd.DataFrame = None
         self.result.connect(self._on_result)
 
+        # Channel views of the result by (x-axis role, column), see channel_data
+        self._axis_index = {}
+        self._views = {}
+
+        # Background execution of the transform graph
+        self._executor: TransformExecutor = None
+        self._progress: ProgressEvent = None
+
         # Line mask to view individual lines
         self._mask = None
 
@@ -98,11 +110,11 @@ class TransformWidget(QWidget, Ui_TransformInterface):
 
     @property
     def raw_gravity(self) -> pd.DataFrame:
-        return self._dataset.gravity
+        return self._dataset.gridded(DataType.GRAVITY)
 
     @property
     def raw_trajectory(self) -> pd.DataFrame:
-        return self._dataset.trajectory
+        return self._dataset.gridded(DataType.TRAJECTORY)
 
     @property
     def dataframe(self) -> pd.DataFrame:
@@ -117,11 +129,6 @@ class TransformWidget(QWidget, Ui_TransformInterface):
         return [self._channel_model.item(i)
                 for i in range(self._channel_model.rowCount())]
 
-    @property
-    def _segments(self) -> List[DataSegmentController]:
-        return [self._dataset.segment_model.item(i)
-                for i in range(self._dataset.segment_model.rowCount())]
-
     def _graph_source(self, index):  # pragma: no cover
         """Utility to display the transform graph source (__init__) method
         containing the definition for the graph.
@@ -174,12 +181,11 @@ class TransformWidget(QWidget, Ui_TransformInterface):
             self._plot.add_series(series, row)
         elif self._mode is _Mode.SEGMENTS:
             self._segment_indexes[series.name] = []
-            for i, segment in enumerate(self._segments):
-                start_i = self._result.index.searchsorted(segment.get_attr('start'))
-                stop_i = self._result.index.searchsorted(segment.get_attr('stop'))
-                seg_data = series.iloc[start_i:stop_i]
+            index = self._dataset.segment_index(self._result.index)
+            for i, (uid, label, segment) in enumerate(index):
+                seg_data = series.iloc[segment]
 
-                seg_data.name = f'{series.name}-{segment.get_attr("label") or i}'
+                seg_data.name = f'{series.name}-{label or i}'
                 self._segment_indexes[series.name].append(seg_data.name)
                 self._plot.add_series(seg_data, row=0)
 
@@ -191,8 +197,47 @@ class TransformWidget(QWidget, Ui_TransformInterface):
                 self._plot.remove_series(name, row=0)
             del self._segment_indexes[series.name]
 
+    def channel_data(self, column: str, axis: int = None) -> pd.Series:
+        """Get a channel of the result with the index of the given x-axis
+
+        Views are created on demand, the alternate (latitude/longitude) index
+        for an axis is created once and shared by all channels, and channel
+        values are not copied.
+
+        Parameters
+        ----------
+        column : str
+            Name of the result column
+        axis : int, optional
+            Axis role (TIME, LATITUDE or LONGITUDE), defaults to the currently
+            selected x-axis
+
+        """
+        axis = axis or self.xaxis_index
+        key = axis, column
+        if key in self._views:
+            return self._views[key]
+
+        if axis == self.TIME:
+            series = self._result[column]
+        else:
+            index_col = 'lat' if axis == self.LATITUDE else 'lon'
+            if column == index_col:
+                series = pd.Series(name=column, dtype=float)
+            else:
+                if axis not in self._axis_index:
+                    # Only retain the index of the selected alternate axis
+                    self._axis_index.clear()
+                    self._axis_index[axis] = pd.Index(self._result[index_col].values,
+                                                      name=index_col)
+                series = pd.Series(self._result[column].values,
+                                   index=self._axis_index[axis], name=column,
+                                   copy=False)
+        self._views[key] = series
+        return series
+
     def _channel_state_changed(self, item: QStandardItem):
-        data: pd.Series = item.data(self.xaxis_index)
+        data: pd.Series = self.channel_data(item.text())
         if item.checkState() == Qt.Checked:
             self._add_series(data, row=0)
         else:
@@ -208,56 +253,115 @@ class TransformWidget(QWidget, Ui_TransformInterface):
         else:
             self._plot.set_axis_formatters(AxisFormatter.DATETIME)
 
-        for channel in self._channels:
-            if channel.checkState() == Qt.Checked:
-                channel.setCheckState(Qt.Unchecked)
-                channel.setCheckState(Qt.Checked)
+        # Remove channels plotted against the previous axis, then re-add them
+        checked = [channel for channel in self._channels
+                   if channel.checkState() == Qt.Checked]
+        for channel in checked:
+            channel.setCheckState(Qt.Unchecked)
+        self._views = {key: view for key, view in self._views.items()
+                       if key[0] in {self.TIME, self.xaxis_index}}
+        for channel in checked:
+            channel.setCheckState(Qt.Checked)
 
     @pyqtSlot(name='_on_result')
     def _on_result(self):
         """_on_result called when Transformation DataFrame has been computed.
 
-        This method creates the channel objects for the interface.
+        This method creates the channel objects for the interface, channel
+        data is retrieved on demand via :meth:`channel_data`.
         """
         default_channels = ['fac']
 
-        time_df = self._result
-        lat_df = time_df.set_index('lat')
-        lon_df = time_df.set_index('lon')
-
-        for i in range(self._channel_model.rowCount()):
-            item = self._channel_model.item(i)
-            del item
-
         self._channel_model.clear()
-        for col in sorted(time_df.columns):
+        self._axis_index.clear()
+        self._views.clear()
+        for col in sorted(self._result.columns):
             item = QStandardItem(col)
             item.setCheckable(True)
-            item.setData(time_df[col], self.TIME)
-            if col == 'lat':
-                item.setData(pd.Series(), self.LATITUDE)
-            else:
-                item.setData(lat_df[col], self.LATITUDE)
-
-            if col == 'lon':
-                item.setData(pd.Series(), self.LONGITUDE)
-            else:
-                item.setData(lon_df[col], self.LONGITUDE)
             self._channel_model.appendRow(item)
             if col in default_channels:
                 item.setCheckState(Qt.Checked)
 
+    @property
+    def executing(self) -> bool:
+        return self._executor is not None and self._executor.isRunning()
+
     def execute_transform(self):
+        """Execute the selected transform graph on the DataSet
+
+        A stored result is re-used if the inputs, graph and params are
+        unchanged, otherwise the graph is executed in a background thread
+        (see :class:`~dgp.gui.utils.TransformExecutor`), reporting progress
+        per node via the project model's progressNotificationRequested
+        signal. The :attr:`result` signal is emitted once the result is
+        available.
+        """
+        if self.executing:
+            self.log.warning("A transform is already executing")
+            return
+
+        transform = self.qcb_transform_graphs.currentData(Qt.UserRole)
+        params = dict(begin_static=0, end_static=0)
+
+        result = self._dataset.load_result(transform, **params)
+        if result is not None:
+            self._set_result(result)
+            return
+
         gravity = self.raw_gravity
         trajectory = self.raw_trajectory
         if gravity.empty or trajectory.empty:
             self.log.warning("Missing trajectory or gravity")
             return
 
-        transform = self.qcb_transform_graphs.currentData(Qt.UserRole)
-        graph = transform(trajectory, gravity, 0, 0)
         self.log.info("Executing graph")
-        graph.execute()
+        self._executor = TransformExecutor(
+            partial(transform, trajectory, gravity, **params),
+            collect=lambda graph: graph.result_df(), parent=self)
+        self._executor.progress.connect(self._on_progress)
+        self._executor.result.connect(partial(self._on_executed, transform, params))
+        self._executor.failed.connect(partial(self._on_failed, transform))
+        self._executor.finished.connect(self._on_finished)
+        self._executor.start()
+
+    def cancel_transform(self):
+        """Cancel the executing transform (if any) before its next node"""
+        if self.executing:
+            self._executor.cancel()
+
+    def _notify(self, event: ProgressEvent):
+        project = self._dataset.project
+        model = project.get_parent() if project is not None else None
+        if model is not None:
+            model.progressNotificationRequested.emit(event)
+
+    def _on_progress(self, completed: int, total: int, node: str):
+        if self._progress is None:
+            self._progress = ProgressEvent(self._dataset.uid, stop=total,
+                                           modal=False,
+                                           receiver=self.cancel_transform)
+        self._progress.label = f'Executing transform: {node}'
+        self._progress.value = completed
+        self._notify(self._progress)
+
+    def _on_executed(self, transform, params: dict, result: pd.DataFrame):
+        self._dataset.save_result(result, transform, **params)
+        self._set_result(result)
+
+    def _on_failed(self, transform, exception: Exception):
+        name = self._dataset.get_attr('name')
+        show_error("Transform Failed", f"{transform.__name__} could not be executed on {name}.",
+                   detail=f"{exception!r}", parent=self)
+
+    def _on_finished(self):
+        if self._progress is not None:
+            self._progress.value = self._progress.stop
+            self._notify(self._progress)
+            self._progress = None
+        self._executor.deleteLater()
+        self._executor = None
+
+    def _set_result(self, result: pd.DataFrame):
         del self._result
-        self._result = graph.result_df()
+        self._result = result
         self.result.emit()
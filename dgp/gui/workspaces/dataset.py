@@ -12,6 +12,7 @@ from dgp.gui.plotting.plotters import LineSelectPlot, TransformPlot
 from dgp.gui.widgets.channel_control_widgets import ChannelController
 from dgp.gui.widgets.data_transform_widget import TransformWidget
 from dgp.gui.utils import ThreadedFunction
+from dgp.lib.gravity_ingestor import status_bits
 from .base import WorkspaceTab, SubTab
 
 _log = logging.getLogger(__name__)
@@ -24,6 +25,7 @@ class SegmentSelectTab(SubTab):
 
         self._plot = LineSelectPlot(rows=2)
         self._plot.sigSegmentChanged.connect(self._slot_segment_changed)
+        self._plot.set_decimation_source(lambda s: self.control.decimation(s))
 
         for segment in self.control.children:
             group = self._plot.add_segment(segment.get_attr('start'),
@@ -50,21 +52,38 @@ class SegmentSelectTab(SubTab):
         qa_channel_toggle.toggled.connect(self.controller.setVisible)
         self.toolbar.addAction(qa_channel_toggle)
 
-        # Load data channel selection widget
-        th = ThreadedFunction(self.control.dataframe, parent=self)
-        th.result.connect(self._dataframe_loaded)
-        th.start()
+        # Load data channel selection widget, and re-load it when the data of
+        # the dataset changes (e.g. rows appended to a followed file)
+        self._data_version = None
+        self.control.register_observer(self, self._control_updated, StateAction.UPDATE)
+        self._load_dataframe()
 
     @property
     def control(self) -> DataSetController:
         return super().control
 
+    def _load_dataframe(self):
+        self._data_version = self.control.data_version
+        th = ThreadedFunction(self.control.dataframe, parent=self)
+        th.result.connect(self._dataframe_loaded)
+        th.start()
+
+    def _control_updated(self):
+        if self.control.data_version != self._data_version:
+            self._load_dataframe()
+
     def _dataframe_loaded(self, df):
+        # Arrays converted from the previously loaded data are stale
+        self._plot.array_cache.invalidate()
         data_cols = ('gravity', 'long_accel', 'cross_accel', 'beam', 'temp',
                      'pressure', 'Etemp', 'gps_week', 'gps_sow', 'lat', 'long',
                      'ell_ht')
         cols = [df[col] for col in df if col in data_cols]
-        stat_cols = [df[col] for col in df if col not in data_cols]
+        stat_cols = [df[col] for col in df if col not in data_cols + ('status',)]
+        if 'status' in df:
+            # Packed status word (see read_at1a(compact=True))
+            bits = status_bits(df['status'])
+            stat_cols.extend(bits[col] for col in bits)
         self.controller.set_series(*cols)
         self.controller.set_binary_series(*stat_cols)
         _log.debug("Dataframe loaded for SegmentSelectTab")
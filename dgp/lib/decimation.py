@@ -0,0 +1,265 @@
+# coding: utf-8
+
+"""
+decimation.py
+Library for peak-preserving (min/max) decimation of data channels
+
+"""
+from typing import Dict, Tuple, Iterable
+
+import numpy as np
+import pandas as pd
+
+# Default decimation factors of the multi-resolution pyramid
+PYRAMID_FACTORS = (10, 100, 1000)
+
+
+def minmax_reduce(values: np.ndarray, factor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce an array into blocks of `factor` samples, returning the minimum and
+    maximum of each block.
+
+    NaN values are ignored, a block consisting entirely of NaN's will produce
+    NaN min/max values.
+
+    Parameters
+    ----------
+    values : :obj:`numpy.ndarray`
+        1-dimensional array of values to reduce
+    factor : int
+        Number of samples per block, the final block may be shorter
+
+    Returns
+    -------
+    (mins, maxs)
+        Arrays of length ceil(len(values) / factor)
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return values, values
+    starts = np.arange(0, len(values), factor)
+    return np.fmin.reduceat(values, starts), np.fmax.reduceat(values, starts)
+
+
+def build_levels(frame: pd.DataFrame,
+                 factors: Iterable[int] = PYRAMID_FACTORS) -> Dict[int, pd.DataFrame]:
+    """
+    Build a multi-resolution min/max decimation pyramid of the numeric (and
+    boolean) columns of a frame.
+
+    Each level is a DataFrame indexed by the first index value of each block,
+    containing a `{column}_min` and `{column}_max` column for each channel.
+    Coarser levels are reduced from the next finer level where the factors
+    allow, so the cost of building all levels is dominated by the first.
+
+    Parameters
+    ----------
+    frame : :obj:`DataFrame`
+    factors : Iterable[int], optional
+        Decimation factors (relative to the raw data) of the levels to build
+
+    Returns
+    -------
+    Dict[int, DataFrame]
+        Decimated DataFrame for each factor
+
+    """
+    numeric = frame.select_dtypes(include=[np.number, np.bool_])
+    levels = {}
+    previous, source = 1, None
+    for factor in sorted(factors):
+        if source is not None and factor % previous == 0:
+            step = factor // previous
+            index = source.index[::step]
+            data = {}
+            for col in numeric.columns:
+                data[f'{col}_min'] = minmax_reduce(source[f'{col}_min'].values, step)[0]
+                data[f'{col}_max'] = minmax_reduce(source[f'{col}_max'].values, step)[1]
+        else:
+            index = numeric.index[::factor]
+            data = {}
+            for col in numeric.columns:
+                mins, maxs = minmax_reduce(numeric[col].values, factor)
+                data[f'{col}_min'] = mins
+                data[f'{col}_max'] = maxs
+        source = pd.DataFrame(data, index=index)
+        levels[factor] = source
+        previous = factor
+    return levels
+
+
+def interleave(x: np.ndarray, mins: np.ndarray,
+               maxs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Interleave block min/max values into a single (x, y) envelope curve"""
+    return np.repeat(x, 2), np.column_stack((mins, maxs)).ravel()
+
+
+def envelope(x: np.ndarray, y: np.ndarray,
+             max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce x/y values to a min/max envelope of at most ~max_points
+
+    The values are reduced in blocks of equal size (the minimum size required
+    to satisfy max_points), each block is represented by its minimum and
+    maximum, so transient peaks in the data remain visible.
+    If len(x) <= max_points the values are returned unaltered.
+
+    Parameters
+    ----------
+    x : :obj:`numpy.ndarray`
+    y : :obj:`numpy.ndarray`
+    max_points : int
+        Upper bound on the number of points to return
+
+    Returns
+    -------
+    (x, y)
+
+    """
+    if len(x) <= max_points:
+        return x, y
+    factor = int(np.ceil(2 * len(x) / max(max_points, 2)))
+    mins, maxs = minmax_reduce(y, factor)
+    return interleave(x[::factor], mins, maxs)
+
+
+class DecimationPyramid:
+    """
+    Multi-resolution min/max representation of a single data channel
+
+    The DecimationPyramid holds the raw x/y values of a channel, and any number
+    of decimated levels of the channel (as produced by :func:`build_levels`).
+    It is used to select the coarsest representation of the channel which still
+    provides the required resolution for a given x-range (e.g. the visible
+    range of a plot), such that the number of points drawn is bounded
+    regardless of the length of the record.
+
+    Parameters
+    ----------
+    x : :obj:`numpy.ndarray`
+        Raw x-values (monotonically increasing) of the channel
+    y : :obj:`numpy.ndarray`
+        Raw y-values of the channel
+    levels : Dict[int, Tuple[ndarray, ndarray, ndarray]]
+        Mapping of decimation factor to (x, min, max) arrays
+
+    """
+    def __init__(self, x: np.ndarray, y: np.ndarray,
+                 levels: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]]):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.levels = dict(sorted(levels.items()))
+
+    @classmethod
+    def from_series(cls, series: pd.Series,
+                    factors: Iterable[int] = PYRAMID_FACTORS) -> 'DecimationPyramid':
+        """Create a pyramid by decimating a Series in memory"""
+        return cls.from_arrays(pd.to_numeric(series.index, errors='coerce'),
+                               pd.to_numeric(series.values, errors='coerce'),
+                               factors)
+
+    @classmethod
+    def from_arrays(cls, x: np.ndarray, y: np.ndarray,
+                    factors: Iterable[int] = PYRAMID_FACTORS) -> 'DecimationPyramid':
+        """Create a pyramid by decimating raw x/y arrays in memory"""
+        pyramid = cls(x, y, {})
+        for factor in factors:
+            mins, maxs = minmax_reduce(pyramid.y, factor)
+            pyramid.levels[factor] = pyramid.x[::factor], mins, maxs
+        pyramid.levels = dict(sorted(pyramid.levels.items()))
+        return pyramid
+
+    @classmethod
+    def from_levels(cls, series: pd.Series, levels: Dict[int, pd.DataFrame],
+                    column: str = None) -> 'DecimationPyramid':
+        """Create a pyramid for a Series from pre-computed (e.g. stored) levels
+
+        Parameters
+        ----------
+        series : :obj:`pandas.Series`
+            Raw channel data
+        levels : Dict[int, DataFrame]
+            Levels as produced by :func:`build_levels`
+        column : str, optional
+            Name of the channel within the level frames, defaults to series.name
+
+        """
+        column = column or series.name
+        arrays = {}
+        for factor, level in levels.items():
+            try:
+                arrays[factor] = (pd.to_numeric(level.index).values.astype(np.float64),
+                                  level[f'{column}_min'].values,
+                                  level[f'{column}_max'].values)
+            except KeyError:
+                continue
+        return cls(pd.to_numeric(series.index, errors='coerce'),
+                   pd.to_numeric(series.values, errors='coerce'), arrays)
+
+    def select_level(self, x0: float, x1: float, max_points: int) -> int:
+        """Select the finest decimation factor which produces no more than
+        max_points within the range x0 -> x1
+
+        Returns
+        -------
+        int
+            Decimation factor, 1 indicates the raw data should be used
+        """
+        count = np.searchsorted(self.x, x1, side='right') - np.searchsorted(self.x, x0)
+        if count <= max_points:
+            return 1
+        for factor in self.levels:
+            # Each decimated block is drawn as 2 points (min and max)
+            if 2 * count / factor <= max_points:
+                return factor
+        return max(self.levels, default=1)
+
+    def view(self, x0: float, x1: float, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get x/y values to draw the range x0 -> x1 with at most ~max_points
+
+        If the selected level (or the raw data) still contains more than
+        max_points within the range, it is further reduced on the fly with
+        :func:`envelope`, such that the returned size is bounded regardless
+        of the length of the channel.
+
+        Values outside of the requested range are taken from the coarsest
+        level, this keeps the full extent (and overview) of the channel
+        available for auto-ranging and panning at minimal cost.
+
+        Returns
+        -------
+        (x, y)
+            Arrays of x and y values to be plotted
+
+        """
+        if not len(self.x):
+            return self.x, self.y
+        factor = self.select_level(x0, x1, max_points)
+        if factor == 1:
+            lo = max(np.searchsorted(self.x, x0) - 1, 0)
+            hi = np.searchsorted(self.x, x1, side='right') + 1
+            x, y = envelope(self.x[lo:hi], self.y[lo:hi], max_points)
+        else:
+            lx, lmin, lmax = self.levels[factor]
+            lo = max(np.searchsorted(lx, x0, side='right') - 1, 0)
+            hi = np.searchsorted(lx, x1, side='right') + 1
+            lx, lmin, lmax = lx[lo:hi], lmin[lo:hi], lmax[lo:hi]
+            if 2 * len(lx) > max_points:
+                step = int(np.ceil(2 * len(lx) / max(max_points, 2)))
+                lx = lx[::step]
+                lmin = minmax_reduce(lmin, step)[0]
+                lmax = minmax_reduce(lmax, step)[1]
+            x, y = interleave(lx, lmin, lmax)
+
+        if not self.levels or (x0 <= self.x[0] and x1 >= self.x[-1]):
+            return x, y
+
+        cx, cmin, cmax = self.levels[max(self.levels)]
+        left = np.searchsorted(cx, x[0] if len(x) else x0)
+        right = np.searchsorted(cx, x[-1] if len(x) else x1, side='right')
+        lx, ly = interleave(cx[:left], cmin[:left], cmax[:left])
+        rx, ry = interleave(cx[right:], cmin[right:], cmax[right:])
+        return np.concatenate((lx, x, rx)), np.concatenate((ly, y, ry))
+
+    def __len__(self):
+        return len(self.x)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""
+dtype_policy.py
+Library of functions to store ingested data frames in compact dtypes
+
+"""
+
+from typing import Dict, Iterable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['MemoryReport', 'compact_frame', 'float32_lossless', 'frame_nbytes']
+
+# Maximum number of decimal places considered when testing whether a float
+# column can be stored in single precision without loss
+MAX_DECIMALS = 9
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memory used by df (including its index and any Python objects)"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class MemoryReport:
+    """Memory used by a frame before and after compaction
+
+    Attributes
+    ----------
+    before : int
+        Bytes used by the original frame
+    after : int
+        Bytes used by the compacted frame
+    dtypes : Dict[str, Tuple[str, str]]
+        Original and compacted dtype of each converted column
+
+    """
+    __slots__ = ('before', 'after', 'dtypes')
+
+    def __init__(self, before: int, after: int, dtypes: Dict[str, Tuple[str, str]]):
+        self.before = before
+        self.after = after
+        self.dtypes = dtypes
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+    @property
+    def ratio(self) -> float:
+        return self.before / self.after if self.after else float('inf')
+
+    def __str__(self):
+        return (f'{self.before / 1048576:.2f} MiB -> {self.after / 1048576:.2f} MiB '
+                f'({self.saved / 1048576:.2f} MiB saved, {self.ratio:.1f}x smaller)')
+
+    def __repr__(self):
+        return f'<MemoryReport {self!s}>'
+
+
+def float32_lossless(values: np.ndarray, max_decimals: int = MAX_DECIMALS) -> bool:
+    """Determine whether float values can be stored in single precision without
+    losing the precision they were given to
+
+    The precision of the values is taken to be the fewest decimal places (up
+    to max_decimals) to which all values are exact, e.g. 6 for values parsed
+    from an ASCII column written as '%.6f'. The values are lossless in single
+    precision if the single precision values round back to the original
+    values at that precision.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        float64 values, non-finite values are ignored
+    max_decimals : int, optional
+
+    Returns
+    -------
+    bool
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+    single = finite.astype(np.float32).astype(np.float64)
+    for decimals in range(max_decimals + 1):
+        if np.array_equal(np.round(finite, decimals), finite):
+            return np.array_equal(np.round(single, decimals), finite)
+    return False
+
+
+def compact_frame(df: pd.DataFrame, dtypes: Dict[str, Union[str, np.dtype]] = None,
+                  float32: Union[bool, Iterable[str]] = False, integers: bool = True,
+                  categorical: bool = True) -> Tuple[pd.DataFrame, MemoryReport]:
+    """Convert the columns of df to compact dtypes
+
+    The conversions applied are:
+
+    - Columns named in dtypes are converted to the specified dtype
+    - Integer columns are downcast to the smallest integer dtype which holds
+      their values (unsigned if there are no negative values)
+    - If float32 is True (or for the float columns named by float32), float64
+      columns are converted to float32 where this is lossless, see
+      :func:`float32_lossless`
+    - Columns of strings are converted to categoricals, if there are at most
+      half as many distinct strings as rows
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    dtypes : dict, optional
+        Explicit dtypes of columns, these columns are not converted otherwise
+    float32 : bool or Iterable[str], optional
+        Convert (all, or the named) float64 columns to float32 where lossless
+    integers : bool, optional
+        Downcast integer columns
+    categorical : bool, optional
+        Convert string columns with repeated values to categoricals
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, MemoryReport]
+        Compacted frame (df is not modified), and the memory saved
+
+    """
+    dtypes = dtypes or {}
+    if isinstance(float32, bool):
+        float32 = set(df.columns) if float32 else set()
+    else:
+        float32 = set(float32)
+
+    columns = {}
+    for col, series in df.items():
+        if col in dtypes:
+            converted = series.astype(dtypes[col])
+        elif integers and pd.api.types.is_integer_dtype(series.dtype) and len(series):
+            kind = 'unsigned' if series.min() >= 0 else 'integer'
+            converted = pd.to_numeric(series, downcast=kind)
+        elif (col in float32 and series.dtype == np.float64
+              and float32_lossless(series.values)):
+            converted = series.astype(np.float32)
+        elif (categorical and series.dtype == object and len(series)
+              and pd.api.types.infer_dtype(series, skipna=True) == 'string'
+              and series.nunique() <= len(series) // 2):
+            converted = series.astype('category')
+        else:
+            continue
+        if converted.dtype != series.dtype:
+            columns[col] = converted
+
+    compacted = df.assign(**columns) if columns else df.copy()
+    report = MemoryReport(frame_nbytes(df), frame_nbytes(compacted),
+                          {str(col): (str(df[col].dtype), str(converted.dtype))
+                           for col, converted in columns.items()})
+    return compacted, report
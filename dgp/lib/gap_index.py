@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+gap_index.py
+Library for describing the continuous runs (and gaps) of time series data
+
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['GapIndex', 'SNAP_TOLERANCE']
+
+# Default tolerance (fraction of the sample interval) within which sample
+# times are snapped to the nominal sample grid
+SNAP_TOLERANCE = 0.1
+# Length of the first window of samples scanned for drift from a run anchor
+_SCAN_WINDOW = 64
+
+_TimeLike = Union[pd.Timestamp, np.datetime64, str, int]
+
+
+def _ns(value: _TimeLike) -> int:
+    return int(pd.Timestamp(value).value)
+
+
+class GapIndex:
+    """Run-length description of the sampling of a time series
+
+    Rather than materializing a NaN row for every missing sample (by
+    re-indexing data onto a regular grid), the sampling of the data is
+    described by its contiguous runs: each run has a start and stop time
+    (of its first and last samples), a number of rows, and the nominal sample
+    interval shared by all runs. Gaps are the intervals between runs.
+
+    A GapIndex is built from the (snapped) index of the data with
+    :meth:`snap` or :meth:`from_index`. The regular grid (and NaN-filled
+    data) is materialized only on request, see :meth:`grid` and
+    :meth:`reindex`.
+
+    Parameters
+    ----------
+    starts, stops : np.ndarray
+        int64 nanosecond times of the first and last sample of each run
+    rows : np.ndarray
+        Number of samples in each run
+    interval : int
+        Nominal sample interval in nanoseconds
+
+    """
+    __slots__ = ('_starts', '_stops', '_rows', '_interval')
+
+    def __init__(self, starts: np.ndarray, stops: np.ndarray, rows: np.ndarray,
+                 interval: int):
+        self._starts = np.asarray(starts, dtype=np.int64)
+        self._stops = np.asarray(stops, dtype=np.int64)
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._interval = int(interval)
+
+    @classmethod
+    def snap(cls, index: pd.DatetimeIndex, interval: Union[int, str, pd.Timedelta] = None,
+             tolerance: float = SNAP_TOLERANCE) -> Tuple[pd.DatetimeIndex, 'GapIndex']:
+        """Snap the times of index to the nominal sample grid, and compute
+        the runs of the snapped index
+
+        Each run is anchored at its first sample, or at the nearest multiple
+        of interval (since the epoch) if the first sample is within tolerance
+        of it, and the times of the run are rounded to the grid of the anchor.
+        A sample starts a new run if its spacing from the previous sample is
+        not within 2 * tolerance intervals of the nominal interval (a gap or
+        glitch), or if it is more than tolerance intervals off the grid of
+        the run (e.g. a clock drifting from the nominal rate). So no sample
+        is moved by more than tolerance intervals, and the first sample of a
+        run keeps its time unless it is within tolerance of the epoch grid.
+
+        Parameters
+        ----------
+        index : pd.DatetimeIndex
+            Sorted sample times
+        interval : int (ns), str or Timedelta, optional
+            Nominal sample interval, by default the median sample spacing
+        tolerance : float, optional
+            Fraction of interval within which times are snapped
+
+        Returns
+        -------
+        Tuple[pd.DatetimeIndex, GapIndex]
+            The snapped index (with the name of index), and its runs
+
+        """
+        ticks = np.asarray(index.asi8, dtype=np.int64)
+        if interval is None:
+            interval = int(np.median(np.diff(ticks))) if len(ticks) > 1 else 1
+        else:
+            interval = int(pd.Timedelta(interval).value)
+        if not len(ticks):
+            return index, cls(ticks, ticks, ticks, interval)
+
+        limit = tolerance * interval
+        deviation = np.abs(np.diff(ticks) - interval)
+        breaks = np.flatnonzero(deviation > 2 * limit) + 1
+        bounds = np.concatenate(([0], breaks, [len(ticks)]))
+
+        # Split the runs at samples drifting off the grid of their anchor,
+        # scanning windows of doubling length from each anchor so that the
+        # pass stays linear even if every other sample starts a new run
+        first, anchors = [], []
+        previous = None
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            pos = lo
+            while pos < hi:
+                anchor = int(ticks[pos])
+                # Anchor runs which start within tolerance of a multiple of
+                # the interval (e.g. GPS epochs) to the absolute grid, unless
+                # that would not leave the run after the previous one
+                phase = (anchor + interval // 2) % interval - interval // 2
+                if abs(phase) <= limit and (previous is None or anchor - phase > previous):
+                    anchor -= phase
+                first.append(pos)
+                anchors.append(anchor)
+
+                end = pos + 1
+                window = _SCAN_WINDOW
+                while end < hi:
+                    stop = min(hi, end + window)
+                    offset = ticks[end:stop] - anchor
+                    offset -= np.rint(offset / interval).astype(np.int64) * interval
+                    drifted = np.flatnonzero(np.abs(offset) > limit)
+                    if len(drifted):
+                        end += int(drifted[0])
+                        break
+                    end = stop
+                    window *= 2
+                previous = anchor + int(np.rint((ticks[end - 1] - anchor) / interval)) * interval
+                pos = end
+
+        first = np.asarray(first, dtype=np.int64)
+        rows = np.diff(np.concatenate((first, [len(ticks)])))
+        anchor = np.repeat(np.asarray(anchors, dtype=np.int64), rows)
+        steps = np.rint((ticks - anchor) / interval).astype(np.int64)
+        snapped = anchor + steps * interval
+
+        last = first + rows - 1
+        gap_index = cls(snapped[first], snapped[last], rows, interval)
+        return pd.DatetimeIndex(snapped, name=index.name), gap_index
+
+    @classmethod
+    def from_index(cls, index: pd.DatetimeIndex, interval=None,
+                   tolerance: float = SNAP_TOLERANCE) -> 'GapIndex':
+        """Compute the runs of index, see :meth:`snap`"""
+        return cls.snap(index, interval, tolerance)[1]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, interval=None,
+                   tolerance: float = SNAP_TOLERANCE) -> 'GapIndex':
+        """Compute the runs of the data of df, ignoring (e.g. NaN-filled)
+        rows in which all values are null"""
+        return cls.from_index(df.index[df.notnull().any(axis=1).values],
+                              interval, tolerance)
+
+    @classmethod
+    def from_runs(cls, runs: pd.DataFrame) -> 'GapIndex':
+        """Reconstruct a GapIndex from the frame of its runs (e.g. as stored
+        alongside its data), see :meth:`runs`"""
+        if not len(runs):
+            return cls(np.empty(0), np.empty(0), np.empty(0), 1)
+        interval = int(np.rint(1e9 / runs['rate'].iloc[0]))
+        return cls(pd.DatetimeIndex(runs['start']).asi8,
+                   pd.DatetimeIndex(runs['stop']).asi8,
+                   runs['rows'].values, interval)
+
+    @property
+    def interval(self) -> pd.Timedelta:
+        return pd.Timedelta(self._interval, unit='ns')
+
+    @property
+    def rate(self) -> float:
+        """Nominal sample rate in Hz"""
+        return 1e9 / self._interval
+
+    @property
+    def start(self) -> pd.Timestamp:
+        return pd.Timestamp(self._starts[0]) if len(self) else pd.NaT
+
+    @property
+    def stop(self) -> pd.Timestamp:
+        return pd.Timestamp(self._stops[-1]) if len(self) else pd.NaT
+
+    @property
+    def rows(self) -> int:
+        """Number of samples in all runs"""
+        return int(self._rows.sum())
+
+    def __len__(self):
+        """Number of runs"""
+        return len(self._starts)
+
+    def runs(self) -> pd.DataFrame:
+        """Return a frame of the runs: start, stop, rows and rate (Hz)"""
+        return pd.DataFrame({'start': pd.DatetimeIndex(self._starts),
+                             'stop': pd.DatetimeIndex(self._stops),
+                             'rows': self._rows,
+                             'rate': np.full(len(self), self.rate)},
+                            columns=['start', 'stop', 'rows', 'rate'])
+
+    def gaps(self) -> pd.DataFrame:
+        """Return a frame of the gaps between runs: the last sample time
+        before (start) and first sample time after (stop) each gap, and the
+        number of missing samples"""
+        before, after = self._stops[:-1], self._starts[1:]
+        missing = np.maximum(np.rint((after - before) / self._interval) - 1, 0)
+        return pd.DataFrame({'start': pd.DatetimeIndex(before),
+                             'stop': pd.DatetimeIndex(after),
+                             'missing': missing.astype(np.int64)},
+                            columns=['start', 'stop', 'missing'])
+
+    def is_continuous(self, start: _TimeLike, stop: _TimeLike) -> bool:
+        """Determine whether the interval [start, stop] is covered by a single
+        run of samples (i.e. it contains no gaps, and is within the data)"""
+        start, stop = _ns(start), _ns(stop)
+        if stop < start:
+            start, stop = stop, start
+        run = np.searchsorted(self._starts, start, side='right') - 1
+        return bool(run >= 0 and self._stops[run] >= stop)
+
+    def grid(self) -> pd.DatetimeIndex:
+        """Materialize the regular (nominal interval) grid from the first to
+        the last sample
+
+        Runs may differ in phase (e.g. after a logger restart, or where a
+        drifting clock starts a new run), so the grid is built per run: each
+        run's grid extends from its first sample up to the start of the next
+        run (covering the gap which follows it).
+        """
+        if not len(self):
+            return pd.DatetimeIndex([])
+        ends = np.concatenate((self._starts[1:], self._stops[-1:] + 1))
+        counts = -(-(ends - self._starts) // self._interval)
+        offsets = np.arange(counts.sum(), dtype=np.int64) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        ticks = np.repeat(self._starts, counts) + offsets * self._interval
+        return pd.DatetimeIndex(ticks)
+
+    def reindex(self, data: Union[pd.DataFrame, pd.Series]) -> Union[pd.DataFrame, pd.Series]:
+        """Reindex data (indexed by the snapped index) onto the regular grid,
+        filling the gaps with NaNs
+
+        Samples which are not on the grid of their run (i.e. those not
+        snapped) are dropped, as are all but the last of any samples snapped
+        to the same time.
+        """
+        if not data.index.is_unique:
+            data = data[~data.index.duplicated(keep='last')]
+        return data.reindex(self.grid())
+
+    def __repr__(self):
+        return (f'<GapIndex {len(self)} runs, {self.rows} rows at {self.rate:g} Hz '
+                f'[{self.start!s}, {self.stop!s}]>')
@@ -6,15 +6,21 @@ Library for gravity data import functions
 
 """
 
+import logging
+
 import numpy as np
 import pandas as pd
 import datetime
-import struct
 import fnmatch
 import os
 import re
 
-from .time_utils import convert_gps_time
+from .dtype_policy import compact_frame
+from .gap_index import GapIndex, SNAP_TOLERANCE
+from .index_repair import repair_index
+from .time_utils import gps_time_index, gps_to_utc
+
+_log = logging.getLogger(__name__)
 
 
 def _extract_bits(bitfield, columns=None, as_bool=False):
@@ -42,12 +48,10 @@ def _extract_bits(bitfield, columns=None, as_bool=False):
 
     """
 
-    def _unpack_bits(n):
-        x = np.array(struct.unpack('4B', struct.pack('>I', n)), dtype=np.uint8)
-        return np.flip(np.unpackbits(x), axis=0)
-
-    data = bitfield.apply(_unpack_bits)
-    df = pd.DataFrame(np.column_stack(list(zip(*data))))
+    # The low 32 bits of each value, least significant first
+    values = np.asarray(bitfield).astype(np.int64) & 0xFFFFFFFF
+    bits = (values[:, np.newaxis] >> np.arange(32)) & 1
+    df = pd.DataFrame(bits.astype(np.uint8))
 
     # set column names
     if columns is not None:
@@ -66,12 +70,46 @@ def _extract_bits(bitfield, columns=None, as_bool=False):
         return df
 
 
+# Nominal sample interval of the DGS AT1A (10 Hz)
+DGS_AT1A_INTERVAL = '100ms'
+
 DGS_AT1A_INTERP_FIELDS = {'gravity', 'long_accel', 'cross_accel', 'beam',
                           'temp', 'pressure', 'Etemp'}
 
+# Names of the bits of the DGS AT1A status word, least significant first
+DGS_AT1A_STATUS_FIELDS = ['clamp', 'unclamp', 'gps_sync', 'feedback',
+                          'reserved1', 'reserved2', 'ad_lock', 'cmd_rcvd',
+                          'nav_mode_1', 'nav_mode_2', 'plat_comm', 'sens_comm',
+                          'gps_input', 'ad_sat', 'long_sat', 'cross_sat',
+                          'on_line']
+
 
-def read_at1a(path, columns=None, fill_with_nans=True, interp=False,
-              skiprows=None):
+def status_bits(status, fields=None):
+    """
+    Expand a packed (e.g. DGS AT1A) status word into boolean bit views.
+
+    Parameters
+    ----------
+    status : pandas.Series
+        Integer status words, as retained by read_at1a(compact=True)
+    fields : list, optional
+        Names of the status bits, least significant first, defaults to
+        DGS_AT1A_STATUS_FIELDS
+
+    Returns
+    -------
+    pandas.DataFrame
+        Boolean column per status bit, indexed as status
+    """
+    fields = fields or DGS_AT1A_STATUS_FIELDS
+    bits = _extract_bits(status, columns=fields, as_bool=True)
+    bits.index = status.index
+    return bits
+
+
+def read_at1a(path, columns=None, fill_with_nans=False, interp=False,
+              skiprows=None, is_utc=False, compact=False, float32=False,
+              tolerance=SNAP_TOLERANCE, gaps=False, repair='last'):
     """
     Read and parse gravity data file from DGS AT1A (Airborne) meter.
 
@@ -87,16 +125,42 @@ def read_at1a(path, columns=None, fill_with_nans=True, interp=False,
         Optional List of fields to specify when importing the data, otherwise
         defaults are assumed.
         This can be used if the data file has fields in an abnormal order
-    fill_with_nans : boolean, default True
-        Fills time gaps with NaNs for all fields
+    fill_with_nans : boolean, default False
+        Fills time gaps with NaNs for all fields (materializes the regular
+        10 Hz grid, see GapIndex.reindex). By default the gaps are described
+        by the GapIndex of the data instead (see gaps)
     interp : boolean, default False
         Interpolate all NaNs for fields of type numpy.number
     skiprows
+    is_utc : bool, default False
+        Shift the (GPS time) index to UTC, removing the GPS-UTC leap second
+        offset applicable to each sample. Samples within an inserted leap
+        second collide with those of the next second, see repair
+    compact : bool, default False
+        Store the frame in compact dtypes (see dtype_policy.compact_frame):
+        the status word is retained as a single uint32 'status' column (see
+        status_bits for its bit views, status is 0 for gap-filled rows)
+        instead of a bool column per status bit
+    float32 : bool or List[str], default False
+        If compact, store (all or the named) sensor channels in single
+        precision where this is lossless
+    tolerance : float, default 0.1
+        Fraction of the sample interval within which sample times are snapped
+        to the nominal 10 Hz grid (see GapIndex.snap)
+    gaps : bool, default False
+        Also return the GapIndex describing the continuous runs of samples
+    repair : str, default 'last'
+        Policy resolving duplicate timestamps, 'last', 'mean' or 'drop' (see
+        index_repair.repair_index), out-of-order samples are sorted. None to
+        disable the repair
 
     Returns
     -------
     pandas.DataFrame
         Gravity data indexed by datetime.
+    GapIndex
+        If gaps is True, the runs of samples in the data (before any NaN
+        filling)
     """
     columns = columns or ['gravity', 'long_accel', 'cross_accel', 'beam',
                           'temp', 'status', 'pressure', 'Etemp', 'gps_week',
@@ -106,48 +170,68 @@ def read_at1a(path, columns=None, fill_with_nans=True, interp=False,
                      skiprows=skiprows)
     df.columns = columns
 
-    # expand status field
-    status_field_names = ['clamp', 'unclamp', 'gps_sync', 'feedback',
-                          'reserved1', 'reserved2', 'ad_lock', 'cmd_rcvd',
-                          'nav_mode_1', 'nav_mode_2', 'plat_comm', 'sens_comm',
-                          'gps_input', 'ad_sat', 'long_sat', 'cross_sat',
-                          'on_line']
-
-    status = _extract_bits(df['status'], columns=status_field_names,
-                           as_bool=True)
+    if not compact:
+        # expand status field
+        status = _extract_bits(df['status'], columns=DGS_AT1A_STATUS_FIELDS,
+                               as_bool=True)
 
-    df = pd.concat([df, status], axis=1)
-    df.drop('status', axis=1, inplace=True)
+        df = pd.concat([df, status], axis=1)
+        df.drop('status', axis=1, inplace=True)
 
     # create datetime index
-    dt = convert_gps_time(df['gps_week'], df['gps_sow'], format='datetime')
-    df.index = pd.DatetimeIndex(dt)
+    df.index = gps_time_index(df['gps_week'], df['gps_sow'])
+    if is_utc:
+        # samples within an inserted leap second collide with the next
+        # second, and are resolved by the repair policy (below)
+        df.index = gps_to_utc(df.index)
+
+    # select rows where time is synced with GPS time (unsynced rows are
+    # stamped in GPS week 0, which would span a grid or GapIndex from 1980)
+    # TODO: Does not work. Can show true when time is not synced.
+    # df = df.loc[df['gps_sync']]
+
+    # TODO: This is not perfect either. Sometimes sync of sow lags.
+    df = df.loc[df['gps_week'] > 0]
+
+    # repair duplicate and out-of-order timestamps (logger resets, GPS sync)
+    # of the raw sample times, before they are snapped to the grid
+    if repair:
+        df, report = repair_index(df, repair)
+        if report.repaired:
+            _log.warning(f"Repaired timestamps of AT1A data from {path!s}: {report!s}")
+
+    # snap jittered sample times to the nominal grid
+    df.index, gap_index = GapIndex.snap(df.index, DGS_AT1A_INTERVAL, tolerance)
 
     if fill_with_nans:
-        # select rows where time is synced with GPS time
-        # TODO: Does not work. Can show true when time is not synced.
-        # df = df.loc[df['gps_sync']]
-
-        # TODO: This is not perfect either. Sometimes sync of sow lags.
-        df = df.loc[df['gps_week'] > 0]
-
-        # fill gaps with NaNs
-        interval = '100000U'
-        index = pd.date_range(df.index[0], df.index[-1], freq=interval)
-        df = df.reindex(index)
+        df = gap_index.reindex(df)
 
     # TODO: Replace interp_nans with pandas interpolate
     if interp:
         numeric = df.select_dtypes(include=[np.number])
+        numeric = numeric.drop(columns='status', errors='ignore')
         numeric = numeric.interpolate(method='time')
 
         # replace columns
         for col in numeric.columns:
             df[col] = numeric[col]
 
+    if compact:
+        df['status'] = df['status'].fillna(0)
+        sensors = [col for col in df.columns if col in DGS_AT1A_INTERP_FIELDS]
+        df, report = compact_frame(df, dtypes={'status': np.uint32},
+                                   float32=sensors if float32 is True else float32)
+        _log.info(f"Compacted AT1A data from {path!s}: {report!s}")
+
+    if gaps:
+        return df, gap_index
     return df
 
 
+# Widths of the fixed-width columns of ZLS data files
+ZLS_COLUMN_WIDTHS = [10, 4, 3, 2, 2, 2, 8, 8, 7, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 6]
+
+
 def _parse_zls_file_name(filename):
     # split by underscore
     fname = [e.split('.') for e in filename.split('_')]
@@ -167,13 +251,10 @@ def _read_zls_format_file(filepath):
                  'raw_beam', 'vcc', 'al', 'ax', 've2', 'ax2', 'xacc2',
                  'lacc2', 'xacc', 'lacc', 'par_port', 'platform_period']
 
-    col_widths = [10, 4, 3, 2, 2, 2, 8, 8, 7, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8,
-                  8, 6]
-
     time_columns = ['year', 'day', 'hour', 'minute', 'second']
 
     # read into dataframe
-    df = pd.read_fwf(filepath, widths=col_widths, names=col_names)
+    df = pd.read_fwf(filepath, widths=ZLS_COLUMN_WIDTHS, names=col_names)
 
     day_fmt = lambda x: '{:03d}'.format(x)
     time_fmt = lambda x: '{:02d}'.format(x)
@@ -189,7 +270,8 @@ def _read_zls_format_file(filepath):
     return df
 
 
-def read_zls(dirpath, begin_time=None, end_time=None, excludes=['.*']):
+def read_zls(dirpath, begin_time=None, end_time=None, excludes=['.*'],
+             compact=False, float32=False):
     """
     Read and parse gravity data file from ZLS meter.
 
@@ -211,6 +293,12 @@ def read_zls(dirpath, begin_time=None, end_time=None, excludes=['.*']):
         Data end time if not importing to the last file in the directory
     excludes : list
         Files and directories to exclude from directory listing.
+    compact : bool, default False
+        Store the frame in compact dtypes (see dtype_policy.compact_frame),
+        e.g. line names as categoricals
+    float32 : bool or List[str], default False
+        If compact, store (all or the named) channels in single precision
+        where this is lossless
 
     Returns
     -------
@@ -266,6 +354,38 @@ def read_zls(dirpath, begin_time=None, end_time=None, excludes=['.*']):
     df.drop(df.index[df.index < begin_time], inplace=True)
     df.drop(df.index[df.index > end_time], inplace=True)
 
+    if compact:
+        df, report = compact_frame(df, float32=float32)
+        _log.info(f"Compacted ZLS data from {dirpath!s}: {report!s}")
+
+    return df
+
+
+def read_zls_file(path, compact=False, float32=False):
+    """
+    Read and parse a single (hourly) gravity data file from a ZLS meter.
+
+    See :func:`read_zls` to read the files of a survey directory.
+
+    Parameters
+    ----------
+    path : str or file-like
+        Filesystem path to (or buffer of) a ZLS data file
+    compact : bool, default False
+        Store the frame in compact dtypes (see dtype_policy.compact_frame)
+    float32 : bool or List[str], default False
+        If compact, store (all or the named) channels in single precision
+        where this is lossless
+
+    Returns
+    -------
+    pandas.DataFrame
+        Gravity data indexed by datetime.
+    """
+    df = _read_zls_format_file(path)
+    if compact:
+        df, report = compact_frame(df, float32=float32)
+        _log.info(f"Compacted ZLS data from {path!s}: {report!s}")
     return df
 
 
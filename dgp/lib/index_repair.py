@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+index_repair.py
+Library for repairing duplicate and out-of-order timestamps of ingested data
+
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['RepairReport', 'repair_index', 'REPAIR_POLICIES']
+
+# Policies resolving rows which share a timestamp:
+#   'last': keep the last row (in file order)
+#   'mean': average the float columns of the rows, other columns take the
+#           value of the last row
+#   'drop': remove all of the rows
+REPAIR_POLICIES = ('last', 'mean', 'drop')
+
+
+class RepairReport:
+    """Summary of the repairs made to the index of a frame
+
+    Attributes
+    ----------
+    rows : int
+        Number of rows of the original frame
+    backwards : int
+        Number of steps backwards in time (e.g. logger resets)
+    reordered : int
+        Number of rows moved to restore the time order
+    duplicates : int
+        Number of surplus rows sharing a timestamp with another row
+    removed : int
+        Number of rows removed resolving the duplicates
+    policy : str
+        Policy by which duplicates were resolved
+
+    """
+    __slots__ = ('rows', 'backwards', 'reordered', 'duplicates', 'removed', 'policy')
+
+    def __init__(self, rows: int, backwards: int = 0, reordered: int = 0,
+                 duplicates: int = 0, removed: int = 0, policy: str = 'last'):
+        self.rows = rows
+        self.backwards = backwards
+        self.reordered = reordered
+        self.duplicates = duplicates
+        self.removed = removed
+        self.policy = policy
+
+    @property
+    def repaired(self) -> bool:
+        """True if the index was modified"""
+        return bool(self.reordered or self.duplicates)
+
+    def __str__(self):
+        return (f'{self.rows} rows: {self.backwards} backward steps ({self.reordered} '
+                f'rows reordered), {self.duplicates} duplicate timestamps resolved by '
+                f'{self.policy!r} ({self.removed} rows removed)')
+
+    def __repr__(self):
+        return f'<RepairReport {self!s}>'
+
+
+def _mean_duplicates(data: pd.DataFrame, first: np.ndarray,
+                     last: np.ndarray) -> pd.DataFrame:
+    starts = np.flatnonzero(first)
+    result = data[last].copy()
+    for col in data.columns[[dtype.kind == 'f' for dtype in data.dtypes]]:
+        values = data[col].values
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0), starts)
+        counts = np.add.reduceat(valid, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[col] = (sums / counts).astype(values.dtype)
+    return result
+
+
+def repair_index(data: pd.DataFrame,
+                 policy: str = 'last') -> Tuple[pd.DataFrame, RepairReport]:
+    """Restore the time order of data, and resolve duplicate timestamps
+
+    Duplicates and steps backwards in time are detected from the differences
+    of the int64 (nanosecond) index, in a single pass. Data which is in order
+    with unique timestamps (the common case) is returned as is. Otherwise
+    rows are (stably) sorted by time, which is linear for the runs of ordered
+    rows between the glitches of a logger, and rows sharing a timestamp are
+    resolved by policy, see :data:`REPAIR_POLICIES`.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Frame indexed by a DatetimeIndex
+    policy : str, optional
+        'last', 'mean' or 'drop'
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, RepairReport]
+        Repaired frame (data is not modified), and the repairs made
+
+    Raises
+    ------
+    :exc:`ValueError`
+        If policy is not one of :data:`REPAIR_POLICIES`
+
+    """
+    if policy not in REPAIR_POLICIES:
+        raise ValueError(f"Invalid repair policy {policy!r}, expected one of "
+                         f"{REPAIR_POLICIES}")
+    ticks = np.asarray(data.index.asi8, dtype=np.int64)
+    report = RepairReport(len(ticks), policy=policy)
+    steps = np.diff(ticks)
+    report.backwards = int(np.count_nonzero(steps < 0))
+    if not report.backwards and np.all(steps):
+        return data, report
+
+    if report.backwards:
+        order = np.argsort(ticks, kind='mergesort')
+        report.reordered = int(np.count_nonzero(order != np.arange(len(order))))
+        data = data.iloc[order]
+        ticks = ticks[order]
+
+    same = np.diff(ticks) == 0
+    first = np.concatenate(([True], ~same))
+    last = np.concatenate((~same, [True]))
+    report.duplicates = int(np.count_nonzero(same))
+    if not report.duplicates:
+        return data, report
+
+    if policy == 'last':
+        data = data[last]
+    elif policy == 'mean':
+        data = _mean_duplicates(data, first, last)
+    else:
+        data = data[first & last]
+    report.removed = report.rows - len(data)
+    return data, report
@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-import collections
-from functools import lru_cache
+
+# GPS time begins 1980 Jan 6 00:00, as nanoseconds since 1970 Jan 1 00:00
+GPS_EPOCH_NS = 315964800 * 10**9
+# Nanoseconds per GPS week (7 * 24 * 60 * 60 seconds)
+GPS_WEEK_NS = 604800 * 10**9
 
 leap_second_table = [(datetime(1980, 1, 1), datetime(1981, 7, 1)),
                      (datetime(1981, 7, 1), datetime(1982, 7, 1)),
@@ -22,21 +26,105 @@ leap_second_table = [(datetime(1980, 1, 1), datetime(1981, 7, 1)),
                      (datetime(2012, 7, 1), datetime(2015, 7, 1)),
                      (datetime(2015, 7, 1), datetime(2017, 1, 1))]
 
+# UTC times (int64 ns) at which each leap second of the table takes effect
+LEAP_SECOND_BOUNDARIES = np.array([pd.Timestamp(end).value for _, end
+                                   in leap_second_table], dtype=np.int64)
+
+
+def _to_ns(times):
+    """Convert datetime(s) to int64 nanoseconds since the UNIX epoch"""
+    if isinstance(times, (datetime, np.datetime64, str)):
+        return np.int64(pd.Timestamp(times).value)
+    return pd.DatetimeIndex(np.asarray(times, dtype='datetime64[ns]')).asi8
+
+
+def datetime_to_gps(times):
+    """
+    Converts datetime(s) to GPS time (weeks + seconds of week), without
+    correcting for UTC leap seconds.
+
+    Parameters
+    ----------
+    times : :obj:`datetime` or array_like of datetimes
+
+    Returns
+    -------
+    (week, sow)
+        Arrays (or scalars for scalar input) of the GPS week, and the seconds
+        of week
+    """
+    delta = _to_ns(times) - GPS_EPOCH_NS
+    week, remainder = np.divmod(delta, GPS_WEEK_NS)
+    return week, remainder / 1e9
+
 
 def datetime_to_sow(dt):
-    def _to_sow(dt):
-        delta = dt - datetime(1980, 1, 6)
-        week = delta.days // 7
-        sow = (delta.days % 7) * 86400. + delta.seconds + delta.microseconds * 1e-6
-        return week, sow
-
-    if isinstance(dt, collections.Iterable):
-        res = []
-        for i in dt:
-            res.append(_to_sow(i))
-        return res
-    else:
-        return _to_sow(dt)
+    """
+    Converts datetime(s) to GPS (week, seconds of week) tuples, see
+    :func:`datetime_to_gps`
+
+    Returns
+    -------
+    tuple or List[tuple]
+        (week, sow) for a single datetime, or a list of (week, sow) for an
+        iterable of datetimes
+    """
+    week, sow = datetime_to_gps(dt)
+    if np.ndim(week):
+        return list(zip(week.tolist(), sow.tolist()))
+    return int(week), float(sow)
+
+
+def gps_to_ns(gpsweek, gpsweekseconds):
+    """
+    Converts GPS time (weeks + seconds of week) to integer nanoseconds since
+    the UNIX epoch (1970-01-01 00:00:00), without correcting for UTC leap
+    seconds.
+
+    The conversion is exact to the nanosecond: the week is converted in
+    integer arithmetic, and only the seconds of week (< 604800) are scaled
+    from floating point, i.e. week * 604800e9 + round(sow * 1e9) + epoch.
+
+    Parameters
+    ----------
+    gpsweek : int or array_like
+        Number of weeks since beginning of GPS time (1980-01-06 00:00:00)
+    gpsweekseconds : float or array_like
+        Number of seconds since the GPS week parameter
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        int64 nanoseconds since the UNIX epoch, times with a NaN week or
+        seconds of week are NaT (i.e. ``pd.NaT.value``)
+    """
+    week = np.asarray(gpsweek)
+    sow = np.asarray(gpsweekseconds, dtype=np.float64)
+    missing = np.isnan(sow)
+    if week.dtype.kind == 'f':
+        missing = missing | np.isnan(week)
+    masked = missing.any()
+    if masked:
+        week = np.where(missing, 0, week)
+        sow = np.where(missing, 0., sow)
+    ns = GPS_EPOCH_NS + week.astype(np.int64) * GPS_WEEK_NS + \
+        np.rint(sow * 1e9).astype(np.int64)
+    if masked:
+        ns = np.where(missing, pd.NaT.value, ns)
+    return ns
+
+
+def gps_time_index(gpsweek, gpsweekseconds, name=None):
+    """
+    Converts GPS time (weeks + seconds of week) to a :obj:`DatetimeIndex`
+    without correcting for UTC leap seconds, see :func:`gps_to_ns`
+
+    Returns
+    -------
+    :obj:`pandas.DatetimeIndex`
+    """
+    ns = np.atleast_1d(gps_to_ns(gpsweek, gpsweekseconds))
+    return pd.DatetimeIndex(ns.view('datetime64[ns]'), name=name)
 
 
 def convert_gps_time(gpsweek, gpsweekseconds, format='unix'):
@@ -62,7 +150,7 @@ def convert_gps_time(gpsweek, gpsweekseconds, format='unix'):
     gpsweekseconds : float
         Number of seconds since the GPS week parameter
 
-    format : {'unix', 'datetime'}
+    format : {'unix', 'datetime', 'index'}
         Format of returned value
 
     Returns
@@ -70,8 +158,22 @@ def convert_gps_time(gpsweek, gpsweekseconds, format='unix'):
     float or :obj:`datetime`
         UNIX timestamp (number of seconds since 1970-01-01 00:00:00) without
         leapseconds subtracted if 'unix' is specified for format.
-        Otherwise, a :obj:`datetime` is returned.
+        If 'datetime' is specified a :obj:`Timestamp` is returned for scalar
+        input, a Series of datetimes for Series input, or a
+        :obj:`DatetimeIndex` for other array_like input. 'index' always
+        returns a :obj:`DatetimeIndex` (see :func:`gps_time_index`). Both are
+        exact to the nanosecond, and NaN weeks or seconds of week are NaT.
     """
+    if format == 'index':
+        return gps_time_index(gpsweek, gpsweekseconds)
+    elif format == 'datetime':
+        index = gps_time_index(gpsweek, gpsweekseconds)
+        if isinstance(gpsweekseconds, pd.Series):
+            return pd.Series(index, index=gpsweekseconds.index)
+        if np.ndim(gpsweek) or np.ndim(gpsweekseconds):
+            return index
+        return index[0]
+
     # GPS time begins 1980 Jan 6 00:00, UNIX time begins 1970 Jan 1 00:00
     gps_delta = 315964800.0
     gpsweek_cf = 604800
@@ -81,13 +183,7 @@ def convert_gps_time(gpsweek, gpsweekseconds, format='unix'):
     else:
         gps_ticks = (float(gpsweek) * gpsweek_cf) + float(gpsweekseconds)
 
-    timestamp = gps_delta + gps_ticks
-
-    if format == 'unix':
-        return timestamp
-
-    elif format == 'datetime':
-        return datetime(1970, 1, 1) + pd.to_timedelta(timestamp * 1e9)
+    return gps_delta + gps_ticks
 
 def leap_seconds(**kwargs):
     """
@@ -145,26 +241,188 @@ def leap_seconds(**kwargs):
                          'number and seconds of week, Unix time in seconds '
                          'since January 1, 1970 UTC, or datetime.')
 
-    return _get_leap_seconds(dt)
+    return int(leap_seconds_array(dt))
 
 
-@lru_cache(maxsize=1000)
-def _get_leap_seconds(dt):
-    ls = 0
-    for entry in leap_second_table:
-        if entry[0] <= dt < entry[1]:
-            break
+def leap_seconds_array(times, gps=False):
+    """
+    Vectorized look-up of the number of leap seconds for each of an array of
+    times
+
+    The number of leap seconds is found by a binary search of the (int64)
+    boundaries of the leap second table, so a leap second occurring part way
+    through the times is accounted for per sample.
+
+    Parameters
+    ----------
+    times : :obj:`DatetimeIndex` or array_like of datetimes
+    gps : bool, optional
+        If True the times are GPS times, rather than UTC. The boundaries of the
+        leap second table (in UTC) are offset by the number of leap seconds at
+        each boundary.
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        int64 number of accumulated leap seconds as of each time
+    """
+    boundaries = LEAP_SECOND_BOUNDARIES
+    if gps:
+        boundaries = boundaries + np.arange(1, len(boundaries) + 1) * 10**9
+    return np.searchsorted(boundaries, _to_ns(times), side='right').astype(np.int64)
+
+
+def gps_to_utc(index):
+    """
+    Shift a :obj:`DatetimeIndex` of GPS times to UTC, by removing the GPS-UTC
+    leap second offset applicable to each sample
+
+    Notes
+    -----
+    Samples within an inserted leap second (23:59:60 UTC) cannot be
+    represented, and will share the timestamps of the following second.
+    """
+    ns = index.asi8 - leap_seconds_array(index, gps=True) * 10**9
+    return pd.DatetimeIndex(ns.view('datetime64[ns]'), name=index.name)
+
+
+def _digit_groups(values, n_groups):
+    """
+    Parse the first n_groups runs of decimal digits of each of an array of
+    (ASCII) strings as integers, e.g. ' 9:58:59.20' -> [9, 58, 59, 20]
+
+    The strings are viewed as a 2-D array of bytes. Rows are grouped by their
+    layout (the positions of their digits), which for a fixed format file
+    takes only a few distinct values, and the groups of each layout are then
+    parsed from fixed byte columns (vectorized over all rows of the layout).
+
+    Returns
+    -------
+    (values, ndigits)
+        int64 arrays of shape (len(values), n_groups) of the value and number
+        of digits of each group, groups which are absent have 0 digits
+    """
+    data = np.asarray(values).astype(np.bytes_)
+    n, width = len(data), data.dtype.itemsize
+    chars = data.view(np.uint8).reshape(n, width)
+    digit = (chars >= 48) & (chars <= 57)
+    # Layout of each row as (a row of) 64 bit integers
+    packed = np.packbits(digit, axis=1)
+    padding = -packed.shape[1] % 8
+    layouts = np.pad(packed, ((0, 0), (0, padding)), 'constant').view(np.uint64)
+
+    # Digit values by (contiguous) byte column
+    columns = np.ascontiguousarray((chars - 48).T)
+
+    parsed = np.zeros((n, n_groups), dtype=np.int64)
+    ndigits = np.zeros((n, n_groups), dtype=np.int64)
+    remaining = np.arange(n)
+    while len(remaining):
+        first = remaining[0]
+        match = (layouts[remaining] == layouts[first]).all(axis=1)
+        if len(remaining) == n and match.all():
+            rows = slice(None)
         else:
-            ls += 1
-    return ls
+            rows = remaining[match]
+        remaining = remaining[~match]
+
+        # Runs of digits (start, stop) of this layout
+        edges = np.diff(np.concatenate(([0], digit[first].astype(np.int8), [0])))
+        runs = zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+        for g, (start, stop) in enumerate(list(runs)[:n_groups]):
+            value = np.zeros(n, dtype=np.int64)[rows]
+            for col in range(start, stop):
+                value = value * 10 + columns[col][rows]
+            parsed[rows, g] = value
+            ndigits[rows, g] = stop - start
+    return parsed, ndigits
+
+
+def _fraction_to_ns(fraction, ndigits):
+    """Scale the digits of a decimal fraction of a second to nanoseconds"""
+    scale = 10 ** np.abs(9 - ndigits)
+    return np.where(ndigits <= 9, fraction * scale, fraction // scale)
+
+
+def _days_since_epoch(year, month, day):
+    """Vectorized number of days from 1970-01-01 to year/month/day"""
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    return months.astype('datetime64[D]').astype(np.int64) + day - 1
+
+
+def hms_to_ns(mdy, hms):
+    """
+    Converts date ('MM/DD/YYYY') and time ('HH:MM:SS.SSS') strings to integer
+    nanoseconds since the UNIX epoch
+
+    The fields are parsed numerically (see :func:`_digit_groups`), rather
+    than by concatenating and parsing strings, any non-digit characters
+    may separate the fields, leading/trailing whitespace is ignored, and the
+    fractional seconds may have any number of digits.
+
+    Parameters
+    ----------
+    mdy : array_like of str
+        Dates in the format 'MM/DD/YYYY'
+    hms : array_like of str
+        Times in the format 'HH:MM:SS[.SSS]'
+
+    Returns
+    -------
+    :obj:`numpy.ndarray`
+        int64 nanoseconds since the UNIX epoch
+
+    Raises
+    ------
+    ValueError
+        If any date or time is missing a field
+    """
+    date, date_digits = _digit_groups(mdy, 3)
+    time, time_digits = _digit_groups(hms, 4)
+    incomplete = (date_digits == 0).any(axis=1) | (time_digits[:, :3] == 0).any(axis=1)
+    if incomplete.any():
+        row = int(np.flatnonzero(incomplete)[0])
+        raise ValueError(f'Unable to parse date/time {mdy[row]!r} {hms[row]!r} '
+                         f'at row {row}')
+
+    days = _days_since_epoch(date[:, 2], date[:, 0], date[:, 1])
+    seconds = days * 86400 + time[:, 0] * 3600 + time[:, 1] * 60 + time[:, 2]
+    return seconds * 10**9 + _fraction_to_ns(time[:, 3], time_digits[:, 3])
+
+
+def hms_time_index(mdy, hms, name=None):
+    """
+    Converts date ('MM/DD/YYYY') and time ('HH:MM:SS.SSS') strings to a
+    :obj:`DatetimeIndex`, see :func:`hms_to_ns`
+    """
+    ns = hms_to_ns(np.asarray(mdy), np.asarray(hms))
+    return pd.DatetimeIndex(ns.view('datetime64[ns]'), name=name)
+
+
+# MATLAB serial date number of 1970-01-01
+DATENUM_EPOCH = 719529
 
 
 def datenum_to_datetime(timestamp):
-    raise NotImplementedError
-    # if isinstance(timestamp, pd.Series):
-    #     return (timestamp.astype(int).map(datetime.fromordinal) +
-    #             pd.to_timedelta(timestamp % 1, unit='D') -
-    #             pd.to_timedelta('366 days'))
-    # else:
-    #     return (datetime.fromordinal(int(timestamp) - 366) +
-    #             timedelta(days=timestamp % 1))
+    """
+    Converts MATLAB serial date numbers (days since 0000-01-00) to datetimes
+
+    Whole days and the fraction of the day are converted separately in int64
+    nanoseconds.
+
+    Parameters
+    ----------
+    timestamp : float or array_like
+
+    Returns
+    -------
+    :obj:`Timestamp` or :obj:`DatetimeIndex`
+        A Timestamp for scalar input, else a DatetimeIndex
+    """
+    serial = np.asarray(timestamp, dtype=np.float64)
+    days = np.floor(serial)
+    fraction = np.rint((serial - days) * 86400e9).astype(np.int64)
+    ns = (days.astype(np.int64) - DATENUM_EPOCH) * 86400 * 10**9 + fraction
+    if not np.ndim(ns):
+        return pd.Timestamp(int(ns))
+    return pd.DatetimeIndex(ns.view('datetime64[ns]'))
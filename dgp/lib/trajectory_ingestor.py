@@ -5,19 +5,25 @@ trajectory_ingestor.py
 Library for trajectory data import functions
 
 """
+import logging
+
 import numpy as np
 import pandas as pd
-from pandas.tseries.offsets import Milli
 
-from .time_utils import leap_seconds, convert_gps_time, datenum_to_datetime
+from .gap_index import GapIndex, SNAP_TOLERANCE
+from .index_repair import repair_index
+from .time_utils import (gps_to_utc, gps_time_index, hms_time_index,
+                         datenum_to_datetime)
 
+_log = logging.getLogger(__name__)
 
 TRAJECTORY_INTERP_FIELDS = {'lat', 'long', 'ell_ht'}
 
 
 def import_trajectory(filepath, delim_whitespace=False, interval=0,
                       interp=False, is_utc=False, columns=None, skiprows=None,
-                      timeformat='sow'):
+                      timeformat='sow', fill_with_nans=False,
+                      tolerance=SNAP_TOLERANCE, gaps=False, repair='last'):
     """
     Read and parse ASCII trajectory data in a comma-delimited format.
 
@@ -27,14 +33,16 @@ def import_trajectory(filepath, delim_whitespace=False, interval=0,
         Filesystem path to trajectory data file
     delim_whitespace : bool
     interval : float, Optional
-        Output data rate. Default behavior is to infer the rate.
+        Nominal sample interval in seconds. Default is 0.1 s.
     interp : Union[List[str], List[int]], Optional
         Gaps in data will be filled with interpolated values. List of
         column indices (list of ints) or list of column names (list of strs)
         to interpolate. Default behavior is not to interpolate.
     is_utc : bool, Optional
-        Indicates that the timestamps are UTC. The index datetimes will be
-        shifted to remove the GPS-UTC leap second offset.
+        Indicates that the timestamps should be UTC. The (GPS time) index
+        datetimes will be shifted to remove the GPS-UTC leap second offset
+        applicable to each sample. Samples within an inserted leap second
+        collide with those of the next second, see repair.
     columns : List[str]
         Strings to use as the column names.
         If none supplied (default), columns will be determined based on
@@ -51,13 +59,29 @@ def import_trajectory(filepath, delim_whitespace=False, interval=0,
         named 'week' with the GPS week, and a field named 'sow' with the GPS
         seconds of week. The 'hms' format requires a field named 'mdy' with the
         date in the format 'MM/DD/YYYY', and a field named 'hms' with the time
-        in the format 'HH:MM:SS.SSS'. The 'serial' format (not yet implemented)
-        requires a field named 'datenum' with the serial date number.
+        in the format 'HH:MM:SS.SSS'. The 'serial' format requires a field
+        named 'datenum' with the (MATLAB) serial date number.
+    fill_with_nans : bool, Optional
+        Fill gaps in the data with NaNs (materializes the regular grid at the
+        sample interval, see GapIndex.reindex). Default is False, the gaps
+        are described by the GapIndex of the data instead (see gaps).
+    tolerance : float, Optional
+        Fraction of the sample interval within which sample times are snapped
+        to the nominal grid (see GapIndex.snap). Default is 0.1.
+    gaps : bool, Optional
+        Also return the GapIndex describing the continuous runs of samples.
+    repair : str, Optional
+        Policy resolving duplicate timestamps, 'last', 'mean' or 'drop' (see
+        index_repair.repair_index), out-of-order samples are sorted. None to
+        disable the repair. Default is 'last'.
 
     Returns
     -------
     DataFrame
         Pandas DataFrame of ingested Trajectory data.
+    GapIndex
+        If gaps is True, the runs of samples in the data (before any NaN
+        filling)
 
     """
 
@@ -96,33 +120,43 @@ def import_trajectory(filepath, delim_whitespace=False, interval=0,
 
     # create index
     if timeformat == 'sow':
-        df.index = convert_gps_time(df['week'], df['sow'], format='datetime')
-        df.index = df.index.round(Milli())
+        df.index = gps_time_index(df['week'], df['sow'])
         df.drop(['sow', 'week'], axis=1, inplace=True)
     elif timeformat == 'hms':
-        df.index = pd.to_datetime(df['mdy'].str.strip() + df['hms'].str.strip(),
-                                  format="%m/%d/%Y%H:%M:%S.%f")
+        df.index = hms_time_index(df['mdy'].values, df['hms'].values)
         df.drop(['mdy', 'hms'], axis=1, inplace=True)
     elif timeformat == 'serial':
-        raise NotImplementedError
-        #df.index = datenum_to_datetime(df['datenum'])
+        # serial date numbers resolve ~10 us, round to the nearest millisecond
+        df.index = datenum_to_datetime(df['datenum'].values).round('ms')
+        df.drop(['datenum'], axis=1, inplace=True)
 
-    # remove leap second
+    # remove leap seconds (per sample, a leap second may occur mid-survey)
     if is_utc:
-        # TO DO: Check dates at beginning and end to determine whether a leap second was added in the middle of the survey.
-        shift = leap_seconds(datetime=df.index[0])
-        df.index = df.index.shift(-shift, freq='S')
+        # samples within an inserted leap second collide with the next
+        # second, and are resolved by the repair policy (below)
+        df.index = gps_to_utc(df.index)
 
-    # set or infer the interval
+    # set the nominal interval
     # TO DO: Need to infer interval for both cases to know whether resample
     if interval > 0:
-        offset_str = '{:d}U'.format(int(interval * 1e6))
+        offset = pd.Timedelta(int(round(interval * 1e6)), unit='us')
     else:
-        offset_str = '100000U'
+        offset = pd.Timedelta(100, unit='ms')
+
+    # repair duplicate and out-of-order timestamps (logger resets, GPS sync)
+    # of the raw sample times, before they are snapped to the grid
+    if repair:
+        df, report = repair_index(df, repair)
+        if report.repaired:
+            _log.warning(f"Repaired timestamps of trajectory data from {filepath!s}: "
+                         f"{report!s}")
+
+    # snap jittered sample times to the nominal grid
+    df.index, gap_index = GapIndex.snap(df.index, offset, tolerance)
 
     # fill gaps with NaNs
-    new_index = pd.date_range(df.index[0], df.index[-1], freq=offset_str)
-    df = df.reindex(new_index)
+    if fill_with_nans:
+        df = gap_index.reindex(df)
 
     if interp:
         numeric = df.select_dtypes(include=[np.number])
@@ -132,4 +166,6 @@ def import_trajectory(filepath, delim_whitespace=False, interval=0,
         for col in numeric.columns:
             df[col] = numeric[col]
 
+    if gaps:
+        return df, gap_index
     return df
@@ -1,4 +1,6 @@
 # coding: utf-8
+import hashlib
+import inspect
 from copy import copy
 from functools import partial
 from collections.abc import Iterable
@@ -9,6 +11,74 @@ class GraphError(Exception):
         self.graph = graph
         self.message = message
 
+
+class GraphCancelled(GraphError):
+    """Raised by :meth:`TransformGraph.execute` if execution is cancelled"""
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return ''
+
+
+def _code_names(code) -> set:
+    """Global names referenced by code, including by nested functions"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _dependencies(cls) -> dict:
+    """
+    Collect the source of the functions and classes referenced by the methods
+    of a graph class (e.g. the node callables), and those referenced by them
+    in turn
+
+    Only objects defined in the package of the graph class are followed,
+    third-party (e.g. pandas) code is not hashed.
+
+    Returns
+    -------
+    dict
+        Source code keyed by the qualified name of each dependency
+    """
+    package = cls.__module__.split('.')[0]
+    pending = []
+    for klass in cls.__mro__:
+        if klass in (TransformGraph, object):
+            continue
+        for attr in vars(klass).values():
+            if isinstance(attr, (staticmethod, classmethod)):
+                attr = attr.__func__
+            if inspect.isfunction(attr):
+                pending.append(inspect.unwrap(attr))
+    sources = {}
+    while pending:
+        func = pending.pop()
+        for name in _code_names(func.__code__):
+            obj = func.__globals__.get(name, None)
+            if isinstance(obj, partial):
+                obj = obj.func
+            if not (inspect.isfunction(obj) or inspect.isclass(obj)):
+                continue
+            obj = inspect.unwrap(obj)
+            if getattr(obj, '__module__', '').split('.')[0] != package:
+                continue
+            key = f'{obj.__module__}.{obj.__qualname__}'
+            if key in sources or obj is cls:
+                continue
+            sources[key] = _source(obj)
+            if inspect.isfunction(obj):
+                pending.append(obj)
+            else:
+                pending.extend(attr for attr in vars(obj).values()
+                               if inspect.isfunction(attr))
+    return sources
+
+
 # TODO: Better validation and more descriptive error messages to aid debugging
 # TODO: Looping?
 class TransformGraph:
@@ -18,6 +88,7 @@ class TransformGraph:
         self._init_graph()
         self._results = None
         self._graph_changed = True
+        self._cancelled = False
         self.verbose = verbose
 
     @classmethod
@@ -47,6 +118,42 @@ class TransformGraph:
                 return results[item]
         return func
 
+    @classmethod
+    def fingerprint(cls, *inputs, **params) -> str:
+        """
+        Compute a provenance key for the result of this graph
+
+        The key is a hash of the graph definition (the qualified name and
+        source of the graph class, and the source of the functions which it
+        references, i.e. the node callables), the identifiers of the inputs,
+        and the graph parameters. Any change to the inputs, parameters or the
+        code of the graph produces a different key, which allows stored
+        results to be reused or invalidated.
+
+        Parameters
+        ----------
+        *inputs
+            Identifiers of the graph inputs, e.g. the UID of the DataFiles
+            from which the input data was loaded, and the version of their data
+        **params
+            Parameters supplied to the graph initializer
+
+        Returns
+        -------
+        str
+            Hexadecimal digest identifying the graph result
+        """
+        digest = hashlib.sha1()
+        digest.update(f'{cls.__module__}.{cls.__qualname__}'.encode())
+        digest.update(_source(cls).encode())
+        for name, source in sorted(_dependencies(cls).items()):
+            digest.update(f'{name}\0{source}\0'.encode())
+        for item in inputs:
+            digest.update(f'{item!s}\0'.encode())
+        for key in sorted(params):
+            digest.update(f'{key}={params[key]!r}\0'.encode())
+        return digest.hexdigest()
+
     def _init_graph(self):
         """
         Initialize the transform graph
@@ -93,8 +200,35 @@ class TransformGraph:
                         adjacency_list[k] += x
         return Graph(adjacency_list)
 
-    def execute(self):
-        """ Execute the transform graph """
+    def cancel(self):
+        """
+        Request cancellation of a running execution
+
+        Cancellation is cooperative, it takes effect before the next node of
+        the graph is processed, and may be requested from another thread. A
+        request made while the graph is not executing has no effect.
+        """
+        self._cancelled = True
+
+    def execute(self, progress=None):
+        """
+        Execute the transform graph
+
+        Parameters
+        ----------
+        progress: callable, optional
+            Called before each node is processed as
+            progress(completed, total, node), where completed is the number of
+            nodes already processed
+
+        Raises
+        ------
+        GraphCancelled
+            If :meth:`cancel` was called during execution. Partial results are
+            discarded.
+        """
+        # Discard any request made since the previous execution
+        self._cancelled = False
         if self._graph_changed:
             order = copy(self._order)
             results = {}
@@ -111,8 +245,14 @@ class TransformGraph:
                 new_tup = tuple([func] + args)
                 return partial(*new_tup)
 
+            total = len(order)
             while order:
+                if self._cancelled:
+                    self._cancelled = False
+                    raise GraphCancelled(self, 'Graph execution cancelled')
                 k = order.pop()
+                if progress is not None:
+                    progress(total - len(order) - 1, total, k)
                 if self.verbose:
                     print('Processing node {k!r}'.format(k=k))
                 node = self.transform_graph[k]
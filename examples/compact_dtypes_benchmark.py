@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the memory and HDF5 footprint of compact ingested dtypes
+
+A synthetic DGS AT1A gravity file of N_SAMPLES samples at 10 Hz (see
+gps_time_benchmark.py), with a one minute gap, is read with read_at1a using
+the default (expanded status bits, float64) dtypes and with compact=True
+(packed uint32 status word), optionally with float32=True. The in-memory size
+of each frame and the size of the HDF5 file it is saved to are reported.
+
+Usage: python examples/compact_dtypes_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from dgp.core import DataType
+from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.models.datafile import DataFile
+from dgp.lib.dtype_policy import frame_nbytes
+from dgp.lib.gravity_ingestor import read_at1a
+
+from gps_time_benchmark import WEEK, timed, write_files
+
+N_SAMPLES = 500000
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    week = np.full(n_samples, WEEK, dtype=np.int64)
+    sow = np.round(0.1 * np.arange(n_samples) + 0.000123456, 9)
+    sow[n_samples // 2:] += 60
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gravity, _ = write_files(Path(tmpdir), week, sow)
+        for label, kwargs in (('default', {}),
+                              ('compact', dict(compact=True)),
+                              ('compact float32', dict(compact=True, float32=True))):
+            df, elapsed = timed(read_at1a, str(gravity), **kwargs)
+            hdfpath = Path(tmpdir).joinpath(f'{label.replace(" ", "_")}.hdf5')
+            HDF5Manager.save_data(df, DataFile(DataType.GRAVITY, datetime.now(), gravity),
+                                  hdfpath)
+            print(f'{label:16} {len(df)} rows x {len(df.columns):2d} columns: '
+                  f'{elapsed:7.3f} s  memory {frame_nbytes(df) / 1048576:8.1f} MiB  '
+                  f'HDF5 {hdfpath.stat().st_size / 1048576:8.1f} MiB')
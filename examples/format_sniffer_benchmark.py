@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark sniffing the format of raw data files against parsing them
+
+Synthetic DGS AT1A gravity and 'sow' trajectory files of N_SAMPLES samples at
+10 Hz (see gps_time_benchmark.py) are sniffed with sniff_format, which reads
+only the first SNIFF_BYTES of each file, and are then parsed in full with the
+sniffed parameters.
+
+Usage: python examples/format_sniffer_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from dgp.core.format_sniffer import sniff_format
+
+from gps_time_benchmark import WEEK, timed, write_files
+
+N_SAMPLES = 1000000
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    week = np.full(n_samples, WEEK, dtype=np.int64)
+    sow = np.round(0.1 * np.arange(n_samples) + 0.000123456, 9)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for path in write_files(Path(tmpdir), week, sow):
+            fmt, elapsed = timed(sniff_format, path)
+            print(f'{path.name:16} sniff: {elapsed:7.3f} s  {fmt!r} ~{fmt.line_count} lines')
+            df, elapsed = timed(fmt.method, str(path), **fmt.params)
+            print(f'{path.name:16} parse: {elapsed:7.3f} s  {len(df)} rows')
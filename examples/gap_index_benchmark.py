@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark ingesting gappy trajectory data with and without NaN filling
+
+A synthetic 10 Hz trajectory file of N_SAMPLES samples (see
+gps_time_benchmark.py) with timing jitter of up to +/- 5 ms and a GAP_HOURS
+hour gap (e.g. the aircraft on the ground between two survey lines) is read
+with import_trajectory, filling the gap with NaNs (the default), and with
+fill_with_nans=False, gaps=True, which returns only the samples and their
+GapIndex. The time to query the continuity of every 10 s window is also
+reported.
+
+Usage: python examples/gap_index_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dgp.lib.dtype_policy import frame_nbytes
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+from gps_time_benchmark import WEEK, timed, write_files
+
+N_SAMPLES = 200000
+GAP_HOURS = 6
+COLUMNS = ['week', 'sow', 'lat', 'long', 'ell_ht']
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    jitter = np.random.RandomState(1).uniform(-0.005, 0.005, n_samples)
+    week = np.full(n_samples, WEEK, dtype=np.int64)
+    sow = np.round(0.1 * np.arange(n_samples) + jitter, 9)
+    sow[n_samples // 2:] += GAP_HOURS * 3600
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _, trajectory = write_files(Path(tmpdir), week, sow)
+        filled, elapsed = timed(import_trajectory, str(trajectory), columns=COLUMNS,
+                                timeformat='sow')
+        print(f'filled    {len(filled):9d} rows: {elapsed:7.3f} s  '
+              f'memory {frame_nbytes(filled) / 1048576:8.1f} MiB')
+        (df, gap_index), elapsed = timed(import_trajectory, str(trajectory),
+                                         columns=COLUMNS, timeformat='sow',
+                                         fill_with_nans=False, gaps=True)
+        print(f'gap index {len(df):9d} rows: {elapsed:7.3f} s  '
+              f'memory {frame_nbytes(df) / 1048576:8.1f} MiB  {gap_index!r}')
+
+    windows = pd.date_range(gap_index.start, gap_index.stop, freq='10s')
+    continuous, elapsed = timed(lambda: [gap_index.is_continuous(start, stop) for start, stop
+                                         in zip(windows[:-1], windows[1:])])
+    print(f'is_continuous {len(continuous)} windows: {elapsed:7.3f} s '
+          f'({sum(continuous)} continuous)')
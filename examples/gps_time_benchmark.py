@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the conversion of GPS week/seconds-of-week to a DatetimeIndex
+
+The exact int64 nanosecond conversion (time_utils.gps_time_index) is compared
+against the previous float-seconds + pd.to_timedelta conversion for N_SAMPLES
+samples at 10 Hz, followed by the ingestion of a synthetic DGS AT1A gravity
+file and a GPS week/sow trajectory file of the same length.
+
+Usage: python examples/gps_time_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dgp.lib.gravity_ingestor import read_at1a
+from dgp.lib.time_utils import gps_time_index
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+N_SAMPLES = 2000000
+WEEK = 2300
+
+
+def float_conversion(week: pd.Series, sow: pd.Series) -> pd.DatetimeIndex:
+    """The float seconds conversion previously used by the ingestors"""
+    timestamp = 315964800.0 + week.astype('float64') * 604800 + sow.astype('float64')
+    return pd.DatetimeIndex(datetime(1970, 1, 1) + pd.to_timedelta(timestamp * 1e9))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def write_files(path: Path, week: np.ndarray, sow: np.ndarray):
+    n = len(sow)
+    values = np.random.RandomState(0).normal(size=(n, 3))
+    gravity = path.joinpath('gravity.csv')
+    pd.DataFrame({'gravity': values[:, 0], 'long': values[:, 1],
+                  'cross': values[:, 2], 'beam': 0.0, 'temp': 62.25,
+                  'status': 21061, 'pressure': 39.69, 'Etemp': 52.29,
+                  'week': week, 'sow': sow}).to_csv(gravity, header=False, index=False,
+                                                    float_format='%.6f')
+    trajectory = path.joinpath('trajectory.csv')
+    pd.DataFrame({'week': week, 'sow': sow, 'lat': 76.5 + values[:, 0] * 1e-4,
+                  'long': -68.7 + values[:, 1] * 1e-4, 'ell_ht': 65.9 + values[:, 2]}
+                 ).to_csv(trajectory, header=False, index=False, float_format='%.9f')
+    return gravity, trajectory
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    week = pd.Series(np.full(n_samples, WEEK, dtype=np.int64))
+    sow = pd.Series(np.round(0.1 * np.arange(n_samples) + 0.000123456, 9))
+
+    exact, elapsed = timed(gps_time_index, week, sow)
+    print(f'int64 ns conversion  {n_samples} samples: {elapsed:8.3f} s')
+    approx, elapsed = timed(float_conversion, week, sow)
+    print(f'float conversion     {n_samples} samples: {elapsed:8.3f} s')
+    error = np.abs(exact.asi8 - approx.asi8).max()
+    print(f'Maximum error of float conversion: {error} ns')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gravity, trajectory = write_files(Path(tmpdir), week.values, sow.values)
+        df, elapsed = timed(read_at1a, str(gravity), fill_with_nans=False)
+        print(f'read_at1a            {len(df)} samples: {elapsed:8.3f} s')
+        df, elapsed = timed(import_trajectory, str(trajectory), timeformat='sow')
+        print(f'import_trajectory    {len(df)} samples: {elapsed:8.3f} s')
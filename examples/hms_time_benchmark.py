@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the parsing of 'MM/DD/YYYY' + 'HH:MM:SS.SSS' trajectory timestamps
+
+The numeric parser (time_utils.hms_time_index) is compared against the
+previous string concatenation + pd.to_datetime(format=...) for N_SAMPLES
+samples at 200 Hz, followed by the import of a synthetic 'hms' trajectory
+file of the same length.
+
+Usage: python examples/hms_time_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dgp.lib.time_utils import hms_time_index
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+N_SAMPLES = 2000000
+
+
+def string_conversion(mdy: pd.Series, hms: pd.Series) -> pd.DatetimeIndex:
+    """The string based conversion previously used by import_trajectory"""
+    return pd.DatetimeIndex(pd.to_datetime(mdy.str.strip() + hms.str.strip(),
+                                           format="%m/%d/%Y%H:%M:%S.%f"))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    times = pd.date_range('2017-03-22 09:58:59', periods=n_samples, freq='5ms')
+    values = np.random.RandomState(0).normal(size=n_samples)
+    frame = pd.DataFrame({'mdy': times.strftime(' %-m/%d/%Y'),
+                          'hms': times.strftime(' %-H:%M:%S.%f').str[:-3],
+                          'lat': 76.5 + values * 1e-4, 'long': -68.7 + values * 1e-4,
+                          'ell_ht': 65.9 + values})
+
+    index, elapsed = timed(hms_time_index, frame['mdy'].values, frame['hms'].values)
+    print(f'numeric parsing      {n_samples} samples: {elapsed:8.3f} s')
+    expected, elapsed = timed(string_conversion, frame['mdy'], frame['hms'])
+    print(f'string parsing       {n_samples} samples: {elapsed:8.3f} s')
+    assert index.equals(expected)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir).joinpath('trajectory.csv')
+        frame.to_csv(path, header=False, index=False)
+        df, elapsed = timed(import_trajectory, str(path), timeformat='hms',
+                            interval=0.005)
+        print(f'import_trajectory    {len(df)} samples: {elapsed:8.3f} s')
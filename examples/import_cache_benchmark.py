@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the re-import of a raw data file through the import cache
+
+A synthetic DGS AT1A gravity file and a GPS week/sow trajectory file of
+N_SAMPLES samples (see gps_time_benchmark.py) are loaded by a FileLoader
+twice: the first load parses the file (and populates the cache), the second
+is served from the cache.
+
+Usage: python examples/import_cache_benchmark.py [n_samples]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import QApplication
+
+from dgp.core.file_loader import FileLoader
+from dgp.core.import_cache import ImportCache
+from dgp.lib.gravity_ingestor import read_at1a
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+from gps_time_benchmark import WEEK, timed, write_files
+
+N_SAMPLES = 500000
+
+
+def load(path: Path, method, cache: ImportCache, **kwargs) -> pd.DataFrame:
+    results = []
+    loader = FileLoader(path, method, None, cache=cache, **kwargs)
+    loader.loaded.connect(lambda data, _: results.append(data))
+    loader.run()
+    return results[0]
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else N_SAMPLES
+    week = np.full(n_samples, WEEK, dtype=np.int64)
+    sow = np.round(0.1 * np.arange(n_samples) + 0.000123456, 9)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gravity, trajectory = write_files(Path(tmpdir), week, sow)
+        cache = ImportCache(Path(tmpdir).joinpath('cache'))
+        for path, method, kwargs in ((gravity, read_at1a, {}),
+                                     (trajectory, import_trajectory, {'timeformat': 'sow'})):
+            parsed, elapsed = timed(load, path, method, cache, **kwargs)
+            print(f'{method.__name__:18} parse {len(parsed)} samples: {elapsed:8.3f} s')
+            cached, elapsed = timed(load, path, method, cache, **kwargs)
+            print(f'{method.__name__:18} cache {len(cached)} samples: {elapsed:8.3f} s')
+            pd.testing.assert_frame_equal(parsed, cached)
+        size = sum(entry.stat().st_size for entry in cache.path.iterdir()) / 1048576
+        print(f'Cache size: {size:.1f} MiB')
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the time to open (construct the controllers of) a large project
+
+A synthetic AirborneProject is built with a total of N_SEGMENTS DataSegments
+(see project_serialization_benchmark.py), and wrapped in an
+AirborneProjectController within a ProjectTreeModel, as when a project is
+opened by the application. The time to expand a flight and its Segments folder
+(which creates their child controllers on demand) is reported separately.
+
+Usage: python examples/project_open_benchmark.py [n_segments]
+"""
+import sys
+
+from PyQt5.QtWidgets import QApplication
+
+from dgp.core.controllers.project_controllers import AirborneProjectController
+from dgp.core.controllers.project_treemodel import ProjectTreeModel
+
+from project_serialization_benchmark import N_SEGMENTS, build_project, timed
+
+
+def expand(model: ProjectTreeModel, item):
+    index = model.indexFromItem(item)
+    if model.canFetchMore(index):
+        model.fetchMore(index)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    n_segments = int(sys.argv[1]) if len(sys.argv) > 1 else N_SEGMENTS
+    project = build_project(n_segments)
+
+    model, elapsed, peak = timed(lambda: ProjectTreeModel(AirborneProjectController(project)))
+    print(f'Open   {n_segments} segments: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    prj_ctrl = next(model.projects)
+    flt_ctrl = prj_ctrl.get_child(project.flights[0].uid)
+    _, elapsed, peak = timed(expand, model, flt_ctrl)
+    print(f'Expand flight: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    ds_ctrl = next(flt_ctrl.children)
+    _, elapsed, peak = timed(expand, model, ds_ctrl._segments)
+    print(f'Expand {len(ds_ctrl.entity.segments)} segments: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the memory use and encode/decode time of a large project
+
+A synthetic AirborneProject is built with a total of N_SEGMENTS DataSegments
+(spread over N_FLIGHTS flights), which is then round-tripped through the
+ProjectEncoder/ProjectDecoder (AirborneProject.to_json/from_json), and saved
+to and loaded from a (temporary) project directory.
+
+Usage: python examples/project_serialization_benchmark.py [n_segments]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from dgp.core.models.dataset import DataSet, SegmentTable
+from dgp.core.models.flight import Flight
+from dgp.core.models.meter import Gravimeter
+from dgp.core.models.project import AirborneProject, PROJECT_FILE_NAME, sniff_project_type
+from dgp.core.oid import OID
+
+N_SEGMENTS = 100000
+N_FLIGHTS = 10
+
+
+def build_project(n_segments: int, n_flights: int = N_FLIGHTS) -> AirborneProject:
+    project = AirborneProject(name="Benchmark", path=Path('.'))
+    project.add_child(Gravimeter("AT1A-Benchmark"))
+    per_flight = n_segments // n_flights
+    t0 = np.datetime64('2018-01-01', 'ns').astype(np.int64)
+    for i in range(n_flights):
+        start = t0 + np.arange(per_flight, dtype=np.int64) * 60 * 10**9
+        segments = SegmentTable.from_arrays([OID() for _ in range(per_flight)],
+                                            start, start + 30 * 10**9,
+                                            np.arange(per_flight),
+                                            [f'Line {j}' for j in range(per_flight)])
+        # Access each segment as a view, as the application would
+        for _ in segments:
+            pass
+        flight = Flight(f'Flight-{i}', datasets=[DataSet(segments=segments)])
+        project.add_child(flight)
+    return project
+
+
+def load(path: Path) -> AirborneProject:
+    json_str = path.read_text()
+    assert sniff_project_type(json_str) == AirborneProject.__name__
+    return AirborneProject.from_json(json_str)
+
+
+def timed(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    n_segments = int(sys.argv[1]) if len(sys.argv) > 1 else N_SEGMENTS
+
+    project, elapsed, peak = timed(build_project, n_segments)
+    print(f'Build  {n_segments} segments: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    json_str, elapsed, peak = timed(project.to_json)
+    print(f'Encode {len(json_str) / 2**20:.1f} MiB JSON: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    loaded, elapsed, peak = timed(AirborneProject.from_json, json_str)
+    print(f'Decode {n_segments} segments: {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project.path = Path(tmpdir)
+        _, elapsed, peak = timed(project.to_json, True, 2)
+        print(f'Save   (indent=2): {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+        loaded, elapsed, peak = timed(load, project.path.joinpath(PROJECT_FILE_NAME))
+        print(f'Load   (indent=2): {elapsed:8.3f} s  peak {peak:8.1f} MiB')
+
+    count = sum(len(ds.segments) for flt in loaded.flights for ds in flt.datasets)
+    assert count == len(project.flights) * (n_segments // N_FLIGHTS)
@@ -15,6 +15,7 @@ from dgp.gui.settings import set_settings
 from dgp.core import DataType
 from dgp.core.controllers.project_controllers import AirborneProjectController
 from dgp.core.hdf5_manager import HDF5_NAME
+from dgp.core.import_cache import ImportCache, set_import_cache
 from dgp.core.models.datafile import DataFile
 from dgp.core.models.dataset import DataSegment, DataSet
 from dgp.core.models.flight import Flight
@@ -54,6 +55,14 @@ def shim_settings():
         os.unlink(settings.fileName())
 
 
+@pytest.fixture(scope='session', autouse=True)
+def shim_import_cache(tmpdir_factory):
+    """Enable the global import cache (as the application does on startup) in
+    a temporary directory, such that tests never touch the user's cache"""
+    set_import_cache(ImportCache(Path(str(tmpdir_factory.mktemp('import_cache')))))
+    yield
+
+
 def qt_msg_handler(type_, context, message: str):
     level = {
         QtCore.QtDebugMsg: "QtDebug",
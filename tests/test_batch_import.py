@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import CancelledError
+from pathlib import Path
+
+from pandas import HDFStore
+from pandas.testing import assert_frame_equal
+
+from dgp.core import DataType
+from dgp.core.batch_import import BatchImporter, ImportJob, PARSERS
+from dgp.core.controllers import project_controllers
+from dgp.core.controllers.dataset_controller import DataSetController
+from dgp.core.controllers.project_treemodel import ProjectTreeModel
+from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.import_cache import ImportCache
+from dgp.lib.decimation import PYRAMID_FACTORS
+from dgp.lib.gravity_ingestor import read_zls_file
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+TEST_FILE_GRAV = Path('tests/sample_gravity.csv')
+TEST_FILE_TRAJ = Path('tests/sample_trajectory.txt')
+TRAJ_PARAMS = dict(timeformat='hms', skiprows=1)
+
+
+def test_batch_importer(qt_app, tmpdir, gravdata, gpsdata):
+    hdfpath = Path(str(tmpdir.join('dgpdata.hdf5')))
+    importer = BatchImporter(hdfpath, max_workers=2, max_pending=1, cache=None)
+    imported, failed, progress = [], [], []
+    importer.imported.connect(lambda job, data: imported.append(job))
+    importer.failed.connect(lambda job, exc: failed.append((job, exc)))
+    importer.progress.connect(lambda completed, total: progress.append((completed, total)))
+
+    jobs = importer.submit_all([
+        ImportJob(TEST_FILE_GRAV, DataType.GRAVITY),
+        ImportJob(TEST_FILE_TRAJ, DataType.TRAJECTORY, TRAJ_PARAMS),
+        ImportJob(Path('tests/nonexistent.csv'), DataType.GRAVITY),
+        ImportJob(TEST_FILE_GRAV, DataType.GRAVITY, dict(columns=['gravity']))
+    ])
+    assert importer.wait(timeout=30)
+    qt_app.processEvents()
+
+    assert {jobs[0], jobs[1]} == set(imported)
+    assert 0 == importer.pending
+    assert [(1, 4), (2, 4), (3, 4), (4, 4)] == sorted(progress)
+    assert [job for job, _ in importer.errors] == [job for job, _ in failed]
+    assert {jobs[2], jobs[3]} == {job for job, _ in failed}
+    assert isinstance(dict(failed)[jobs[2]], FileNotFoundError)
+
+    HDF5Manager.clear_cache()
+    assert_frame_equal(gravdata, HDF5Manager.load_data(jobs[0].datafile, hdfpath))
+    assert_frame_equal(gpsdata, HDF5Manager.load_data(jobs[1].datafile, hdfpath))
+    importer.shutdown()
+
+
+def test_batch_importer_gap_index(qt_app, tmpdir):
+    # Data is stored as sampled, with its runs, and parsed from the cache
+    # (data and runs) when imported again
+    hdfpath = Path(str(tmpdir.join('dgpdata.hdf5')))
+    cache = ImportCache(Path(str(tmpdir.join('cache'))))
+    importer = BatchImporter(hdfpath, max_workers=1, cache=cache)
+    expected, gap_index = import_trajectory(str(TEST_FILE_TRAJ), gaps=True, **TRAJ_PARAMS)
+    assert 1 < len(gap_index)
+
+    for hits in (0, 1):
+        job = importer.submit(ImportJob(TEST_FILE_TRAJ, DataType.TRAJECTORY, TRAJ_PARAMS))
+        assert importer.wait(timeout=30)
+        assert hits == cache.hits
+        HDF5Manager.clear_cache()
+        assert_frame_equal(expected, HDF5Manager.load_data(job.datafile, hdfpath))
+        stored = HDF5Manager.load_gap_index(job.datafile, hdfpath)
+        assert_frame_equal(gap_index.runs(), stored.runs())
+        # Decimated levels are built on import
+        with HDFStore(str(hdfpath), mode='r') as hdf:
+            assert HDF5Manager.levels_nodepath(job.datafile, PYRAMID_FACTORS[0]) in hdf
+    assert not importer.errors
+    importer.shutdown()
+
+
+def test_batch_importer_method(qt_app, tmpdir):
+    # Jobs may specify their parser, e.g. that of a sniffed format
+    hdfpath = Path(str(tmpdir.join('dgpdata.hdf5')))
+    importer = BatchImporter(hdfpath, cache=None)
+    path = Path('tests/sample_zls/2015_00.316')
+    job = importer.submit(ImportJob(path, DataType.GRAVITY, dict(skiprows=1),
+                                    method=read_zls_file))
+    assert importer.wait(timeout=30)
+    assert not importer.errors
+
+    HDF5Manager.clear_cache()
+    assert_frame_equal(read_zls_file(path), HDF5Manager.load_data(job.datafile, hdfpath))
+    importer.shutdown()
+
+
+def test_batch_importer_cancel(qt_app, tmpdir):
+    importer = BatchImporter(Path(str(tmpdir.join('dgpdata.hdf5'))), max_workers=1,
+                             cache=ImportCache(Path(str(tmpdir.join('cache')))))
+    jobs = importer.submit_all(ImportJob(TEST_FILE_GRAV, DataType.GRAVITY)
+                               for _ in range(4))
+    cancelled = importer.cancel()
+    assert importer.wait(timeout=30)
+    assert 0 < cancelled == len(importer.errors)
+    assert all(isinstance(exc, CancelledError) for _, exc in importer.errors)
+    assert 0 == importer.pending
+    importer.shutdown()
+
+
+def test_project_import_files(qt_app, prj_ctrl, monkeypatch):
+    flt_ctrl = prj_ctrl.get_child(prj_ctrl.entity.flights[0].uid)
+    model = ProjectTreeModel(prj_ctrl)
+    events = []
+    model.progressNotificationRequested.connect(
+        lambda event: events.append((event.value, event.stop)))
+    mutations = []
+    model.projectMutated.connect(lambda: mutations.append(True))
+    ds_ctrl: DataSetController = next(flt_ctrl.children)
+    errors = []
+    monkeypatch.setattr(project_controllers, 'show_error',
+                        lambda title, message, detail=None, parent=None:
+                        errors.append(detail))
+
+    prj_ctrl.import_files([
+        ImportJob(TEST_FILE_GRAV, DataType.GRAVITY, dataset=ds_ctrl),
+        ImportJob(TEST_FILE_TRAJ, DataType.TRAJECTORY, TRAJ_PARAMS, dataset=ds_ctrl),
+        ImportJob(Path('tests/nonexistent.csv'), DataType.GRAVITY, dataset=ds_ctrl)
+    ])
+    assert prj_ctrl.importer.wait(timeout=30)
+    qt_app.processEvents()
+
+    assert ds_ctrl.entity.gravity.source_path == TEST_FILE_GRAV
+    assert ds_ctrl.entity.trajectory.source_path == TEST_FILE_TRAJ
+    assert not ds_ctrl.gravity.empty
+    assert not ds_ctrl.trajectory.empty
+    # The gaps of the data are described by its stored runs, and are only
+    # filled on request
+    gap_index = ds_ctrl.gap_index(DataType.TRAJECTORY)
+    assert len(ds_ctrl.trajectory) == gap_index.rows
+    gridded = ds_ctrl.gridded(DataType.TRAJECTORY)
+    assert len(gridded) > len(ds_ctrl.trajectory)
+    assert gridded.index.equals(gap_index.grid())
+    assert [(1, 3), (2, 3), (3, 3)] == sorted(events)
+    # The DataFiles of the whole import are added in a single batch
+    assert 1 == len(mutations)
+    # Failures are reported once all jobs have completed
+    assert 1 == len(errors)
+    assert 'nonexistent.csv' in errors[0]
+    prj_ctrl.delete()
+
+
+def test_project_delete_importing(qt_app, prj_ctrl):
+    importer = prj_ctrl.importer
+    parsing = threading.Event()
+    release = threading.Event()
+
+    def parse(*args, **kwargs):
+        parsing.set()
+        release.wait(timeout=30)
+        raise ValueError("Released")
+
+    PARSERS[DataType.GRAVITY], original = parse, PARSERS[DataType.GRAVITY]
+    try:
+        prj_ctrl.import_files([ImportJob(TEST_FILE_GRAV, DataType.GRAVITY)
+                               for _ in range(3)])
+        assert parsing.wait(timeout=30)
+        # Does not block on the job being parsed
+        prj_ctrl.delete()
+        assert prj_ctrl._importer is None
+        assert 0 < len(importer.errors)
+    finally:
+        release.set()
+        PARSERS[DataType.GRAVITY] = original
+    assert importer.wait(timeout=30)
@@ -4,12 +4,12 @@ from pathlib import Path
 
 import pytest
 import pandas as pd
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QSortFilterProxyModel
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 from PyQt5.QtWidgets import QWidget, QMenu
 from pandas import DataFrame, Timedelta, Timestamp
 
-from dgp.core import DataType
+from dgp.core import DataType, StateAction
 from dgp.core.oid import OID
 from dgp.core.hdf5_manager import HDF5Manager
 from dgp.core.models.dataset import DataSet, DataSegment
@@ -23,7 +23,9 @@ from dgp.core.controllers.dataset_controller import (DataSetController,
 from dgp.core.models.meter import Gravimeter
 from dgp.core.models.datafile import DataFile
 from dgp.core.controllers.flight_controller import FlightController
+from dgp.core.controllers.project_treemodel import ProjectTreeModel
 from dgp.core.models.flight import Flight
+from dgp.gui.plotting.helpers import LineUpdate
 
 
 def test_attribute_proxy(tmpdir):
@@ -193,6 +195,70 @@ def test_airborne_project_controller(project):
     with pytest.raises(KeyError):
         project_ctrl.remove_child("Not a child")
 
+    # Children are retrieved via the project registry
+    assert fc is project_ctrl.registry.get(flight.uid)
+    assert project_ctrl.registry.get(meter.uid) is None
+    assert project_ctrl.registry.get(flight2.uid) is None
+    # Only the direct children of a controller are returned
+    assert fc.get_child(mtr0.uid) is None
+    assert isinstance(project_ctrl.get_child(mtr0.uid), GravimeterController)
+
     jsons = project_ctrl.save(to_file=False)
     assert isinstance(jsons, str)
 
+
+
+def test_controller_batch(project: AirborneProject):
+    class Observer:
+        def __init__(self):
+            self.updates = 0
+
+        def on_update(self):
+            self.updates += 1
+
+    prj_ctrl = AirborneProjectController(project)
+    model = ProjectTreeModel(prj_ctrl)
+    proxy = QSortFilterProxyModel()
+    proxy.setSourceModel(model)
+    events = {'rows': 0, 'reset': 0, 'mutated': 0}
+    model.rowsInserted.connect(lambda *args: events.__setitem__('rows', events['rows'] + 1))
+    model.modelReset.connect(lambda: events.__setitem__('reset', events['reset'] + 1))
+    model.projectMutated.connect(lambda: events.__setitem__('mutated', events['mutated'] + 1))
+
+    fc = prj_ctrl.get_child(project.flights[0].uid)
+    dsc: DataSetController = next(fc.children)
+    observer = Observer()
+    fc.register_observer(observer, observer.on_update, StateAction.UPDATE)
+    index = dsc.segment_index(pd.DatetimeIndex([]))
+    flights = proxy.rowCount(proxy.mapFromSource(prj_ctrl.flights.index()))
+    events['rows'] = 0
+
+    t0 = Timestamp('2018-01-01')
+    with prj_ctrl.batch():
+        assert dsc.batching
+        segments = [dsc.add_child(LineUpdate(StateAction.CREATE, OID(), t0 + Timedelta(minutes=i),
+                                             t0 + Timedelta(minutes=i + 1), f'L{i}'))
+                    for i in range(20)]
+        assert 20 == len(segments)
+        assert dsc.batching
+        for i in range(3):
+            fc.set_attr('notes', f'Note {i}')
+            prj_ctrl.add_child(Flight(f'Batch-{i}'))
+        # Rows are signalled as usual, so views and proxies track them
+        assert 0 == observer.updates
+        assert 23 <= events['rows']
+        assert 0 == events['mutated']
+        assert flights + 3 == proxy.rowCount(proxy.mapFromSource(prj_ctrl.flights.index()))
+
+    assert not dsc.batching
+    assert 1 == observer.updates
+    assert 0 == events['reset']
+    assert 1 == events['mutated']
+    assert 22 == len(dsc.entity.segments) == dsc._segments.rowCount()
+    assert 22 == len(dsc.segment_index(index.index))
+
+    # Outside of a batch updates are notified immediately
+    fc.set_attr('notes', 'Unbatched')
+    assert 2 == observer.updates
+    prj_ctrl.add_child(Flight('Unbatched'))
+    assert 2 == events['mutated']
@@ -15,8 +15,10 @@ from dgp.core.models.dataset import DataSet, DataSegment
 from dgp.core.models.flight import Flight
 from dgp.core.models.project import AirborneProject
 from dgp.core.controllers.project_controllers import AirborneProjectController
-from dgp.core.controllers.dataset_controller import DataSetController, DataSegmentController
+from dgp.core.controllers.dataset_controller import (DataSetController, DataSegmentController,
+                                                    SegmentIndex)
 from dgp.gui.plotting.helpers import LineUpdate
+from dgp.lib.transform.transform_graphs import AirbornePost
 
 
 def test_dataset_controller(tmpdir):
@@ -39,6 +41,9 @@ def test_dataset_controller(tmpdir):
     prj_ctrl = AirborneProjectController(prj)
     fc0 = prj_ctrl.get_child(flt.uid)
     dsc: DataSetController = fc0.get_child(ds.uid)
+    # Segment controllers are created on demand
+    assert 0 == dsc._segments.rowCount()
+    assert 1 == len(list(dsc.children))
     assert 1 == dsc._segments.rowCount()
 
     assert isinstance(dsc, DataSetController)
@@ -164,3 +169,90 @@ def test_dataset_data_api(project: AirborneProject, hdf5file, gravdata, gpsdata)
 
         assert expected[col].equals(series)
 
+    # Gap index of the (NaN filled) trajectory ignores the filled rows
+    gap_index = dataset_ctrl.gap_index(DataType.TRAJECTORY)
+    assert gap_index is dataset_ctrl.gap_index(DataType.TRAJECTORY)
+    assert gpsdata.notnull().any(axis=1).sum() == gap_index.rows
+    assert gap_index.is_continuous(gap_index.start, gap_index.start)
+    assert not gap_index.is_continuous(gap_index.start, gap_index.stop) or 1 == len(gap_index)
+
+    # Appended data is re-loaded by the dataset and its clones, and observers
+    # are notified of the new data version
+    clone = dataset_ctrl.clone()
+    assert not clone.trajectory.empty
+    version = dataset_ctrl.data_version
+    updates = []
+
+    class Observer:
+        def on_update(self):
+            updates.append(clone.data_version)
+
+    observer = Observer()
+    clone.register_observer(observer, observer.on_update, StateAction.UPDATE)
+    result_key = dataset_ctrl.result_key(AirbornePost, begin_static=0)
+    dataset_ctrl.data_appended(gpsfile)
+    assert gap_index is not dataset_ctrl.gap_index(DataType.TRAJECTORY)
+    assert version < dataset_ctrl.data_version
+    assert [clone.data_version] == updates
+    assert clone._trajectory.empty
+    # Results computed before the data changed are not reused
+    assert result_key != dataset_ctrl.result_key(AirbornePost, begin_static=0)
+
+
+
+def test_dataset_segment_index(project: AirborneProject):
+    prj_ctrl = AirborneProjectController(project)
+    flt_ctrl = prj_ctrl.get_child(project.flights[0].uid)
+    ds_ctrl: DataSetController = flt_ctrl.get_child(flt_ctrl.entity.datasets[0].uid)
+    for segment in list(ds_ctrl.children):
+        ds_ctrl.remove_child(segment.uid, confirm=False)
+
+    index = pd.date_range('2018-01-01', periods=1000, freq='1s')
+    seg1 = ds_ctrl.add_child(LineUpdate(StateAction.CREATE, OID(), index[10],
+                                        index[100], 'line1'))
+    seg_index = ds_ctrl.segment_index(index)
+    assert seg_index is ds_ctrl.segment_index(index)
+    assert slice(10, 100) == seg_index[seg1.uid]
+
+    # Segments added/modified/removed after creation update the index
+    seg2 = ds_ctrl.add_child(LineUpdate(StateAction.CREATE, OID(), index[200],
+                                        index[300], None))
+    assert slice(200, 300) == seg_index[seg2.uid]
+    seg1.set_attr('stop', index[150])
+    assert [(seg1.uid, 'line1', slice(10, 150)), (seg2.uid, None, slice(200, 300))] \
+        == list(seg_index)
+
+    ds_ctrl.remove_child(seg1.uid, confirm=False)
+    assert 1 == len(seg_index)
+    assert slice(200, 300) == seg_index[seg2.uid]
+    with pytest.raises(KeyError):
+        _ = seg_index[seg1.uid]
+
+    # A new index (e.g. a new transform result) rebuilds the segment index
+    assert seg_index is not ds_ctrl.segment_index(index[::2])
+    assert slice(100, 150) == ds_ctrl.segment_index(index[::2])[seg2.uid]
+
+
+def test_segment_index_order():
+    index = pd.date_range('2018-01-01', periods=1000, freq='1s')
+    seg_c = DataSegment(OID(), index[600], index[700], 2, 'C')
+    seg_a = DataSegment(OID(), index[100], index[200], 0, 'A')
+    seg_index = SegmentIndex(index, [seg_c, seg_a])
+    assert ['A', 'C'] == [label for _, label, _ in seg_index]
+
+    # Segments added out of order are inserted by start
+    seg_b = DataSegment(OID(), index[300], index[400], 1, 'B')
+    seg_index.update(seg_b)
+    assert ['A', 'B', 'C'] == [label for _, label, _ in seg_index]
+
+    # Moving a segment re-orders it
+    seg_a.start = index[800]
+    seg_a.stop = index[900]
+    seg_index.update(seg_a)
+    assert [(seg_b.uid, 'B', slice(300, 400)), (seg_c.uid, 'C', slice(600, 700)),
+            (seg_a.uid, 'A', slice(800, 900))] == list(seg_index)
+    assert slice(800, 900) == seg_index[seg_a.uid]
+
+    seg_index.remove(seg_b.uid)
+    assert [seg_c.uid, seg_a.uid] == [uid for uid, _, _ in seg_index]
+    assert slice(600, 700) == seg_index[seg_c.uid]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgp.lib.decimation import (minmax_reduce, build_levels, interleave,
+                                envelope, DecimationPyramid)
+
+
+@pytest.fixture
+def channel() -> pd.Series:
+    index = pd.date_range('2018-01-01', periods=100000, freq='100ms')
+    values = np.sin(np.linspace(0, 20 * np.pi, len(index)))
+    values[54321] = 50.0  # Transient spike
+    return pd.Series(values, index=index, name='gravity')
+
+
+def test_minmax_reduce():
+    values = np.array([1, 5, np.nan, 3, -2, 4, np.nan, np.nan], dtype=float)
+    mins, maxs = minmax_reduce(values, 3)
+    np.testing.assert_array_equal([1, -2, np.nan], mins)
+    np.testing.assert_array_equal([5, 4, np.nan], maxs)
+
+    mins, maxs = minmax_reduce(np.array([]), 10)
+    assert 0 == len(mins) == len(maxs)
+
+
+def test_build_levels(channel):
+    frame = channel.to_frame()
+    frame['status'] = True
+    frame['label'] = 'line'
+    levels = build_levels(frame, factors=(10, 100, 1000))
+
+    assert [10, 100, 1000] == list(levels)
+    for factor, level in levels.items():
+        assert int(np.ceil(len(channel) / factor)) == len(level)
+        assert {'gravity_min', 'gravity_max', 'status_min', 'status_max'} == set(level.columns)
+        assert channel.index[0] == level.index[0]
+        # Peak must be preserved at every level
+        assert 50.0 == level['gravity_max'].max()
+        assert channel.min() == level['gravity_min'].min()
+
+    # Levels reduced from a finer level match levels reduced from the raw data
+    direct = build_levels(frame, factors=(100,))[100]
+    assert direct.equals(levels[100])
+
+
+def test_interleave():
+    x, y = interleave(np.array([0., 10.]), np.array([1., 2.]), np.array([3., 4.]))
+    np.testing.assert_array_equal([0, 0, 10, 10], x)
+    np.testing.assert_array_equal([1, 3, 2, 4], y)
+
+
+def test_envelope(channel):
+    x = pd.to_numeric(channel.index).values.astype(float)
+    ex, ey = envelope(x, channel.values, max_points=2000)
+    assert len(ex) == len(ey) <= 2000
+    assert 50.0 == ey.max()
+    assert channel.min() == ey.min()
+    assert x[0] == ex[0]
+
+    # Short arrays are returned as is
+    ex, ey = envelope(x[:100], channel.values[:100], max_points=2000)
+    assert 100 == len(ex)
+
+
+def test_pyramid_view_bounded(channel):
+    # Without stored levels the visible slice is reduced on the fly
+    pyramid = DecimationPyramid(pd.to_numeric(channel.index), channel.values, {})
+    x, y = pyramid.view(pyramid.x[0], pyramid.x[-1], max_points=1000)
+    assert len(x) <= 1000
+    assert 50.0 == y.max()
+
+    # Point count stays bounded when the coarsest level is still too large
+    pyramid = DecimationPyramid.from_series(channel, factors=(10,))
+    x, y = pyramid.view(pyramid.x[0], pyramid.x[-1], max_points=1000)
+    assert len(x) <= 1000
+    assert 50.0 == y.max()
+
+
+def test_pyramid_view(channel):
+    pyramid = DecimationPyramid.from_series(channel)
+    assert len(channel) == len(pyramid)
+    x0, x1 = pyramid.x[0], pyramid.x[-1]
+
+    # Full extent at low resolution uses the coarsest level
+    assert 1000 == pyramid.select_level(x0, x1, max_points=500)
+    x, y = pyramid.view(x0, x1, max_points=500)
+    assert len(x) <= 2 * np.ceil(len(channel) / 1000)
+    assert 50.0 == y.max()
+
+    # Narrow window resolves to raw data, extent is kept by the coarse level
+    x0, x1 = pyramid.x[54000], pyramid.x[54500]
+    assert 1 == pyramid.select_level(x0, x1, max_points=1000)
+    x, y = pyramid.view(x0, x1, max_points=1000)
+    assert pyramid.x[0] == x[0]
+    assert pyramid.x[-1] <= x[-1] + 1000 * 1e8
+    assert len(x) < 2000
+    assert 50.0 == y.max()
+    assert np.all(np.diff(x) >= 0)
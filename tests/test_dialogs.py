@@ -16,6 +16,7 @@ from dgp.core.models.dataset import DataSet
 from dgp.core.controllers.flight_controller import FlightController
 from dgp.core.models.flight import Flight
 from dgp.core.controllers.project_controllers import AirborneProjectController
+from dgp.core.file_loader import parse_file
 from dgp.core.models.project import AirborneProject
 from dgp.core.types.enumerations import DataType
 from dgp.gui.dialogs.add_gravimeter_dialog import AddGravimeterDialog
@@ -24,6 +25,8 @@ from dgp.gui.dialogs.data_import_dialog import DataImportDialog
 from dgp.gui.dialogs.create_project_dialog import CreateProjectDialog
 from dgp.gui.dialogs.dialog_mixins import FormValidator
 from dgp.gui.dialogs.custom_validators import FileExistsValidator, DirectoryValidator
+from dgp.lib.gravity_ingestor import read_zls_file
+from dgp.lib.trajectory_ingestor import import_trajectory
 
 
 @pytest.fixture
@@ -155,6 +158,11 @@ class TestDialogs:
         assert _grav_map['columns']() is None
         assert _grav_map['interp']()
         assert not _grav_map['skiprows']()
+        # Compaction is on by default, and can be disabled
+        assert _grav_map['compact']()
+        dlg.qchb_grav_compact.setChecked(False)
+        assert not _grav_map['compact']()
+        dlg.qchb_grav_compact.setChecked(True)
 
         _traj_map = dlg._params_map[DataType.TRAJECTORY]
         _time_col_map = {
@@ -176,6 +184,45 @@ class TestDialogs:
         dlg.qchb_traj_isutc.setChecked(False)
         assert not _traj_map['is_utc']()
 
+        # Sniffing the selected file configures the dialog for its format
+        assert not _traj_map['delim_whitespace']()
+        dlg.qle_filepath.setText(str(Path('tests/sample_trajectory.txt').absolute()))
+        assert dlg.file_format.valid
+        assert DataType.TRAJECTORY == dlg.datatype
+        assert 'hms' == _traj_map['timeformat']()
+        assert 1 == _traj_map['skiprows']()
+        assert dlg.file_format.columns == _traj_map['columns']()
+        assert '11' == dlg.qle_linecount.text()
+        assert 6 == dlg._preview_model.columnCount()
+        assert 10 == dlg._preview_model.rowCount()
+        dlg.qcb_traj_timeformat.setCurrentIndex(1)
+        assert _time_col_map['sow'] == _traj_map['columns']()
+
+        # All lines of a multi-line header are skipped
+        lines = Path('tests/sample_trajectory.txt').read_text().splitlines()
+        two_headers = Path(str(tmpdir.join('two_headers.txt')))
+        two_headers.write_text('\n'.join(['Exported trajectory'] + lines))
+        dlg.qle_filepath.setText(str(two_headers))
+        assert 2 == dlg.file_format.skiprows
+        assert 2 == _traj_map['skiprows']()
+        params = {key: value() for key, value in _traj_map.items()}
+        traj = parse_file(two_headers, import_trajectory, cache=None, **params)
+        assert dlg.file_format.preview.index.equals(traj.index)
+        dlg.qchb_traj_hasheader.setChecked(False)
+        assert 0 == _traj_map['skiprows']()
+        dlg.qchb_traj_hasheader.setChecked(True)
+
+        # ZLS files are imported with the sniffed parser, and the gravity params
+        dlg.qle_filepath.setText(str(Path('tests/sample_zls/2015_00.316').absolute()))
+        assert DataType.GRAVITY == dlg.datatype
+        assert read_zls_file is dlg.method
+        params = {key: value() for key, value in _grav_map.items()}
+        zls = parse_file(dlg.file_path, dlg.method, cache=None, **params)
+        assert 3600 == len(zls)
+        dlg.qlw_datatype.setCurrentRow(1)
+        assert dlg.method is None
+        dlg.qle_filepath.setText(str(_srcpath))
+
         # Test emission of DataFile on _load_file
         # TODO: Fix this, need an actual file to test loading
         # assert dlg.datatype == DataType.GRAVITY
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from dgp.lib.dtype_policy import compact_frame, float32_lossless, frame_nbytes
+
+
+def test_float32_lossless():
+    assert float32_lossless(np.array([-0.093803, 0.026226, np.nan]))
+    assert float32_lossless(np.array([12754.71, 12747.7]))
+    assert not float32_lossless(np.array([10061.171360, 62.253987]))
+    assert not float32_lossless(np.array([1e300]))
+    assert float32_lossless(np.array([np.nan]))
+
+
+def test_compact_frame():
+    n = 100
+    df = pd.DataFrame({'beam': np.round(np.linspace(-1, 1, n), 4),
+                       'gravity': 10000 + np.linspace(0, 1, n),
+                       'week': np.full(n, 2000, dtype=np.int64),
+                       'offset': np.arange(n) - 50,
+                       'line': ['LINE1'] * 60 + ['LINE2'] * 40,
+                       'label': [str(i) for i in range(n)],
+                       'flag': np.arange(n) % 2 == 0})
+
+    compacted, report = compact_frame(df, dtypes={'offset': np.int32}, float32=['beam'])
+    assert np.float32 == compacted['beam'].dtype
+    assert np.float64 == compacted['gravity'].dtype
+    assert np.uint16 == compacted['week'].dtype
+    assert np.int32 == compacted['offset'].dtype
+    assert 'category' == compacted['line'].dtype
+    assert object == compacted['label'].dtype
+    assert bool == compacted['flag'].dtype
+    assert list(df.columns) == list(compacted.columns)
+    assert np.int64 == df['week'].dtype
+
+    assert frame_nbytes(df) == report.before
+    assert frame_nbytes(compacted) == report.after
+    assert 0 < report.saved
+    assert ('int64', 'uint16') == report.dtypes['week']
+    assert {'beam', 'week', 'offset', 'line'} == set(report.dtypes)
+    for col in ('gravity', 'week', 'offset', 'line', 'label', 'flag'):
+        assert df[col].tolist() == compacted[col].tolist()
+    np.testing.assert_array_equal(df['beam'], compacted['beam'].astype(np.float64).round(4))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import functools
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from PyQt5.QtTest import QSignalSpy
+from pandas.testing import assert_frame_equal
+
+from dgp.core import DataType
+from dgp.core.batch_import import ImportJob
+from dgp.core.file_follower import FileFollower, RingBuffer
+from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.models.datafile import DataFile
+from dgp.lib.gravity_ingestor import read_at1a
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+TEST_FILE_GRAV = Path('tests/sample_gravity.csv')
+TEST_FILE_TRAJ = Path('tests/sample_trajectory.txt')
+
+
+def _wait_until(qt_app, predicate, timeout=5.0):
+    # Process the (queued) signals of a following FileFollower until predicate
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out waiting for FileFollower"
+        qt_app.processEvents()
+        time.sleep(0.01)
+
+
+def test_ring_buffer():
+    frame = pd.DataFrame({'a': np.arange(10.), 'b': np.arange(10) % 2 == 0},
+                         index=pd.date_range('2018-01-01', periods=10, freq='100ms'))
+    buffer = RingBuffer(capacity=4)
+    assert buffer.frame().empty
+
+    buffer.append(frame.iloc[:3])
+    assert_frame_equal(frame.iloc[:3], buffer.frame(), check_freq=False)
+    buffer.append(frame.iloc[3:5])
+    assert_frame_equal(frame.iloc[1:5], buffer.frame(), check_freq=False)
+    buffer.append(frame.iloc[5:])
+    assert 4 == len(buffer)
+    assert_frame_equal(frame.iloc[6:], buffer.frame(), check_freq=False)
+
+    with pytest.raises(ValueError):
+        buffer.append(frame[['a']])
+
+
+def test_follow_growing_file(qt_app, tmpdir):
+    lines = TEST_FILE_GRAV.read_bytes().splitlines(keepends=True)
+    path = Path(str(tmpdir.join('gravity.csv')))
+    hdfpath = Path(str(tmpdir.join('dgpdata.hdf5')))
+    datafile = DataFile(DataType.GRAVITY, None, path)
+    follower = FileFollower(path, read_at1a, qt_app, datafile=datafile,
+                            hdfpath=hdfpath, capacity=6)
+    spy_appended = QSignalSpy(follower.appended)
+
+    # The file need not exist yet
+    assert 0 == follower.poll()
+    path.write_bytes(b''.join(lines[:3]) + lines[3][:20])
+    assert 3 == follower.poll()
+    # A partially written line is ingested once complete
+    assert 0 == follower.poll()
+    with path.open('ab') as fd:
+        fd.write(lines[3][20:] + b''.join(lines[4:]))
+    assert len(lines) - 3 == follower.poll()
+    assert path.stat().st_size == follower.offset
+    assert 2 == len(spy_appended)
+
+    expected = read_at1a(str(TEST_FILE_GRAV), fill_with_nans=False)
+    assert_frame_equal(expected.iloc[-6:], follower.frame(), check_freq=False)
+    HDF5Manager.clear_cache()
+    stored = HDF5Manager.load_data(datafile, hdfpath)
+    assert_frame_equal(expected, stored, check_freq=False)
+    metadata = HDF5Manager.get_metadata(datafile, hdfpath)
+    assert len(lines) == metadata['rows']
+    assert expected.index[-1] == metadata['end']
+
+    # Truncation restarts from the start of the file
+    spy_reset = QSignalSpy(follower.reset)
+    path.write_bytes(b''.join(lines[:2]))
+    assert 2 == follower.poll()
+    assert 1 == len(spy_reset)
+    assert 2 == len(follower.buffer)
+
+
+def test_follow_file_skiprows(qt_app, tmpdir):
+    lines = TEST_FILE_TRAJ.read_bytes().splitlines(keepends=True)
+    path = Path(str(tmpdir.join('trajectory.txt')))
+    follower = FileFollower(path, import_trajectory, qt_app, timeformat='hms',
+                            columns=['mdy', 'hms', 'lat', 'long', 'ortho_ht',
+                                     'ell_ht', 'num_stats', 'pdop'],
+                            skiprows=1)
+    path.write_bytes(lines[0])
+    assert 0 == follower.poll()
+    with path.open('ab') as fd:
+        fd.write(b''.join(lines[1:]))
+    assert 0 < follower.poll()
+    expected = import_trajectory(str(TEST_FILE_TRAJ), timeformat='hms', skiprows=1,
+                                 columns=['mdy', 'hms', 'lat', 'long', 'ortho_ht',
+                                          'ell_ht', 'num_stats', 'pdop'],
+                                 fill_with_nans=False)
+    assert_frame_equal(expected, follower.frame(), check_freq=False)
+
+
+def test_project_follow_file(qt_app, prj_ctrl, tmpdir):
+    flt_ctrl = prj_ctrl.get_child(prj_ctrl.entity.flights[0].uid)
+    ds_ctrl = next(flt_ctrl.children)
+    lines = TEST_FILE_GRAV.read_bytes().splitlines(keepends=True)
+    path = Path(str(tmpdir.join('gravity.csv')))
+    path.write_bytes(b''.join(lines[:4]))
+
+    threads = []
+
+    @functools.wraps(read_at1a)
+    def parse(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return read_at1a(*args, **kwargs)
+
+    follower = prj_ctrl.follow_file(ImportJob(path, DataType.GRAVITY, dataset=ds_ctrl,
+                                              method=parse), interval=10)
+    assert follower.following
+    _wait_until(qt_app, lambda: follower.datafile is ds_ctrl.entity.gravity)
+    assert 4 == len(ds_ctrl.gravity)
+
+    with path.open('ab') as fd:
+        fd.write(b''.join(lines[4:]))
+    _wait_until(qt_app, lambda: len(lines) == len(ds_ctrl.gravity))
+    # Files are parsed in the background, not by the GUI thread
+    assert threads and threading.main_thread() not in threads
+    prj_ctrl.unfollow_file(follower)
+    assert not follower.following
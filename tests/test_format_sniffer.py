@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+from dgp.core.format_sniffer import sniff_format
+from dgp.core.types.enumerations import DataType, MeterTypes
+from dgp.lib.gravity_ingestor import read_at1a, read_zls, read_zls_file
+from dgp.lib.trajectory_ingestor import import_trajectory
+
+
+def test_sniff_at1a():
+    fmt = sniff_format('tests/sample_gravity.csv')
+    assert fmt.valid
+    assert DataType.GRAVITY is fmt.datatype
+    assert MeterTypes.AT1A is fmt.meter
+    assert 10 == fmt.ncolumns
+    assert not fmt.has_header
+    assert 9 == fmt.line_count and fmt.exact_count
+    assert read_at1a is fmt.method
+    assert_frame_equal(read_at1a('tests/sample_gravity.csv', fill_with_nans=False),
+                       fmt.preview)
+
+
+@pytest.mark.parametrize('path, timeformat, columns', [
+    ('tests/sample_trajectory.txt', 'hms',
+     ['mdy', 'hms', 'lat', 'long', 'ortho_ht', 'ell_ht', 'num_sats', 'pdop']),
+    ('tests/sample_trajectory_week-sow.txt', 'sow',
+     ['week', 'sow', 'lat', 'long', 'ell_ht', 'ortho_ht', 'num_sats', 'pdop']),
+])
+def test_sniff_trajectory(path, timeformat, columns):
+    fmt = sniff_format(path)
+    assert DataType.TRAJECTORY is fmt.datatype
+    assert fmt.meter is None
+    assert 1 == fmt.skiprows
+    assert timeformat == fmt.timeformat
+    assert columns == fmt.columns
+
+    # The sniffed parameters parse the whole file
+    df = import_trajectory(path, **fmt.params)
+    assert fmt.preview.columns.equals(df.columns)
+    assert df.index.equals(fmt.preview.index)
+
+
+def test_sniff_trajectory_serial_whitespace(tmpdir):
+    path = Path(str(tmpdir.join('trajectory.txt')))
+    datenum = 736776.415 + np.arange(200) / 864000
+    path.write_text('\n'.join(f'{d!r}\t76.5350241\t-68.7218956\t65.898' for d in datenum))
+
+    fmt = sniff_format(path, nbytes=1024)
+    assert DataType.TRAJECTORY is fmt.datatype
+    assert 'serial' == fmt.timeformat
+    assert fmt.delimiter is None
+    assert ['datenum', 'lat', 'long', 'ell_ht'] == fmt.columns
+    assert not fmt.exact_count
+    assert 150 < fmt.line_count < 250
+    assert len(fmt.preview) < 200
+
+
+def test_sniff_zls():
+    fmt = sniff_format('tests/sample_zls/2015_00.316')
+    assert DataType.GRAVITY is fmt.datatype
+    assert MeterTypes.ZLS is fmt.meter
+    assert read_zls_file is fmt.method
+
+    # The sniffed parser reads the hour of the survey directory in the file
+    df = fmt.method(fmt.path, **fmt.params)
+    survey = read_zls('tests/sample_zls')
+    assert df.equals(survey[df.index[0]:df.index[-1]])
+    assert df.iloc[:len(fmt.preview)].equals(fmt.preview)
+
+
+def test_sniff_datatype_and_invalid():
+    fmt = sniff_format('tests/sample_gravity.csv', datatype=DataType.TRAJECTORY)
+    assert not fmt.valid
+    assert {} == fmt.params
+
+    fmt = sniff_format('tests/at1m.ini')
+    assert not fmt.valid
+    assert fmt.preview is None
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from dgp.lib.gap_index import GapIndex
+
+START = pd.Timestamp('2018-05-10 12:00:00')
+INTERVAL = pd.Timedelta('100ms')
+
+
+def _index(steps, jitter=None):
+    ticks = START.value + np.asarray(steps, dtype=np.int64) * INTERVAL.value
+    if jitter is not None:
+        ticks = ticks + np.asarray(jitter, dtype=np.int64)
+    return pd.DatetimeIndex(ticks)
+
+
+def test_gap_index_runs_and_gaps():
+    # Two runs of 5 and 3 samples, with 4 missing samples between them
+    index = _index(list(range(5)) + list(range(9, 12)))
+    gap_index = GapIndex.from_index(index, INTERVAL)
+
+    assert 2 == len(gap_index)
+    assert 8 == gap_index.rows
+    assert 10.0 == gap_index.rate
+    assert START == gap_index.start
+    assert START + 11 * INTERVAL == gap_index.stop
+
+    runs = gap_index.runs()
+    assert [5, 3] == runs['rows'].tolist()
+    assert START + 4 * INTERVAL == runs['stop'][0]
+    assert START + 9 * INTERVAL == runs['start'][1]
+
+    gaps = gap_index.gaps()
+    assert 1 == len(gaps)
+    assert 4 == gaps['missing'][0]
+
+
+def test_gap_index_is_continuous():
+    gap_index = GapIndex.from_index(_index(list(range(5)) + list(range(9, 12))), INTERVAL)
+
+    assert gap_index.is_continuous(START, START + 4 * INTERVAL)
+    assert gap_index.is_continuous(START + 10 * INTERVAL, START + 9 * INTERVAL)
+    assert not gap_index.is_continuous(START, START + 9 * INTERVAL)
+    assert not gap_index.is_continuous(START + 5 * INTERVAL, START + 6 * INTERVAL)
+    assert not gap_index.is_continuous(START - INTERVAL, START)
+    assert not gap_index.is_continuous(START, START + 12 * INTERVAL)
+
+
+def test_gap_index_snap_jitter():
+    # Jitter within tolerance (10% of the interval) is snapped to the grid
+    jitter = [0, 4, -6, 9, -3, 2]
+    jitter = np.array(jitter) * 1000000  # ms
+    index = _index(range(6), jitter)
+    snapped, gap_index = GapIndex.snap(index, INTERVAL)
+
+    assert 1 == len(gap_index)
+    assert _index(range(6)).equals(snapped)
+
+    # A sample late by more than twice the tolerance starts a new run
+    index = _index(range(6), [0, 0, 0, 30000000, 30000000, 30000000])
+    snapped, gap_index = GapIndex.snap(index, INTERVAL)
+    assert 2 == len(gap_index)
+    assert [3, 3] == gap_index.runs()['rows'].tolist()
+    assert index.equals(snapped)
+
+
+def test_gap_index_reindex():
+    index = _index([0, 1, 2, 6, 7])
+    data = pd.DataFrame({'gravity': np.arange(5, dtype=float)}, index=index)
+    gap_index = GapIndex.from_frame(data, INTERVAL)
+
+    grid = gap_index.grid()
+    assert 8 == len(grid)
+    assert pd.Timedelta(INTERVAL) == grid[1] - grid[0]
+
+    filled = gap_index.reindex(data)
+    assert 8 == len(filled)
+    assert 3 == filled['gravity'].isnull().sum()
+    assert filled['gravity'].dropna().equals(data['gravity'])
+
+    # All-null rows are ignored when computing the runs of a filled frame
+    assert 2 == len(GapIndex.from_frame(filled, INTERVAL))
+
+
+def test_gap_index_snap_absolute_grid():
+    # Runs starting within tolerance of a multiple of the interval are
+    # snapped to the absolute grid, others keep their phase
+    index = _index(range(4), [2000000, -1000000, 3000000, 0])
+    snapped, _ = GapIndex.snap(index, INTERVAL)
+    assert _index(range(4)).equals(snapped)
+
+    index = _index(range(4), [40000000] * 4)
+    snapped, _ = GapIndex.snap(index, INTERVAL)
+    assert index.equals(snapped)
+
+
+def test_gap_index_snap_drift():
+    # A clock running at 90 ms on the 100 ms grid stays within the spacing
+    # tolerance of its neighbours, but drifts off the grid of its run: no
+    # sample may be moved by more than the tolerance, or onto another sample
+    ticks = START.value + np.arange(1000, dtype=np.int64) * 90000000
+    index = pd.DatetimeIndex(ticks)
+    snapped, gap_index = GapIndex.snap(index, INTERVAL)
+
+    assert snapped.is_unique
+    assert snapped.is_monotonic_increasing
+    assert np.abs(snapped.asi8 - ticks).max() <= 0.1 * INTERVAL.value
+    assert 1000 == gap_index.rows
+    assert len(gap_index) > 1
+
+    # Reindexing keeps every (snapped) sample, whatever the phase of its run
+    data = pd.DataFrame({'gravity': np.arange(1000, dtype=float)}, index=snapped)
+    filled = gap_index.reindex(data)
+    assert filled.index.is_monotonic_increasing
+    assert filled['gravity'].dropna().equals(data['gravity'])
+
+
+def test_gap_index_reindex_phase_shift():
+    # A second run (e.g. after a logger restart) shifted by 50 ms from the
+    # grid of the first
+    first = _index(range(200))
+    second = _index(range(300, 500), [50000000] * 200)
+    index = first.append(second)
+    data = pd.DataFrame({'gravity': np.arange(400, dtype=float)}, index=index)
+    snapped, gap_index = GapIndex.snap(index, INTERVAL)
+    assert index.equals(snapped)
+    assert 2 == len(gap_index)
+
+    filled = gap_index.reindex(data)
+    assert 400 == filled['gravity'].notnull().sum()
+    assert filled['gravity'].dropna().equals(data['gravity'])
+    # The gap is filled on the grid of the run preceding it
+    assert 301 + 200 == len(filled)
+    assert (filled.index[1:] - filled.index[:-1]).max() <= INTERVAL
@@ -1,5 +1,6 @@
 # coding: utf-8
 
+import io
 import os
 import unittest
 import pandas as pd
@@ -68,7 +69,7 @@ class TestGravityIngestor(unittest.TestCase):
         self.assertFalse(df.gps_sync[8])
 
     def test_import_at1a_fill_nans(self):
-        df = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'))
+        df = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'), fill_with_nans=True)
         self.assertEqual(df.shape, (10, 26))
 
         fields = ['gravity', 'long_accel', 'cross', 'beam', 'temp', 'status', 'pressure', 'Etemp', 'GPSweek', 'GPSweekseconds']
@@ -81,12 +82,63 @@ class TestGravityIngestor(unittest.TestCase):
         self.assertTrue(df.iloc[[2]].isnull().values.all())
 
     def test_import_at1a_interp(self):
-        df = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'), interp=True)
+        df = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'), interp=True,
+                          fill_with_nans=True)
         self.assertEqual(df.shape, (10, 26))
 
         # check whether NaNs were interpolated for numeric type fields
         self.assertTrue(df.iloc[[2]].notnull().values.any())
 
+    def test_import_at1a_compact(self):
+        expanded = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'),
+                                fill_with_nans=True)
+        df = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'), compact=True,
+                          float32=True, fill_with_nans=True)
+        self.assertEqual(df.shape, (10, 10))
+        self.assertEqual(df['status'].dtype, np.uint32)
+        self.assertEqual(df['beam'].dtype, np.float32)
+        # Not representable to 6 decimals in single precision
+        self.assertEqual(df['gravity'].dtype, np.float64)
+        np.testing.assert_array_equal(df['gravity'], expanded['gravity'])
+        np.testing.assert_array_equal(df['beam'].astype(np.float64).round(6),
+                                      expanded['beam'])
+
+        bits = gi.status_bits(df['status'])
+        self.assertEqual(list(bits.columns), gi.DGS_AT1A_STATUS_FIELDS)
+        self.assertTrue(bits.index.equals(df.index))
+        valid = expanded['gps_week'].notnull()
+        self.assertTrue(bits[valid].equals(expanded.loc[valid, gi.DGS_AT1A_STATUS_FIELDS].astype(bool)))
+        self.assertFalse(bits[~valid].values.any())
+
+    def test_import_at1a_repair(self):
+        with open(os.path.abspath('tests/sample_gravity.csv')) as fd:
+            lines = fd.read().splitlines()
+        # Duplicate the second line, and replay the first two after the fourth
+        glitched = '\n'.join(lines[:2] + lines[1:4] + lines[:2] + lines[4:])
+        expected = gi.read_at1a(os.path.abspath('tests/sample_gravity.csv'))
+
+        df = gi.read_at1a(io.StringIO(glitched))
+        self.assertTrue(df.index.equals(expected.index))
+        self.assertTrue(df.equals(expected))
+
+        df = gi.read_at1a(io.StringIO(glitched), repair='drop', fill_with_nans=False)
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(len(lines) - 2, len(df))
+
+        with self.assertRaises(ValueError):
+            gi.read_at1a(io.StringIO(glitched), repair='first')
+
+    def test_import_zls_compact(self):
+        expanded = gi.read_zls(os.path.abspath('tests/sample_zls'))
+        df = gi.read_zls(os.path.abspath('tests/sample_zls'), compact=True, float32=True)
+        self.assertEqual(df['line_name'].dtype, 'category')
+        self.assertEqual(df['sensor'].dtype, np.float32)
+        numeric = df.select_dtypes(include=[np.number]).astype(np.float64).round(2)
+        self.assertTrue(numeric.equals(expanded[numeric.columns]))
+        self.assertEqual(df['line_name'].tolist(), expanded['line_name'].tolist())
+        self.assertLess(df.memory_usage(deep=True).sum() * 3,
+                        expanded.memory_usage(deep=True).sum())
+
     def test_import_zls(self):
         df = gi.read_zls(os.path.abspath('tests/sample_zls'))
         self.assertEqual(df.shape, (10800, 16))
@@ -1,6 +1,65 @@
 # -*- coding: utf-8 -*-
+from operator import add
 from pathlib import Path
 
+from PyQt5.QtWidgets import QApplication
+
 import dgp.gui.utils as utils
+from dgp.lib.transform.graph import TransformGraph
+
+
+def test_TransformExecutor(qt_app):
+    graph = {'a': 1, 'b': 2, 'c': (add, 'a', 'b')}
+    executor = utils.TransformExecutor(lambda: TransformGraph(graph),
+                                       collect=lambda g: g.results['c'])
+    progress = []
+    results = []
+    executor.progress.connect(lambda *args: progress.append(args))
+    executor.result.connect(results.append)
+    executor.start()
+    assert executor.wait(5000)
+    QApplication.processEvents()
+
+    assert [3] == results
+    assert [(0, 3, 'a'), (1, 3, 'b'), (2, 3, 'c')] == progress
+
+
+def test_TransformExecutor_cancel(qt_app):
+    # Node 'b' requests cancellation, node 'c' must not be executed
+    graph = {'a': 1,
+             'b': (lambda a: executor.cancel(), 'a'),
+             'c': (lambda b: results.append('c'), 'b')}
+    executor = utils.TransformExecutor(lambda: TransformGraph(graph))
+    cancelled = []
+    results = []
+    executor.cancelled.connect(lambda: cancelled.append(True))
+    executor.result.connect(results.append)
+    executor.start()
+    assert executor.wait(5000)
+    QApplication.processEvents()
+
+    assert [True] == cancelled
+    assert [] == results
+
+
+def test_TransformExecutor_failed(qt_app):
+    graph = {'a': 1, 'b': (lambda a: a / 0, 'a')}
+    executor = utils.TransformExecutor(lambda: TransformGraph(graph))
+    failed = []
+    results = []
+    executor.failed.connect(failed.append)
+    executor.result.connect(results.append)
+    executor.start()
+    assert executor.wait(5000)
+    QApplication.processEvents()
+
+    assert 1 == len(failed)
+    assert isinstance(failed[0], ZeroDivisionError)
+    assert [] == results
 
 
+def test_TransformGraph_cancel_reset():
+    # A cancellation requested while not executing does not cancel the next run
+    graph = TransformGraph({'a': 1, 'b': 2, 'c': (add, 'a', 'b')})
+    graph.cancel()
+    assert 3 == graph.execute()['c']
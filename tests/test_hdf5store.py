@@ -1,15 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import threading
 from datetime import datetime
 from pathlib import Path
 
 import pytest
-from pandas import DataFrame
+from pandas import DataFrame, HDFStore
+from pandas.testing import assert_frame_equal
 
 from dgp.core import DataType
 from dgp.core.models.flight import Flight
 from dgp.core.models.datafile import DataFile
-from dgp.core.hdf5_manager import HDF5Manager
+from dgp.core.hdf5_manager import HDF5Manager, HDF5_LOCK
+from dgp.core.import_cache import ImportCache
+from dgp.lib.gravity_ingestor import read_zls
 
 HDF5_FILE = "test.hdf5"
 
@@ -64,3 +68,145 @@ def test_ds_metadata(gravdata: DataFrame, hdf5file: Path):
 
     assert HDF5Manager._get_node_attr(empty_datafile.nodepath, 'test_attr',
                                       hdf5file) is None
+
+
+def test_result_save_load(gravdata: DataFrame, hdf5file: Path):
+    key_1, key_2 = 'a' * 40, 'b' * 40
+    assert HDF5Manager.load_result(key_1, hdf5file) is None
+
+    assert HDF5Manager.save_result(gravdata, key_1, hdf5file, dataset='ds1',
+                                   graph='TestGraph')
+    assert gravdata.equals(HDF5Manager.load_result(key_1, hdf5file))
+    assert key_1 == HDF5Manager._get_node_attr(HDF5Manager.result_nodepath(key_1),
+                                               'provenance_key', hdf5file)
+
+    # Saving a result with the same provenance but new key invalidates the old
+    assert HDF5Manager.save_result(gravdata, key_2, hdf5file, dataset='ds1',
+                                   graph='TestGraph')
+    assert HDF5Manager.load_result(key_1, hdf5file) is None
+    assert HDF5Manager.load_result(key_2, hdf5file) is not None
+
+    assert 0 == HDF5Manager.invalidate_results(hdf5file, dataset='ds2')
+    assert 1 == HDF5Manager.invalidate_results(hdf5file, dataset='ds1')
+    assert HDF5Manager.load_result(key_2, hdf5file) is None
+    assert HDF5Manager.load_result(key_2, Path('.nonexistent.hdf5')) is None
+
+
+def test_append_invalidates_results(gravdata: DataFrame, hdf5file: Path):
+    datafile = DataFile(DataType.GRAVITY, datetime.now(), Path('tests/test.dat'))
+    other = DataFile(DataType.GRAVITY, datetime.now(), Path('tests/other.dat'))
+    numeric = gravdata.select_dtypes(include='number')
+    head, tail = numeric.iloc[:10], numeric.iloc[10:]
+    assert HDF5Manager.save_data(head, datafile, path=hdf5file)
+
+    key_1, key_2 = 'a' * 40, 'b' * 40
+    HDF5Manager.save_result(head, key_1, hdf5file, dataset='ds1', graph='TestGraph',
+                            gravity=datafile.uid.base_uuid, trajectory='traj')
+    HDF5Manager.save_result(head, key_2, hdf5file, dataset='ds2', graph='TestGraph',
+                            gravity=other.uid.base_uuid, trajectory='traj')
+
+    # Results computed from the appended datafile are stale, others are kept
+    assert HDF5Manager.append_data(tail, datafile, hdf5file)
+    assert HDF5Manager.load_result(key_1, hdf5file) is None
+    assert HDF5Manager.load_result(key_2, hdf5file) is not None
+
+
+def test_ds_summary_metadata(gravdata: DataFrame, hdf5file: Path):
+    datafile = DataFile(DataType.GRAVITY, datetime.now(), source_path=Path('./test.dat'))
+    HDF5Manager.save_data(gravdata, datafile, path=hdf5file)
+
+    meta = HDF5Manager.get_metadata(datafile, hdf5file)
+    assert len(gravdata) == meta['rows']
+    assert list(gravdata.columns) == meta['columns']
+    assert gravdata.index[0] == meta['start']
+    assert gravdata.index[-1] == meta['end']
+    assert pytest.approx(10.0) == meta['sample_rate']
+    assert str(gravdata['gravity'].dtype) == meta['dtypes']['gravity']
+    assert gravdata['gravity'].min() == meta['minimum']['gravity']
+    assert gravdata['gravity'].max() == meta['maximum']['gravity']
+    assert meta['nbytes'] > 0
+
+    assert datafile.nodepath in HDF5Manager.read_metadata(hdf5file)
+
+    empty_datafile = DataFile(DataType.TRAJECTORY, datetime.now(),
+                              Path('tests/test.dat'))
+    with pytest.raises(KeyError):
+        HDF5Manager.get_metadata(empty_datafile, hdf5file)
+    with pytest.raises(FileNotFoundError):
+        HDF5Manager.read_metadata(Path('.nonexistent.hdf5'))
+
+
+def test_ds_decimated_levels(gravdata: DataFrame, hdf5file: Path):
+    datafile = DataFile(DataType.GRAVITY, datetime.now(), source_path=Path('./test.dat'))
+    HDF5Manager.save_data(gravdata, datafile, path=hdf5file)
+
+    # Levels are built lazily on first load, and stored alongside the data
+    levels = HDF5Manager.load_levels(datafile, hdf5file, factors=(2, 4))
+    assert [2, 4] == sorted(levels)
+    assert 'gravity_min' in levels[2] and 'gravity_max' in levels[2]
+
+    HDF5Manager.clear_cache()
+    with HDFStore(str(hdf5file), mode='r') as hdf:
+        assert HDF5Manager.levels_nodepath(datafile, 4) in hdf
+    stored = HDF5Manager.load_levels(datafile, hdf5file, factors=(2, 4))
+    assert levels[4].equals(stored[4])
+
+    # Re-saved data drops the cached and stored levels
+    HDF5Manager.save_data(gravdata.iloc[:10], datafile, path=hdf5file)
+    with HDFStore(str(hdf5file), mode='r') as hdf:
+        assert HDF5Manager.levels_nodepath(datafile, 4) not in hdf
+    assert 3 == len(HDF5Manager.load_levels(datafile, hdf5file, factors=(4,))[4])
+
+
+def test_datastore_save_load_categorical(hdf5file: Path):
+    zls = read_zls('tests/sample_zls', compact=True)
+    assert 'table' == HDF5Manager.storage_format(zls)
+    datafile = DataFile(DataType.GRAVITY, datetime.now(), Path('tests/sample_zls'))
+    assert HDF5Manager.save_data(zls, datafile, path=hdf5file)
+    HDF5Manager.clear_cache()
+    assert_frame_equal(zls, HDF5Manager.load_data(datafile, path=hdf5file))
+
+
+def test_datastore_concurrent_access(gravdata: DataFrame, hdf5file: Path):
+    # Saving from a worker thread while loading (uncached) data must not
+    # open the file while it is open for writing
+    HDF5Manager.clear_cache()
+    reference = DataFile(DataType.GRAVITY, datetime.now(), Path('ref.dat'))
+    HDF5Manager.save_data(gravdata, reference, hdf5file)
+    errors = []
+
+    def save():
+        try:
+            for i in range(20):
+                datafile = DataFile(DataType.GRAVITY, datetime.now(), Path(f'{i}.dat'))
+                HDF5Manager.save_data(gravdata, datafile, hdf5file)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    writer = threading.Thread(target=save)
+    writer.start()
+    while writer.is_alive():
+        HDF5Manager._cache.pop(reference, None)
+        assert_frame_equal(gravdata, HDF5Manager.load_data(reference, hdf5file))
+    writer.join()
+    assert [] == errors
+
+
+def test_import_cache_shares_hdf5_lock(gravdata: DataFrame, tmpdir):
+    # The import cache is not accessed while the project store is in use by
+    # another thread (e.g. the import writer)
+    assert ImportCache._lock is HDF5Manager._lock is HDF5_LOCK
+    cache = ImportCache(Path(str(tmpdir.join('cache'))))
+    stored = threading.Event()
+
+    def store():
+        cache.store('key', gravdata)
+        stored.set()
+
+    with HDF5_LOCK:
+        worker = threading.Thread(target=store)
+        worker.start()
+        assert not stored.wait(timeout=0.2)
+    worker.join()
+    assert stored.is_set()
+    assert_frame_equal(gravdata, cache.load('key'))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from dgp.lib.index_repair import repair_index
+
+START = pd.Timestamp('2018-05-10 12:00:00')
+
+
+@pytest.fixture
+def glitched():
+    # A logger reset replays samples 2 and 3, and sample 5 is duplicated
+    steps = [0, 1, 2, 3, 2, 3, 4, 5, 5, 6]
+    index = pd.DatetimeIndex(START.value + np.array(steps) * 100000000)
+    return pd.DataFrame({'gravity': np.arange(10, dtype=float),
+                         'status': np.arange(10, dtype=np.uint32)}, index=index)
+
+
+def test_repair_index_in_order():
+    index = pd.date_range(START, periods=10, freq='100ms')
+    data = pd.DataFrame({'gravity': np.arange(10.0)}, index=index)
+    repaired, report = repair_index(data)
+    assert repaired is data
+    assert not report.repaired
+    assert 0 == report.backwards
+
+
+@pytest.mark.parametrize('policy, gravity', [
+    ('last', [0, 1, 4, 5, 6, 8, 9]),
+    ('mean', [0, 1, 3, 4, 6, 7.5, 9]),
+    ('drop', [0, 1, 6, 9]),
+])
+def test_repair_index_policies(glitched, policy, gravity):
+    repaired, report = repair_index(glitched, policy)
+
+    assert repaired.index.is_monotonic_increasing and repaired.index.is_unique
+    np.testing.assert_array_equal(gravity, repaired['gravity'].values)
+    assert report.repaired
+    assert 1 == report.backwards
+    assert 3 == report.duplicates
+    assert 10 - len(gravity) == report.removed
+    assert policy in str(report)
+    # Non-float columns take the value of the last row
+    if policy == 'mean':
+        assert np.uint32 == repaired['status'].dtype
+        assert [0, 1, 4, 5, 6, 8, 9] == repaired['status'].tolist()
+
+
+def test_repair_index_mean_nans(glitched):
+    glitched.iloc[[2, 7], 0] = np.nan
+    repaired, _ = repair_index(glitched, 'mean')
+    np.testing.assert_array_equal([0, 1, 4, 4, 6, 8, 9], repaired['gravity'].values)
+
+
+def test_repair_index_invalid_policy(glitched):
+    with pytest.raises(ValueError):
+        repair_index(glitched, 'first')
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from dgp.core import DataType, StateAction
+from dgp.core.controllers.project_controllers import AirborneProjectController
+from dgp.core.journal import ProjectJournal
+from dgp.core.models.datafile import DataFile
+from dgp.core.models.dataset import DataSet
+from dgp.core.models.flight import Flight
+from dgp.core.models.project import AirborneProject
+from dgp.core.oid import OID
+from dgp.gui.plotting.helpers import LineUpdate
+
+
+def reload(project: AirborneProject) -> AirborneProject:
+    loaded = AirborneProject.from_json(project.projectfile.read_text())
+    loaded.path = project.path
+    ProjectJournal(loaded).replay()
+    return loaded
+
+
+def state(project: AirborneProject) -> dict:
+    encoded = json.loads(project.to_json())
+    del encoded['modify_date']
+    return encoded
+
+
+def test_journal_replay(project: AirborneProject):
+    project.to_json(to_file=True)
+    journal = ProjectJournal(project)
+    prj_ctrl = AirborneProjectController(project, journal=journal)
+
+    flt_ctrl = prj_ctrl.add_child(Flight("Flt3"))
+    flt_ctrl.set_attr('notes', 'Journaled flight')
+    ds_ctrl = flt_ctrl.add_child(DataSet(name="DataSet-J"))
+    ds_ctrl.add_datafile(DataFile(DataType.GRAVITY, datetime.now(), project.path))
+    ds_ctrl.set_attr('sensor', project.gravimeters[0])
+
+    start, stop = pd.Timestamp('2018-01-01 10:00'), pd.Timestamp('2018-01-01 11:00')
+    seg_ctrl = ds_ctrl.add_child(LineUpdate(StateAction.CREATE, OID(), start, stop, "L1"))
+    seg_ctrl.set_attr('stop', pd.Timestamp('2018-01-01 11:30:00.000000001'))
+    removed = ds_ctrl.add_child(LineUpdate(StateAction.CREATE, OID(), stop, stop, "L2"))
+    ds_ctrl.remove_child(removed.uid, confirm=False)
+
+    old_flight = project.flights[1]
+    prj_ctrl.remove_child(old_flight.uid, confirm=False)
+    journal.flush()
+
+    # Includes the default DataSets created for flights without one
+    assert len(journal.path.read_text().splitlines()) == journal.pending >= 9
+
+    loaded = reload(project)
+    assert project.flights[-1].uid == loaded.flights[-1].uid
+    assert loaded.find(old_flight.uid) is None
+    flight = loaded.find(flt_ctrl.uid)
+    assert 'Journaled flight' == flight.notes
+    dataset = loaded.find(ds_ctrl.uid)
+    assert dataset in flight.datasets
+    assert loaded.gravimeters[0] is dataset.sensor
+    assert ds_ctrl.entity.gravity.uid == dataset.gravity.uid
+    assert loaded.find(dataset.gravity.uid) is dataset.gravity
+
+    assert 1 == len(dataset.segments)
+    segment = dataset.segments.get(seg_ctrl.uid)
+    assert "L1" == segment.label
+    assert seg_ctrl.entity.stop == segment.stop
+
+    # Replaying over a snapshot which already contains the changes (i.e. a
+    # crash before the journal is truncated) is idempotent
+    loaded.to_json(to_file=True)
+    assert state(loaded) == state(reload(loaded))
+
+    # Compaction writes a snapshot of the project and truncates the journal
+    prj_ctrl.save(compact=True)
+    assert 0 == journal.pending
+    assert 0 == journal.path.stat().st_size
+    assert state(project) == state(reload(project))
+    journal.close()
+
+
+def test_journal_autocompact(project: AirborneProject, monkeypatch):
+    project.to_json(to_file=True)
+    callers = []
+    to_json = AirborneProject.to_json
+
+    def record_caller(self, *args, **kwargs):
+        callers.append(threading.current_thread())
+        return to_json(self, *args, **kwargs)
+
+    monkeypatch.setattr(AirborneProject, 'to_json', record_caller)
+    journal = ProjectJournal(project, compact_after=3)
+    prj_ctrl = AirborneProjectController(project, journal=journal)
+    for i in range(4):
+        prj_ctrl.add_child(Flight(f"Flt-{i}"))
+    journal.flush()
+
+    # The snapshot is encoded by the writer thread, not the recording thread
+    assert callers and threading.main_thread() not in callers
+    assert len(journal.path.read_text().splitlines()) == journal.pending < 3
+    snapshot = AirborneProject.from_json(project.projectfile.read_text())
+    assert 2 < len(snapshot.flights)
+    assert 6 == len(reload(project).flights)
+    journal.close()
+
+
+def test_journal_incomplete_record(project: AirborneProject):
+    project.to_json(to_file=True)
+    journal = ProjectJournal(project)
+    prj_ctrl = AirborneProjectController(project, journal=journal)
+    prj_ctrl.add_child(Flight("Flt3"))
+    journal.flush()
+    records = len(journal.path.read_text().splitlines())
+
+    # Simulate a crash part way through writing a record
+    with journal.path.open('a') as fd:
+        fd.write('{"op": "add", "parent": {"_type": "OID"')
+
+    loaded = AirborneProject.from_json(project.projectfile.read_text())
+    loaded.path = project.path
+    replay = ProjectJournal(loaded)
+    assert 0 < replay.replay() <= records
+    assert 3 == len(loaded.flights)
+    # The replayed journal (and the incomplete record) is compacted
+    assert '' == journal.path.read_text()
+    assert 0 == replay.pending
+    snapshot = AirborneProject.from_json(project.projectfile.read_text())
+    assert 3 == len(snapshot.flights)
+    journal.close()
@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
 
 # TODO: Tests for new file loader method in core/controllers/project_controller::FileLoader
+import os
 from pathlib import Path
 
 import pytest
 from PyQt5.QtTest import QSignalSpy
 from pandas import DataFrame
+from pandas.testing import assert_frame_equal
 
 
-from dgp.core.file_loader import FileLoader
+from dgp.core.file_loader import FileLoader, parse_file
+from dgp.core.import_cache import (ImportCache, default_cache_path, import_cache,
+                                   set_import_cache)
+from dgp.lib.gravity_ingestor import read_at1a
 
 TEST_FILE_GRAV = 'tests/sample_gravity.csv'
+GRAV_COLUMNS = ['gravity', 'long_accel', 'cross_accel', 'beam', 'temp', 'status',
+                'pressure', 'Etemp', 'gps_week', 'gps_sow']
 
 
 def mock_loader(*args, **kwargs):
@@ -53,3 +60,56 @@ def test_load_failure(qt_app):
     loader.run()
     assert 1 == len(spy_err)
     assert called
+
+
+def test_load_cached(qt_app, tmpdir):
+    source = Path(str(tmpdir.join('gravity.csv')))
+    source.write_text(Path(TEST_FILE_GRAV).read_text())
+    cache = ImportCache(Path(str(tmpdir.join('cache'))))
+    calls = []
+
+    def counting_loader(path, columns=None):
+        calls.append(columns)
+        return read_at1a(path, columns=columns)
+
+    results = []
+    for columns in (None, None, GRAV_COLUMNS):
+        loader = FileLoader(source, counting_loader, qt_app, cache=cache,
+                            columns=columns, unused='ignored')
+        loader.loaded.connect(lambda data, path: results.append(data))
+        loader.run()
+
+    # The second load is served from the cache, the third differs in parameters
+    assert [None, GRAV_COLUMNS] == calls
+    assert 1 == cache.hits
+    assert 3 == len(results)
+    assert_frame_equal(results[0], results[1])
+    assert_frame_equal(results[0], results[2], check_names=False)
+
+    # Modifying the source file invalidates its entries
+    mtime = source.stat().st_mtime
+    os.utime(str(source), (mtime + 1, mtime + 1))
+    loader = FileLoader(source, counting_loader, qt_app, cache=cache)
+    loader.run()
+    assert 3 == len(calls)
+
+    assert 3 == len(list(cache.path.glob('*.h5')))
+    assert 0 < cache.evict(max_bytes=1)
+    assert 0 == cache.clear() + len(list(cache.path.glob('*.h5')))
+
+
+def test_import_cache_opt_in(tmpdir, monkeypatch):
+    monkeypatch.setenv('DGP_IMPORT_CACHE', str(tmpdir.join('user_cache')))
+    assert Path(str(tmpdir.join('user_cache'))) == default_cache_path()
+
+    # With the global cache disabled files are always parsed
+    previous = import_cache()
+    set_import_cache(None)
+    try:
+        calls = []
+        for _ in range(2):
+            parse_file(Path(TEST_FILE_GRAV), lambda path: calls.append(path) or DataFrame())
+        assert 2 == len(calls)
+    finally:
+        set_import_cache(previous)
+    assert not tmpdir.join('user_cache').exists()
@@ -4,12 +4,14 @@
 Unit tests for new Project/Flight data classes, including JSON
 serialization/de-serialization
 """
+import json
 import time
 from datetime import datetime
 from typing import Tuple
 from uuid import uuid4
 from pathlib import Path
 
+import numpy as np
 import pytest
 import pandas as pd
 
@@ -17,7 +19,8 @@ from dgp.core import DataType
 from dgp.core.models.project import AirborneProject
 from dgp.core.hdf5_manager import HDF5Manager
 from dgp.core.models.datafile import DataFile
-from dgp.core.models.dataset import DataSet
+from dgp.core.models.dataset import DataSet, DataSegment, SegmentTable
+from dgp.core.oid import OID
 from dgp.core.models import flight
 from dgp.core.models.meter import Gravimeter
 
@@ -97,6 +100,27 @@ def test_project_remove_child(make_flight):
     assert 1 == len(prj.flights)
 
 
+def test_project_registry(project: AirborneProject):
+    flt = project.flights[0]
+    dataset = flt.datasets[0]
+    assert project is project.find(project.uid)
+    assert flt is project.find(flt.uid)
+    assert dataset is project.find(dataset.uid)
+    assert dataset.gravity is project.find(dataset.gravity.uid)
+    for meter in project.gravimeters:
+        assert meter is project.find(str(meter.uid))
+
+    # The registry is not serialized, and is rebuilt on load
+    loaded = AirborneProject.from_json(project.to_json())
+    assert 'registry' not in json.loads(project.to_json(to_file=False))
+    assert isinstance(loaded.find(dataset.uid), DataSet)
+    assert loaded.find(flt.uid) is loaded.get_child(flt.uid)
+
+    assert project.remove_child(flt.uid)
+    assert project.find(flt.uid) is None
+    assert project.find(dataset.uid) is None
+
+
 def test_gravimeter():
     meter = Gravimeter("AT1A-13")
     assert "AT1A" == meter.type
@@ -130,3 +154,52 @@ def test_dataset(tmpdir):
     # assert expected_concat.equals(dataset.dataframe)
 
 
+def test_segment_table():
+    base = pd.Timestamp('2018-01-01')
+    segments = [DataSegment(OID(), base + pd.Timedelta(minutes=10 * i),
+                            base + pd.Timedelta(minutes=10 * i + 5), i, f'line{i}')
+                for i in range(40)]
+    dataset = DataSet(segments=segments)
+    table = dataset.segments
+    assert isinstance(table, SegmentTable)
+    assert 40 == len(table)
+    assert np.int64 == table.start.dtype == table.stop.dtype
+    assert segments[3] is table[3]
+    assert segments == list(table)
+    assert segments[5] in table
+
+    # DataSegment API is backed by the table
+    seg = segments[3]
+    assert base + pd.Timedelta(minutes=30) == seg.start
+    seg.stop = base + pd.Timedelta(minutes=37)
+    assert seg.stop.value == table.stop[3]
+    seg.label = 'relabeled'
+    assert 'relabeled' == table.labels[3]
+
+    # Interval queries
+    assert seg is table.containing(base + pd.Timedelta(minutes=36))
+    assert table.containing(base + pd.Timedelta(minutes=38)) is None
+    assert segments[2:5] == table.overlapping(base + pd.Timedelta(minutes=24),
+                                              base + pd.Timedelta(minutes=41))
+    index = pd.date_range(base, periods=60 * 60, freq='1s')
+    rows = table.locate(index)
+    assert 0 == rows[0] and -1 == rows[5 * 60 + 1] and 1 == rows[10 * 60]
+    mask = table.mask(index, seg)
+    assert (7 * 60 + 1) == mask.sum()
+    assert table.mask(index).sum() == (rows >= 0).sum()
+
+    # Removed segments are detached and retain their values
+    table.remove(seg)
+    assert 39 == len(table)
+    assert seg not in table
+    assert base + pd.Timedelta(minutes=37) == seg.stop
+    assert 'relabeled' == seg.label
+    assert segments[4] is table[3]
+    assert table.containing(base + pd.Timedelta(minutes=36)) is None
+
+    # Columnar round trip
+    copy = SegmentTable.from_arrays(**{k: v for k, v in table.serialize().items()
+                                       if not k.startswith('_')})
+    assert table.uids == copy.uids
+    assert np.array_equal(table.start, copy.start)
+    assert table.labels == copy.labels
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import gc
+
 import pytest
 
-from dgp.core.oid import OID
+from dgp.core.models.flight import Flight
+from dgp.core.oid import OID, OIDRegistry
 
 
 def test_oid_equivalence():
@@ -19,3 +22,50 @@ def test_oid_equivalence():
     assert str(oid2.base_uuid) == oid2_clone
 
     assert not oid2 == dict(expect="Failure")
+
+
+def test_oid_registry():
+    class Entity:
+        def __init__(self):
+            self.uid = OID(self, tag='entity')
+
+    registry = OIDRegistry()
+    e1, e2 = Entity(), Entity()
+    registry.register(e1)
+    registry.register(e2)
+
+    assert 2 == len(registry)
+    assert e1.uid in registry
+    assert e1 is registry.get(e1.uid)
+    assert e1 is registry.get(e1.uid.base_uuid)
+    assert e2 is registry.get(str(e2.uid))
+    assert registry.get(OID('missing')) is None
+
+    # Existing registrations are retained unless replace is True
+    duplicate = Entity()
+    duplicate.uid = OID(duplicate, base_uuid=e1.uid.base_uuid)
+    registry.register(duplicate, replace=False)
+    assert e1 is registry.get(e1.uid)
+
+    # Entries referring to another object are not removed
+    registry.unregister(e1.uid, obj=duplicate)
+    assert e1 is registry.get(e1.uid)
+    registry.unregister(e1.uid)
+    assert e1.uid not in registry
+
+    # Weak references are dropped when the object is collected
+    del e2
+    gc.collect()
+    assert 0 == len(registry)
+
+
+def test_oid_group_cache():
+    oid = OID(tag="test")
+    assert "oid" == oid.group
+    assert f'oid_{oid.base_uuid}' == str(oid)
+
+    # Cached strings are reset when the pointer changes
+    oid.set_pointer(Flight("Flt"))
+    assert "flight" == oid.group
+    assert f'flight_{oid.base_uuid}' == oid.uuid
+    assert not hasattr(oid, '__dict__')
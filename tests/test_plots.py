@@ -10,9 +10,10 @@ from PyQt5.QtWidgets import QWidget
 from pyqtgraph import GraphicsLayout, PlotItem, PlotDataItem, LegendItem
 
 from dgp.core.oid import OID
-from dgp.gui.plotting.backends import GridPlotWidget, Axis, AxisFormatter
+from dgp.gui.plotting.backends import GridPlotWidget, Axis, AxisFormatter, SeriesArrayCache
 from dgp.gui.plotting.plotters import LineSelectPlot
 from dgp.gui.plotting.helpers import PolyAxis, LinearSegment, LinearSegmentGroup, LineUpdate
+from dgp.lib.decimation import DecimationPyramid
 
 """Test/Develop Plots using PyQtGraph for high-performance user-interactive 
 plots within the application.
@@ -98,6 +99,104 @@ def test_GridPlotWidget_add_series(gravity):
         gpw.remove_series('eotvos', 0, 0)
 
 
+def test_GridPlotWidget_add_series_decimated():
+    index = pd.date_range('2018-01-01', periods=200000, freq='100ms')
+    series = pd.Series(np.random.randn(len(index)), index=index, name='gravity')
+    pyramid = DecimationPyramid.from_series(series)
+    gpw = GridPlotWidget(rows=1)
+    p0 = gpw.get_plot(row=0)
+
+    item = gpw.add_series(series, row=0, pyramid=pyramid)
+    x, y = item.getData()
+    assert len(x) < len(series)
+    assert series.max() == y.max()
+    assert series.equals(gpw.get_series('gravity', row=0))
+
+    # Zooming into a narrow window draws the window at full resolution
+    x0, x1 = pyramid.x[1000], pyramid.x[1500]
+    p0.vb.setXRange(x0, x1, padding=0)
+    gpw._range_changed(p0)
+    x, y = item.getData()
+    window = (x >= x0) & (x <= x1)
+    assert 501 == window.sum()
+
+    # Decimation source is consulted for series without a pyramid
+    gpw.set_decimation_source(lambda s: pyramid if s.name == 'gravity' else None)
+    item = gpw.add_series(series, row=0, axis=Axis.LEFT, autorange=False)
+    assert len(item.getData()[0]) < len(series)
+
+
+def test_GridPlotWidget_auto_decimate():
+    index = pd.date_range('2018-01-01', periods=200000, freq='100ms')
+    values = np.random.randn(len(index))
+    values[123456] = 100.0
+    series = pd.Series(values, index=index, name='gravity')
+    gpw = GridPlotWidget(rows=1)
+    p0 = gpw.get_plot(row=0)
+
+    item = gpw.add_series(series, row=0)
+    x, y = item.getData()
+    assert len(x) <= gpw._max_points(p0)
+    assert 100.0 == y.max()
+
+    # Visible window is re-sliced, the point count is independent of the zoom
+    x0, x1 = pd.to_numeric(index[100000:150000])[[0, -1]]
+    p0.vb.setXRange(x0, x1, padding=0)
+    gpw._range_changed(p0)
+    x, y = item.getData()
+    window = (x >= x0) & (x <= x1)
+    assert window.sum() <= gpw._max_points(p0)
+    assert 100.0 == y[window].max()
+
+    # Short series, or auto_decimate disabled, are plotted as is
+    short = series.iloc[:100].rename('short')
+    assert 100 == len(gpw.add_series(short, row=0).getData()[0])
+    gpw = GridPlotWidget(rows=1, auto_decimate=False)
+    assert len(series) == len(gpw.add_series(series, row=0).getData()[0])
+
+
+def test_SeriesArrayCache(gravity):
+    cache = SeriesArrayCache()
+    x, y = cache.arrays(gravity)
+    assert (0, 1) == (cache.hits, cache.misses)
+    assert np.float64 == x.dtype == y.dtype
+    assert x.flags['C_CONTIGUOUS'] and y.flags['C_CONTIGUOUS']
+    # float64 values are not copied
+    assert np.shares_memory(y, gravity.values)
+
+    x2, y2 = cache.arrays(gravity)
+    assert x is x2 and y is y2
+    assert 0.5 == cache.hit_rate
+
+    # A Series modified in place is converted again once invalidated
+    series = gravity.copy()
+    cache.arrays(series)
+    series.index = series.index + pd.Timedelta(seconds=1)
+    cache.invalidate(series)
+    x3, _ = cache.arrays(series)
+    assert x3[0] == x[0] + 1e9
+    assert 3 == cache.misses
+
+    del series
+    assert 1 == len(cache)
+    cache.invalidate()
+    assert 0 == len(cache)
+
+
+def test_GridPlotWidget_array_cache(gravity):
+    gpw = GridPlotWidget(rows=1)
+    for _ in range(3):
+        gpw.add_series(gravity, row=0)
+        gpw.remove_series(gravity.name, row=0)
+    assert 2 == gpw.array_cache.hits
+    assert 1 == gpw.array_cache.misses
+
+    # Each widget owns its cache
+    other = GridPlotWidget(rows=1)
+    assert other.array_cache is not gpw.array_cache
+    assert 0 == len(other.array_cache)
+
+
 def test_GridPlotWidget_remove_series(gravity):
     gpw = GridPlotWidget(rows=3, multiy=True)
     p0 = gpw.get_plot(row=0)
@@ -34,3 +34,36 @@ def test_ProjectTreeModel_multiple_projects(project: AirborneProject,
     assert prj_ctrl in model.projects
     assert prj_ctrl2 in model.projects
 
+
+
+def test_ProjectTreeModel_lazy_population(project: AirborneProject):
+    prj_ctrl = AirborneProjectController(project)
+    model = ProjectTreeModel(prj_ctrl)
+
+    flt_ctrl: FlightController = prj_ctrl.get_child(project.flights[0].uid)
+    flt_index = model.indexFromItem(flt_ctrl)
+    assert 0 == flt_ctrl.rowCount()
+    assert model.hasChildren(flt_index)
+    assert model.canFetchMore(flt_index)
+
+    spy = QSignalSpy(model.rowsInserted)
+    model.fetchMore(flt_index)
+    assert not model.canFetchMore(flt_index)
+    assert len(project.flights[0].datasets) == flt_ctrl.rowCount()
+    assert 1 <= len(spy)
+
+    dataset = project.flights[0].datasets[0]
+    ds_ctrl = flt_ctrl.get_child(dataset.uid)
+    assert ds_ctrl is prj_ctrl.registry.get(dataset.uid)
+
+    # The Segments folder of the DataSet is populated when expanded
+    folder_index = model.indexFromItem(ds_ctrl._segments)
+    assert model.canFetchMore(folder_index)
+    model.fetchMore(folder_index)
+    assert not model.canFetchMore(folder_index)
+    assert 2 == len(dataset.segments) == ds_ctrl._segments.rowCount()
+
+    # Flights which are looked up are populated on demand
+    flt_ctrl2 = AirborneProjectController(project).get_child(project.flights[0].uid)
+    assert 0 == flt_ctrl2.rowCount()
+    assert dataset.uid == flt_ctrl2.get_child(dataset.uid).uid
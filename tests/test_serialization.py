@@ -5,15 +5,19 @@ from datetime import datetime, date
 from pathlib import Path
 from pprint import pprint
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from dgp.core.types.reference import Reference
 from dgp.core.models.meter import Gravimeter
-from dgp.core.models.dataset import DataSet
+from dgp.core.models.dataset import DataSet, DataSegment, SegmentTable
 from dgp.core.models.datafile import DataFile
 from dgp.core.models.flight import Flight
-from dgp.core.models.project import AirborneProject, ProjectEncoder, ProjectDecoder, PROJECT_FILE_NAME
+from dgp.core.oid import OID
+from dgp.core.models.project import (AirborneProject, ProjectEncoder, ProjectDecoder,
+                                    PROJECT_FILE_NAME, sniff_project_type)
+from dgp.gui.utils import load_project_from_path
 
 
 """Test Project is created as a global fixture in conftest.py"""
@@ -40,6 +44,36 @@ def test_project_serialize(project: AirborneProject, tmpdir):
     # Test serialize to file
     project.to_json(to_file=True)
     assert project.path.joinpath(PROJECT_FILE_NAME).exists()
+    assert not project.path.joinpath(PROJECT_FILE_NAME + '.tmp').exists()
+    assert project.to_json() == project.path.joinpath(PROJECT_FILE_NAME).read_text()
+
+
+def test_project_write_failure(project: AirborneProject):
+    project.to_json(to_file=True)
+    saved = project.path.joinpath(PROJECT_FILE_NAME).read_text()
+
+    # A failed encoding must leave the existing project file intact
+    project.flights[0].notes = pd.DataFrame([0, 1])
+    with pytest.warns(UserWarning):
+        assert not project.to_json(to_file=True)
+    assert saved == project.path.joinpath(PROJECT_FILE_NAME).read_text()
+    assert not project.path.joinpath(PROJECT_FILE_NAME + '.tmp').exists()
+
+
+def test_sniff_project_type(project: AirborneProject):
+    assert 'AirborneProject' == sniff_project_type(project.to_json())
+    assert 'AirborneProject' == sniff_project_type(project.to_json(indent=2))
+    assert sniff_project_type('{"name": "not a project"}') is None
+
+    # Legacy files have the type as the last keys of the top level object
+    legacy = json.dumps({'name': 'legacy', '_type': 'AirborneProject',
+                         '_module': 'dgp.core.models.project'}, indent=2)
+    assert 'AirborneProject' == sniff_project_type(legacy)
+
+    project.to_json(to_file=True)
+    loaded = load_project_from_path(project.path)
+    assert isinstance(loaded, AirborneProject)
+    assert project.uid == loaded.uid
 
 
 def test_project_deserialize(project: AirborneProject):
@@ -154,3 +188,49 @@ def test_reference_serialization():
 
     assert ds1.sensor is sensor1
     assert ds2.sensor is sensor1
+
+
+def test_segment_table_serialization(project: AirborneProject):
+    dataset = project.flights[0].datasets[0]
+    assert 2 == len(dataset.segments)
+
+    encoded = json.loads(project.to_json())
+    segments = encoded['flights'][0]['datasets'][0]['segments']
+    assert 'SegmentTable' == segments['_type']
+    assert [seg.uid.base_uuid for seg in dataset.segments] == segments['uid']
+
+    decoded = AirborneProject.from_json(project.to_json())
+    table = decoded.flights[0].datasets[0].segments
+    assert isinstance(table, SegmentTable)
+    assert [seg.uid for seg in dataset.segments] == [seg.uid for seg in table]
+    assert [seg.start for seg in dataset.segments] == [seg.start for seg in table]
+    assert ['seg1', 'seg2'] == [seg.label for seg in table]
+
+    # Projects serialized with a list of DataSegment objects are still loaded
+    segments = [seg.serialize() for seg in dataset.segments]
+    for seg in segments:
+        seg['uid'] = {'_type': 'OID', '_module': 'dgp.core.oid',
+                      'base_uuid': seg['uid'].base_uuid}
+    encoded['flights'][0]['datasets'][0]['segments'] = segments
+    legacy = AirborneProject.from_json(json.dumps(encoded))
+    table = legacy.flights[0].datasets[0].segments
+    assert isinstance(table, SegmentTable)
+    assert ['seg1', 'seg2'] == [seg.label for seg in table]
+
+
+def test_segment_table_empty_serialization():
+    # A table decoded from an empty serialization can be appended to
+    empty = DataSet(name='empty')
+    decoded = json.loads(json.dumps(empty.segments, cls=ProjectEncoder),
+                         cls=ProjectDecoder, klass=None)
+    assert isinstance(decoded, SegmentTable)
+    assert 0 == len(decoded)
+
+    start = pd.Timestamp('2018-01-01')
+    for i in range(20):
+        decoded.append(DataSegment(OID(), start + pd.Timedelta(minutes=2 * i),
+                                   start + pd.Timedelta(minutes=2 * i + 1), i, f'seg{i}'))
+    assert 20 == len(decoded)
+    assert [f'seg{i}' for i in range(20)] == decoded.labels
+    decoded.remove(decoded[0])
+    assert np.array_equal(np.arange(1, 20), decoded.sequence)
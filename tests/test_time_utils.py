@@ -1,6 +1,7 @@
 # coding: utf-8
 import pytest
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from dgp.lib import time_utils as tu
@@ -62,6 +63,39 @@ def test_convert_gps_time_datetime(given_sow, expected_dt):
     assert result.equals(test_res)
 
 
+def test_gps_time_index():
+    # Sub-microsecond precision is retained at modern week numbers
+    weeks = pd.Series([2300, 2300, 1941])
+    sows = pd.Series([604799.123456789, 0.000000001, 312030.0008])
+    index = tu.gps_time_index(weeks, sows, name='time')
+
+    assert isinstance(index, pd.DatetimeIndex)
+    assert 'time' == index.name
+    assert pd.Timestamp('2024-02-10 23:59:59.123456789') == index[0]
+    assert pd.Timestamp('2024-02-04 00:00:00.000000001') == index[1]
+    assert pd.Timestamp(datetime(2017, 3, 22, 14, 40, 30, 800)) == index[2]
+    assert (2300 * 604800 + 315964800) * 10**9 + 123456789 + 604799 * 10**9 == index.asi8[0]
+
+    assert index.equals(tu.convert_gps_time(weeks, sows, format='index'))
+    assert index[0] == tu.convert_gps_time(2300, 604799.123456789, format='datetime')
+
+
+def test_convert_gps_time_datetime_arrays():
+    # Array input returns the whole index, NaN weeks and sows are NaT
+    weeks = np.array([2300, np.nan, 1941])
+    sows = [604799.123456789, 10.0, np.nan]
+    result = tu.convert_gps_time(weeks, sows, format='datetime')
+    assert isinstance(result, pd.DatetimeIndex)
+    assert 3 == len(result)
+    assert pd.Timestamp('2024-02-10 23:59:59.123456789') == result[0]
+    assert result[1:].isna().all()
+
+    assert result.equals(tu.convert_gps_time(weeks, sows, format='index'))
+    assert tu.convert_gps_time(np.nan, 10.0, format='datetime') is pd.NaT
+    series = tu.convert_gps_time(pd.Series(weeks), pd.Series(sows), format='datetime')
+    assert [False, True, True] == series.isna().tolist()
+
+
 def test_datetime_to_sow():
     # test single input
     dt = datetime(2017, 9, 7, hour=13)
@@ -74,3 +108,56 @@ def test_datetime_to_sow():
     expected_iter = [expected]*20
     given_iter = tu.datetime_to_sow(dt_series)
     assert expected_iter == given_iter
+
+
+def test_leap_seconds_array():
+    times = pd.DatetimeIndex(['1979-12-31', '1981-06-30 23:59:59.9', '1981-07-01',
+                              '2015-08-07', '2016-12-31 23:59:59.999999999',
+                              '2017-01-01', '2017-07-25 13:01:38'])
+    expected = [0, 0, 1, 17, 17, 18, 18]
+    np.testing.assert_array_equal(expected, tu.leap_seconds_array(times))
+    assert [tu.leap_seconds(datetime=t) for t in times[1:]] == expected[1:]
+
+    # GPS time is ahead of UTC by the leap seconds as of each boundary
+    gps = pd.DatetimeIndex(['2017-01-01 00:00:17', '2017-01-01 00:00:18'])
+    np.testing.assert_array_equal([17, 18], tu.leap_seconds_array(gps, gps=True))
+
+
+def test_gps_to_utc_mid_file_leap_second():
+    # 1 Hz GPS times spanning the leap second inserted at 2017-01-01 UTC
+    gps = pd.date_range('2017-01-01 00:00:15', periods=5, freq='S', name='time')
+    utc = tu.gps_to_utc(gps)
+    expected = pd.DatetimeIndex(['2016-12-31 23:59:58', '2016-12-31 23:59:59',
+                                 '2017-01-01 00:00:00', '2017-01-01 00:00:00',
+                                 '2017-01-01 00:00:01'], name='time')
+    assert expected.equals(utc)
+
+
+def test_datetime_to_gps():
+    times = pd.DatetimeIndex(['2017-09-07 13:00', '2024-02-10 23:59:59.123456789'])
+    week, sow = tu.datetime_to_gps(times)
+    np.testing.assert_array_equal([1965, 2300], week)
+    np.testing.assert_allclose([392400, 604799.123456789], sow, rtol=0, atol=1e-9)
+    assert times.equals(tu.gps_time_index(week, sow))
+
+
+def test_hms_time_index():
+    mdy = np.array([' 3/22/2017', '12/31/2016', '2/29/2016', '1/1/1970'], dtype=object)
+    hms = np.array([' 9:58:59.20', '23:59:59.123456789', '0:00:00', '00:00:00.0000000015'],
+                   dtype=object)
+    index = tu.hms_time_index(mdy, hms)
+    expected = pd.DatetimeIndex(['2017-03-22 09:58:59.2', '2016-12-31 23:59:59.123456789',
+                                 '2016-02-29 00:00:00', '1970-01-01 00:00:00.000000001'])
+    assert expected.equals(index)
+
+    with pytest.raises(ValueError):
+        tu.hms_time_index(np.array(['3/22/2017', '3/22'], dtype=object),
+                          np.array(['9:58:59.20', '9:58:59.30'], dtype=object))
+
+
+def test_datenum_to_datetime():
+    assert pd.Timestamp('1970-01-01') == tu.datenum_to_datetime(719529)
+    index = tu.datenum_to_datetime(pd.Series([736776.5, 736776 + 35939.2 / 86400]))
+    expected = pd.DatetimeIndex(['2017-03-22 12:00:00', '2017-03-22 09:58:59.2'])
+    # Limited by the (~10 us) resolution of a float64 serial date number
+    assert (abs(index - expected) < pd.Timedelta(microseconds=20)).all()
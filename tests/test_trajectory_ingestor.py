@@ -1,5 +1,6 @@
 # coding: utf-8
 
+import io
 import os
 import unittest
 import pandas as pd
@@ -13,7 +14,8 @@ class TestTrajectoryIngestor(unittest.TestCase):
     def test_import_trajectory(self):
         fields = ['mdy', 'hms', 'lat', 'long', 'ell_ht', 'ortho_ht', 'num_sats', 'pdop']
         df = ti.import_trajectory(os.path.abspath('tests/sample_trajectory.txt'),
-                                  columns=fields, skiprows=1, timeformat='hms')
+                                  columns=fields, skiprows=1, timeformat='hms',
+                                  fill_with_nans=True)
 
         # Test and verify an arbitrary line of data against the same line in the pandas DataFrame
         line11 = ['3/22/2017', '9:59:00.20', 76.5350241071, -68.7218956324, 65.898, 82.778, 11, 2.00]
@@ -30,7 +32,7 @@ class TestTrajectoryIngestor(unittest.TestCase):
         fields = ['mdy', 'hms', 'lat', 'long', 'ell_ht', 'ortho_ht', 'num_sats', 'pdop']
         df = ti.import_trajectory(os.path.abspath('tests/sample_trajectory.txt'),
                                   columns=fields, skiprows=1, timeformat='hms',
-                                  interp=True)
+                                  interp=True, fill_with_nans=True)
 
         # Test and verify an arbitrary line of data against the same line in the pandas DataFrame
         line11 = ['3/22/2017', '9:59:00.20', 76.5350241071, -68.7218956324, 65.898, 82.778, 11, 2.00]
@@ -82,3 +84,71 @@ class TestTrajectoryIngestor(unittest.TestCase):
                                   skiprows=1, timeformat='sow')
 
         self.assertTrue(df1.equals(df2))
+
+    def test_import_trajectory_utc_mid_file_leap_second(self):
+        # 10 Hz GPS week/sow spanning the leap second of 2017-01-01 UTC
+        sow = np.round(np.arange(16.0, 19.0, 0.1), 1)
+        lines = ['1930,{:.1f},{:.1f},-68.7,65.9'.format(s, s) for s in sow]
+        df = ti.import_trajectory(io.StringIO('\n'.join(lines)), timeformat='sow',
+                                  is_utc=True)
+
+        self.assertTrue(df.index.is_unique and df.index.is_monotonic_increasing)
+        self.assertEqual(pd.Timestamp('2016-12-31 23:59:59'), df.index[0])
+        self.assertEqual(pd.Timestamp('2017-01-01 00:00:00.9'), df.index[-1])
+        # Samples within the leap second are superseded by the following second
+        self.assertEqual(20, len(df))
+        np.testing.assert_almost_equal(df.lat.values, np.r_[sow[:10], sow[20:]])
+
+    def test_import_trajectory_utc_leap_second_repair(self):
+        # Samples colliding across the leap second are resolved (and reported)
+        # by the repair policy
+        sow = np.round(np.arange(16.0, 19.0, 0.1), 1)
+        lines = '\n'.join('1930,{:.1f},{:.1f},-68.7,65.9'.format(s, s) for s in sow)
+        with self.assertLogs('dgp.lib.trajectory_ingestor', level='WARNING'):
+            dropped = ti.import_trajectory(io.StringIO(lines), timeformat='sow',
+                                           is_utc=True, repair='drop')
+        self.assertEqual(10, len(dropped))
+        np.testing.assert_almost_equal(dropped.lat.values, sow[:10])
+
+        mean = ti.import_trajectory(io.StringIO(lines), timeformat='sow',
+                                    is_utc=True, repair='mean')
+        self.assertTrue(mean.index.is_unique and mean.index.is_monotonic_increasing)
+        self.assertEqual(20, len(mean))
+        np.testing.assert_almost_equal(mean.lat.values[10:], (sow[10:20] + sow[20:]) / 2)
+
+    def test_import_trajectory_serial(self):
+        hms = ti.import_trajectory(os.path.abspath('tests/sample_trajectory.txt'),
+                                   skiprows=1, timeformat='hms')
+        seconds = (hms.index - pd.Timestamp('2017-03-22')).total_seconds()
+        lines = ['{!r},{},{},{}'.format(736776 + s / 86400, lat, lon, ht)
+                 for s, lat, lon, ht in zip(seconds, hms.lat, hms.long, hms.ell_ht)
+                 if not np.isnan(lat)]
+        df = ti.import_trajectory(io.StringIO('\n'.join(lines)), timeformat='serial')
+
+        self.assertEqual(len(hms), len(df))
+        self.assertTrue(hms.index.equals(df.index))
+        np.testing.assert_array_equal(hms.lat.values, df.lat.values)
+
+    def test_import_trajectory_gaps(self):
+        # 10 Hz week/sow with timing jitter, and a gap of 5 samples
+        sow = np.r_[np.arange(100.0, 101.0, 0.1), np.arange(101.5, 102.0, 0.1)]
+        jitter = np.tile([0.0, 0.004, -0.007, 0.002, -0.001], 3)
+        lines = ['1930,{!r},{:d},-68.7,65.9'.format(s + j, i)
+                 for i, (s, j) in enumerate(zip(sow, jitter))]
+        df, gap_index = ti.import_trajectory(io.StringIO('\n'.join(lines)),
+                                             timeformat='sow', fill_with_nans=False,
+                                             gaps=True)
+
+        # Jittered samples are snapped (and kept) rather than dropped
+        self.assertEqual(15, len(df))
+        np.testing.assert_array_equal(np.arange(15), df.lat.values)
+        self.assertEqual(2, len(gap_index))
+        self.assertEqual([10, 5], gap_index.runs()['rows'].tolist())
+        self.assertEqual(5, gap_index.gaps()['missing'][0])
+        self.assertTrue(gap_index.is_continuous(df.index[0], df.index[9]))
+        self.assertFalse(gap_index.is_continuous(df.index[0], df.index[10]))
+
+        filled = ti.import_trajectory(io.StringIO('\n'.join(lines)), timeformat='sow',
+                                      fill_with_nans=True)
+        self.assertEqual(20, len(filled))
+        self.assertTrue(filled.index.equals(gap_index.grid()))
@@ -5,7 +5,7 @@ import numpy as np
 from pandas.testing import assert_series_equal
 from functools import partial
 
-from dgp.lib.transform.graph import Graph, TransformGraph, GraphError
+from dgp.lib.transform.graph import Graph, TransformGraph, GraphError, GraphCancelled
 from dgp.lib.transform.gravity import eotvos_correction, latitude_correction, free_air_correction
 import dgp.lib.trajectory_ingestor as ti
 
@@ -96,6 +96,47 @@ class TestTransformGraph:
         expected = {'a': 1, 'b': 2, 'c': 3, 'd': 6}
         assert res == expected
 
+    def test_fingerprint(self, test_input):
+        class NewTransformGraph(TransformGraph):
+            transform_graph = test_input
+
+        key = NewTransformGraph.fingerprint('grav_uid', 'traj_uid', begin=0)
+        assert key == NewTransformGraph.fingerprint('grav_uid', 'traj_uid', begin=0)
+        assert key != NewTransformGraph.fingerprint('grav_uid', 'other_uid', begin=0)
+        assert key != NewTransformGraph.fingerprint('grav_uid', 'traj_uid', begin=1)
+        assert key != TransformGraph.fingerprint('grav_uid', 'traj_uid', begin=0)
+
+    def test_fingerprint_node_source(self, monkeypatch):
+        from dgp.lib.transform import transform_graphs
+        key = transform_graphs.AirbornePost.fingerprint('grav_uid', 'traj_uid')
+        assert key == transform_graphs.AirbornePost.fingerprint('grav_uid', 'traj_uid')
+
+        # Changing the code of a node callable changes the key
+        def demux(df, col):
+            return df[[col]]
+        monkeypatch.setattr(transform_graphs.demux, '__code__', demux.__code__)
+        assert key != transform_graphs.AirbornePost.fingerprint('grav_uid', 'traj_uid')
+
+    def test_execute_progress(self, test_input):
+        g = TransformGraph(graph=test_input)
+        calls = []
+        g.execute(progress=lambda *args: calls.append(args))
+        assert [(0, 4, 'a'), (1, 4, 'b'), (2, 4, 'c'), (3, 4, 'd')] == calls
+
+    def test_execute_cancel(self, test_input):
+        g = TransformGraph(graph=test_input)
+
+        def progress(completed, total, node):
+            if node == 'b':
+                g.cancel()
+
+        with pytest.raises(GraphCancelled):
+            g.execute(progress=progress)
+        assert g.results is None
+
+        # Cancellation is reset, the graph may be executed again
+        assert {'a': 1, 'b': 2, 'c': 3, 'd': 6} == g.execute()
+
 
 class TestCorrections:
     @pytest.fixture
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt
+
+from dgp.core.controllers.dataset_controller import DataSetController
+from dgp.gui.plotting.plotters import TransformPlot
+from dgp.gui.widgets.data_transform_widget import TransformWidget
+
+
+def test_TransformWidget_channel_data(qt_app, project, prj_ctrl):
+    flt_ctrl = prj_ctrl.get_child(project.flights[0].uid)
+    dataset: DataSetController = flt_ctrl.get_child(flt_ctrl.entity.datasets[0].uid)
+    widget = TransformWidget(dataset, TransformPlot())
+
+    index = pd.date_range('2018-01-01', periods=100, freq='100ms')
+    result = pd.DataFrame({'lat': np.linspace(40, 41, 100),
+                           'lon': np.linspace(-80, -79, 100),
+                           'fac': np.random.randn(100),
+                           'gravity': np.random.randn(100)}, index=index)
+    widget._set_result(result)
+    assert 4 == widget._channel_model.rowCount()
+    assert Qt.Checked == widget._channel_model.findItems('fac')[0].checkState()
+
+    # No alternate axis views are created until requested
+    assert {} == widget._axis_index
+
+    time_view = widget.channel_data('gravity', TransformWidget.TIME)
+    assert time_view.index.equals(index)
+
+    lat_view = widget.channel_data('gravity', TransformWidget.LATITUDE)
+    fac_view = widget.channel_data('fac', TransformWidget.LATITUDE)
+    np.testing.assert_array_equal(result['lat'].values, lat_view.index.values)
+    # Index is shared between channels, and channel values are not copied
+    assert lat_view.index is fac_view.index
+    assert np.shares_memory(lat_view.values, result['gravity'].values)
+    assert widget.channel_data('gravity', TransformWidget.LATITUDE) is lat_view
+    assert widget.channel_data('lat', TransformWidget.LATITUDE).empty
+
+    # Only the most recently used alternate index is retained
+    widget.channel_data('gravity', TransformWidget.LONGITUDE)
+    assert [TransformWidget.LONGITUDE] == list(widget._axis_index)